@@ -20,11 +20,12 @@ with st.expander("🔄 Sync Channel from YouTube", expanded=False):
     with col1:
         sync_limit = st.number_input(
             "Number of videos to sync",
-            min_value=5,
-            max_value=50,
+            min_value=0,
+            max_value=10000,
             value=20,
-            help="Fetch the most recent N videos from the channel"
+            help="Fetch up to N videos published since the last sync (0 = no limit)"
         )
+        sync_full = st.checkbox("Full resync", help="Ignore the last sync and page through every upload")
     with col2:
         st.write("")  # Spacing
         st.write("")  # Spacing
@@ -33,7 +34,7 @@ with st.expander("🔄 Sync Channel from YouTube", expanded=False):
     if sync_button:
         with st.spinner(f"Syncing {sync_limit} videos from {selected_channel}..."):
             try:
-                count = workflows.sync_channel(selected_channel, limit=sync_limit)
+                count = workflows.sync_channel(selected_channel, limit=sync_limit, full=sync_full)
                 st.success(f"✅ Synced {count} videos from {selected_channel}!")
                 st.rerun()
             except Exception as e:
@@ -187,7 +187,7 @@ with col2:
                 from pathlib import Path
                 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
                 from ytseo import workflows
-                workflows.generate_suggestions_for_video(video_id)
+                workflows.generate_suggestions_for_video(video_id, refresh_cache=True)
                 st.success("🔄 Regenerated!")
                 st.rerun()
             except Exception as e:
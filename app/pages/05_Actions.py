@@ -57,6 +57,15 @@ with col1:
         ["recent", "oldest", "linked"],
         help="recent: newest first, oldest: oldest first, linked: AI-EWG linked first"
     )
+    
+    gen_workers = st.number_input(
+        "Parallel workers",
+        min_value=1,
+        max_value=16,
+        value=1,
+        key="bulk_gen_workers",
+        help="Videos generated concurrently. Keep at or below LLM_POOL_SIZE."
+    )
 
 with col2:
     st.write("")
@@ -65,7 +74,7 @@ with col2:
     if st.button("✨ Generate Suggestions", type="primary", use_container_width=True, disabled=pending_count == 0):
         with st.spinner(f"Generating suggestions for {gen_limit} videos..."):
             try:
-                count = workflows.generate_suggestions(limit=gen_limit, priority=gen_priority)
+                count = workflows.generate_suggestions(limit=gen_limit, priority=gen_priority, workers=gen_workers)
                 st.success(f"✅ Generated suggestions for {count} videos!")
                 st.balloons()
                 st.rerun()
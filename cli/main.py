@@ -1,27 +1,51 @@
 from __future__ import annotations
 
 import subprocess
+import time
 from typing import Optional
 
 import typer
 
+from ytseo import ai_ewg_bridge
+from ytseo import apply_outbox
+from ytseo import ai_ewg_watcher
 from ytseo import db as dbmod
+from ytseo import episode_linker
 from ytseo import models
 from ytseo import workflows
 from ytseo import seo_engine
 from ytseo import youtube_api
+from ytseo import youtube_quota
 from ytseo import yts_downloader
-import json
+from ytseo.config import get_bool_setting
+from ytseo.llm_client import get_llm_client
 
 app = typer.Typer(help="YT SEO Tool CLI")
 
 
 @app.command()
-def sync(channel: str = typer.Option(..., "--channel", help="Channel handle, e.g. @TheNewsForum"),
-         limit: int = typer.Option(20, "--limit", help="Max number of videos to process")) -> None:
-    """Fetch latest videos and update local database."""
-    count = workflows.sync_channel(channel, limit=limit)
-    typer.echo(f"[sync] channel={channel} fetched={count}")
+def sync(channel: Optional[str] = typer.Option(None, "--channel", help="Channel handle, e.g. @TheNewsForum"),
+         all_channels: bool = typer.Option(False, "--all", help="Sync every channel in YOUTUBE_CHANNELS concurrently"),
+         workers: Optional[int] = typer.Option(None, "--workers", help="Channels synced at once with --all (default: SYNC_WORKERS)"),
+         limit: int = typer.Option(20, "--limit", help="Max number of videos to process per channel (0 = no limit)"),
+         full: bool = typer.Option(False, "--full", help="Ignore the last-synced watermark and page through all uploads"),
+         refresh_channel: bool = typer.Option(False, "--refresh-channel", help="Resolve the channel handle again instead of using the stored ID")) -> None:
+    """Fetch new videos since the last sync and update local database."""
+    if all_channels:
+        reports = workflows.sync_all_channels(workers=workers, limit=limit, full=full, refresh_channel=refresh_channel)
+    elif channel:
+        reports = [workflows.sync_channel_report(channel, limit=limit, full=full, refresh_channel=refresh_channel)]
+    else:
+        typer.echo("Pass --channel <handle> or --all")
+        raise typer.Exit(code=1)
+    for r in reports:
+        typer.echo(
+            f"[sync] channel={r['channel']} fetched={r['fetched']} new={r['new']} changed={r['changed']} "
+            f"units={r['units']}" + ("" if r["complete"] else " (incomplete)") + (f" error={r['error']}" if r.get("error") else "")
+        )
+    stats = youtube_api.cache_stats()
+    if stats:
+        typer.echo(f"[sync] youtube_cache hits={stats['hits']} misses={stats['misses']}")
 
 
 @app.command()
@@ -38,37 +62,73 @@ def fetch(video_id: str = typer.Option(..., "--video-id", help="YouTube video ID
 def generate(
     limit: int = typer.Option(10, "--limit", help="Max number of pending videos to generate SEO for"),
     priority: str = typer.Option("recent", "--priority", help="Processing priority: recent|oldest|linked"),
-    video_id: str = typer.Option(None, "--video-id", help="Process a specific video by ID (overrides limit/priority)")
+    video_id: str = typer.Option(None, "--video-id", help="Process a specific video by ID (overrides limit/priority)"),
+    workers: int = typer.Option(1, "--workers", help="Number of videos to generate concurrently"),
+    refresh_cache: bool = typer.Option(False, "--refresh-cache", help="Ignore cached LLM responses for --video-id")
 ) -> None:
     """Generate SEO suggestions for pending videos using LLM."""
     if video_id:
         # Process specific video
-        created = workflows.generate_suggestions_for_video(video_id)
+        created = workflows.generate_suggestions_for_video(video_id, refresh_cache=refresh_cache)
         typer.echo(f"[generate] video_id={video_id} created_suggestions={created}")
     else:
         # Process batch by priority
-        created = workflows.generate_suggestions(limit=limit, priority=priority)
-        typer.echo(f"[generate] created_suggestions={created} priority={priority}")
+        created = workflows.generate_suggestions(limit=limit, priority=priority, workers=workers)
+        typer.echo(f"[generate] created_suggestions={created} priority={priority} workers={workers}")
+    
+    stats = get_llm_client().cache_stats()
+    if stats:
+        typer.echo(f"[generate] llm_cache hits={stats['hits']} misses={stats['misses']} entries={stats['entries']}")
 
 
 @app.command()
-def apply(limit: int = typer.Option(10, "--limit", help="Max number of approved videos to apply")) -> None:
-    """Apply approved metadata to YouTube (stubbed API)."""
+def apply(
+    limit: int = typer.Option(10, "--limit", help="Max number of queued videos to apply"),
+    retry_dead: bool = typer.Option(False, "--retry-dead", help="Re-queue dead-lettered videos first"),
+) -> None:
+    """Apply approved suggestions to YouTube through the apply outbox (respects DRY_RUN)."""
+    if retry_dead:
+        conn = dbmod.connect()
+        dbmod.apply_migrations(conn)
+        typer.echo(f"[apply] requeued_dead={apply_outbox.requeue_dead(conn)}")
+        conn.close()
+    dry_run = get_bool_setting("DRY_RUN", True)
+    report = workflows.apply_suggestions_report(limit=limit, dry_run=dry_run)
+    for video_id, result in report["updated"]:
+        typer.echo(f"  updated {video_id}: {', '.join(result['diff'])}")
+    for video_id, result in report["failed"]:
+        typer.echo(f"  failed  {video_id}: {result['error']} (will retry)")
+    for video_id, result in report["dead"]:
+        typer.echo(f"  dead    {video_id}: {result['error']}")
+    typer.echo(
+        f"[apply] updated={len(report['updated'])} unchanged={len(report['unchanged'])} "
+        f"failed={len(report['failed'])} dead={len(report['dead'])} dry_run={len(report['dry_run'])}"
+    )
     conn = dbmod.connect()
-    dbmod.apply_migrations(conn)
-    vids = models.get_videos_by_status(conn, status="approved", limit=limit)
-    applied = 0
-    for v in vids:
-        success = youtube_api.update_video_metadata(v["video_id"], {"title": "Demo"})
-        if success:
-            conn.execute(
-                "INSERT INTO yt_video_applied_changes(video_id, diff_json, applied_at) VALUES(?, ?, datetime('now'))",
-                (v["video_id"], json.dumps({"applied": True})),
-            )
-            models.mark_video_status(conn, v["video_id"], "applied")
-            applied += 1
-    conn.commit()
-    typer.echo(f"[apply] applied={applied}")
+    counts = apply_outbox.outbox_counts(conn)
+    conn.close()
+    typer.echo(f"[apply] outbox queued={counts.get('queued', 0)} dead={counts.get('dead', 0)}")
+
+
+@app.command()
+def rollback(
+    batch: Optional[str] = typer.Option(None, "--batch", help="Apply batch ID printed by apply"),
+    channel: Optional[str] = typer.Option(None, "--channel", help="Only videos of this channel handle"),
+    since: Optional[str] = typer.Option(None, "--since", help="Updates at or after this UTC time (YYYY-MM-DD[ HH:MM:SS])"),
+    until: Optional[str] = typer.Option(None, "--until", help="Updates before this UTC time"),
+) -> None:
+    """Restore videos to their pre-update snapshots (respects DRY_RUN)."""
+    if not (batch or channel or since or until):
+        typer.echo("Select videos with --batch, --channel, --since and/or --until")
+        raise typer.Exit(code=1)
+    dry_run = get_bool_setting("DRY_RUN", True)
+    report = workflows.rollback_report(batch_id=batch, channel_handle=channel, since=since, until=until, dry_run=dry_run)
+    for video_id, result in report["failed"]:
+        typer.echo(f"  failed  {video_id}: {result['error']}")
+    typer.echo(
+        f"[rollback] restored={len(report['updated'])} unchanged={len(report['unchanged'])} "
+        f"failed={len(report['failed'])} dry_run={len(report['dry_run'])}"
+    )
 
 
 @app.command(name="list")
@@ -95,6 +155,72 @@ def list_cmd(
     typer.echo(f"\nTo process a specific video: ytseo generate --video-id <VIDEO_ID>")
 
 
+@app.command()
+def link(
+    channel: Optional[str] = typer.Option(None, "--channel", help="Only link videos from this channel handle"),
+    relink: bool = typer.Option(False, "--relink", help="Re-score videos that already have an episode"),
+    min_confidence: Optional[float] = typer.Option(None, "--min-confidence", help="Override LINKER_MIN_CONFIDENCE"),
+) -> None:
+    """Link YouTube videos to AI-EWG episodes by title, date and guests."""
+    conn = dbmod.connect()
+    dbmod.apply_migrations(conn)
+    report = episode_linker.link_videos(conn, channel_handle=channel, relink=relink, min_confidence=min_confidence)
+    conn.close()
+    for video_id, episode_id, confidence in report["links"]:
+        typer.echo(f"  {video_id} -> {episode_id} ({confidence:.2f})")
+    typer.echo(f"[link] videos={report['videos']} linked={report['linked']}")
+
+
+@app.command(name="watch-episodes")
+def watch_episodes(
+    regenerate: bool = typer.Option(False, "--regenerate", help="Regenerate queued videos after polling"),
+    limit: int = typer.Option(10, "--limit", help="Max queued videos to regenerate"),
+    workers: int = typer.Option(1, "--workers", help="Number of videos to generate concurrently"),
+    interval: int = typer.Option(0, "--interval", help="Keep polling every N seconds (0 = once)"),
+) -> None:
+    """Queue videos whose AI-EWG episode changed, optionally regenerating them."""
+    while True:
+        conn = dbmod.connect()
+        dbmod.apply_migrations(conn)
+        report = ai_ewg_watcher.poll_changes(conn)
+        conn.close()
+        for video_id in report["review"]:
+            typer.echo(f"  review  {video_id}: AI-EWG episode changed after approval")
+        typer.echo(
+            f"[watch-episodes] checked={report['checked']} changed={report['changed']} "
+            f"queued={report['queued']} review={len(report['review'])}"
+        )
+        if regenerate:
+            created = workflows.regenerate_stale(limit=limit, workers=workers)
+            typer.echo(f"[watch-episodes] regenerated={created}")
+        if interval <= 0:
+            break
+        time.sleep(interval)
+
+
+@app.command()
+def quota() -> None:
+    """Show today's YouTube API quota usage (resets at midnight Pacific)."""
+    ledger = youtube_quota.get_quota_ledger()
+    for operation, usage in ledger.usage_by_operation().items():
+        typer.echo(f"  {operation}: {usage['units']} units / {usage['calls']} calls")
+    typer.echo(
+        f"[quota] day={youtube_quota.quota_day()} used={ledger.used()} "
+        f"remaining={ledger.remaining()} limit={ledger.daily_limit}"
+    )
+
+
+@app.command(name="index-episodes")
+def index_episodes(full: bool = typer.Option(False, "--full", help="Re-check every episode even if AI-EWG is unchanged")) -> None:
+    """Refresh the local AI-EWG episode search index."""
+    conn = dbmod.connect()
+    dbmod.apply_migrations(conn)
+    tokenizer = ai_ewg_bridge.refresh_episode_search_index(conn, force=full)
+    count = conn.execute("SELECT COUNT(*) FROM ai_ewg_episodes").fetchone()[0]
+    conn.close()
+    typer.echo(f"[index-episodes] episodes={count} tokenizer={tokenizer or 'unavailable'}")
+
+
 @app.command()
 def download(video_id: str = typer.Option(..., "--video-id", help="YouTube video ID")) -> None:
     """Download audio/video for a video."""
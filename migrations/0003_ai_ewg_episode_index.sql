@@ -0,0 +1,19 @@
+-- Local copy of AI-EWG episode search fields, refreshed incrementally by
+-- ai_ewg_bridge.refresh_episode_search_index(). The FTS5 table over it
+-- (ai_ewg_episodes_fts) is created in code so the tokenizer can fall back
+-- on SQLite builds without trigram support.
+
+CREATE TABLE IF NOT EXISTS ai_ewg_episodes (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  episode_id TEXT UNIQUE,
+  title TEXT,
+  show_name TEXT,
+  date TEXT,
+  guest_names TEXT,
+  signature TEXT
+);
+
+CREATE TABLE IF NOT EXISTS ai_ewg_index_state (
+  key TEXT PRIMARY KEY,
+  value TEXT
+);
@@ -0,0 +1,12 @@
+-- YouTube video -> AI-EWG episode links with match confidence
+-- (written by episode_linker.link_videos; yt_videos.episode_id holds the active link)
+
+CREATE TABLE IF NOT EXISTS yt_episode_links (
+  video_id TEXT PRIMARY KEY,
+  episode_id TEXT,
+  confidence REAL,
+  method TEXT,
+  linked_at TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_episode_links_episode ON yt_episode_links(episode_id);
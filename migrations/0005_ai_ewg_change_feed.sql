@@ -0,0 +1,15 @@
+-- AI-EWG change feed (ai_ewg_watcher.poll_changes): last seen content hash per
+-- linked episode, and the videos whose suggestions went stale because of it.
+
+CREATE TABLE IF NOT EXISTS ai_ewg_episode_state (
+  episode_id TEXT PRIMARY KEY,
+  content_hash TEXT,
+  checked_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS yt_regen_queue (
+  video_id TEXT PRIMARY KEY,
+  episode_id TEXT,
+  reason TEXT,
+  queued_at TEXT
+);
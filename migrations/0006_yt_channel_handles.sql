@@ -0,0 +1,10 @@
+-- Persisted @handle -> channel resolution (youtube_api.get_channel), so the
+-- lookup (up to 100 quota units via search) runs once per handle.
+
+CREATE TABLE IF NOT EXISTS yt_channel_handles (
+  handle TEXT PRIMARY KEY,
+  channel_id TEXT,
+  title TEXT,
+  uploads_playlist_id TEXT,
+  resolved_at TEXT
+);
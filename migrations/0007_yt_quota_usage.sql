@@ -0,0 +1,10 @@
+-- YouTube Data API quota spent per quota day (midnight Pacific reset) and
+-- operation; written by youtube_quota.QuotaLedger.
+
+CREATE TABLE IF NOT EXISTS yt_quota_usage (
+  day TEXT,
+  operation TEXT,
+  units INTEGER,
+  calls INTEGER,
+  PRIMARY KEY (day, operation)
+);
@@ -0,0 +1,16 @@
+-- Durable queue of approved changes waiting to be applied to YouTube; one
+-- entry per video, drained by workflows.apply_suggestions_report.
+-- status: queued | done | dead. Timestamps are UTC, datetime('now') format.
+
+CREATE TABLE IF NOT EXISTS yt_apply_outbox (
+  video_id TEXT PRIMARY KEY,
+  changes_json TEXT,
+  status TEXT,
+  attempts INTEGER DEFAULT 0,
+  next_attempt_at TEXT,
+  last_error TEXT,
+  created_at TEXT,
+  updated_at TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_yt_apply_outbox_due ON yt_apply_outbox(status, next_attempt_at);
@@ -0,0 +1,14 @@
+-- Pre-update snippet (title, description, tags) of every video update, as
+-- zlib-compressed JSON, grouped by apply batch; read by `ytseo rollback`.
+
+CREATE TABLE IF NOT EXISTS yt_video_snapshots (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  batch_id TEXT,
+  video_id TEXT,
+  snippet_z BLOB,
+  created_at TEXT,
+  rolled_back_at TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_yt_video_snapshots_batch ON yt_video_snapshots(batch_id);
+CREATE INDEX IF NOT EXISTS idx_yt_video_snapshots_video ON yt_video_snapshots(video_id, created_at);
@@ -0,0 +1,15 @@
+-- Progress of an unfinished channel sync pass (workflows.sync_channel_report):
+-- the uploads-playlist page token to continue from and how many videos of
+-- that page are already stored (page_offset, for passes cut by --limit),
+-- plus the watermark the pass runs down to and the newest published_at
+-- seen so far. Deleted when the pass completes; a later sync with the same
+-- watermark resumes there.
+
+CREATE TABLE IF NOT EXISTS yt_sync_checkpoints (
+  channel_id TEXT PRIMARY KEY,
+  since TEXT,
+  page_token TEXT,
+  page_offset INTEGER DEFAULT 0,
+  newest TEXT,
+  updated_at TEXT
+);
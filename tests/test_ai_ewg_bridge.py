@@ -0,0 +1,246 @@
+import json
+import os
+import sqlite3
+import threading
+
+import pytest
+
+from ytseo import ai_ewg_bridge
+from ytseo import db as dbmod
+
+
+def _make_ai_ewg_db(path, episodes):
+    conn = sqlite3.connect(str(path))
+    conn.executescript(
+        """
+        CREATE TABLE json_metadata_index (
+          episode_id TEXT PRIMARY KEY, title TEXT, duration_seconds INTEGER,
+          show_name TEXT, date TEXT, guest_names TEXT, topics TEXT,
+          has_transcript INTEGER, has_enrichment INTEGER, has_editorial INTEGER
+        );
+        CREATE TABLE episodes (id TEXT PRIMARY KEY, metadata TEXT);
+        """
+    )
+    for ep in episodes:
+        conn.execute(
+            "INSERT INTO json_metadata_index VALUES(?, ?, 0, ?, ?, ?, ?, 0, 1, 0)",
+            (ep["id"], ep["title"], ep.get("show_name", ""), ep.get("date", ""),
+             json.dumps(ep.get("guests", [])), json.dumps(ep.get("topics", []))),
+        )
+        conn.execute(
+            "INSERT INTO episodes VALUES(?, ?)",
+            (ep["id"], json.dumps({"enrichment": {"summary": ep.get("summary", "")}})),
+        )
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def ai_ewg_db(tmp_path, monkeypatch):
+    path = tmp_path / "pipeline.db"
+    _make_ai_ewg_db(path, [
+        {"id": "ep1", "title": "Carbon tax debate", "show_name": "Forum", "guests": ["Jane Doe"], "summary": "Taxes"},
+        {"id": "ep2", "title": "Housing market outlook", "show_name": "Forum", "topics": ["housing"]},
+    ])
+    monkeypatch.setenv("AI_EWG_DB_PATH", str(path))
+    ai_ewg_bridge._episode_cache.clear()
+    yield path
+    ai_ewg_bridge.close_ai_ewg_connection()
+    ai_ewg_bridge._episode_cache.clear()
+
+
+def test_get_episode_by_id_is_memoized(ai_ewg_db, monkeypatch):
+    calls = []
+    real_fetch = ai_ewg_bridge._fetch_episode
+    monkeypatch.setattr(ai_ewg_bridge, "_fetch_episode", lambda eid: calls.append(eid) or real_fetch(eid))
+
+    first = ai_ewg_bridge.get_episode_by_id("ep1")
+    second = ai_ewg_bridge.get_episode_by_id("ep1")
+    assert first["summary"] == "Taxes"
+    assert second == first
+    assert ai_ewg_bridge.get_episode_by_id("missing") is None
+    assert ai_ewg_bridge.get_episode_by_id("missing") is None
+    assert calls == ["ep1", "missing"]
+
+
+def test_episode_cache_invalidated_when_db_changes(ai_ewg_db):
+    assert ai_ewg_bridge.get_episode_by_id("ep1")["title"] == "Carbon tax debate"
+
+    conn = sqlite3.connect(str(ai_ewg_db))
+    conn.execute("UPDATE json_metadata_index SET title='Carbon tax explained' WHERE episode_id='ep1'")
+    conn.commit()
+    conn.close()
+    st = os.stat(ai_ewg_db)
+    os.utime(ai_ewg_db, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    assert ai_ewg_bridge.get_episode_by_id("ep1")["title"] == "Carbon tax explained"
+
+
+def test_get_episodes_by_ids_batches_and_fills_cache(ai_ewg_db, monkeypatch):
+    episodes = ai_ewg_bridge.get_episodes_by_ids(["ep1", "ep2", "missing", None, "ep1"], chunk_size=1)
+    assert set(episodes) == {"ep1", "ep2"}
+    assert episodes["ep1"]["guest_names"] == ["Jane Doe"]
+    assert episodes["ep2"]["topics"] == ["housing"]
+
+    # Everything (including the miss) is now served from the cache
+    monkeypatch.setattr(ai_ewg_bridge, "_fetch_episode", lambda eid: pytest.fail("cache miss"))
+    assert ai_ewg_bridge.get_episode_by_id("ep2")["title"] == "Housing market outlook"
+    assert ai_ewg_bridge.get_episode_by_id("missing") is None
+
+
+def test_connection_reused_and_reopened_when_file_replaced(ai_ewg_db, tmp_path):
+    conn = ai_ewg_bridge._connect_ai_ewg()
+    assert ai_ewg_bridge._connect_ai_ewg() is conn
+    assert conn.execute("PRAGMA query_only").fetchone()[0] == 1
+
+    replacement = tmp_path / "new.db"
+    _make_ai_ewg_db(replacement, [{"id": "ep9", "title": "Replaced archive"}])
+    os.replace(replacement, ai_ewg_db)
+
+    new_conn = ai_ewg_bridge._connect_ai_ewg()
+    assert new_conn is not conn
+    assert ai_ewg_bridge.get_episode_by_id("ep9")["title"] == "Replaced archive"
+
+
+def test_search_uses_local_index_and_refreshes_incrementally(ai_ewg_db, tmp_path, monkeypatch):
+    from ytseo import db as dbmod
+
+    monkeypatch.setenv("DB_PATH", str(tmp_path / "ytseo.sqlite"))
+    # Before the index exists, search falls back to scanning AI-EWG
+    assert [r["episode_id"] for r in ai_ewg_bridge.search_episodes_by_title("carbon")] == ["ep1"]
+
+    index = dbmod.connect()
+    dbmod.apply_migrations(index)
+    ai_ewg_bridge.refresh_episode_search_index(index)
+    monkeypatch.setattr(ai_ewg_bridge, "_search_episodes_like", lambda title, limit: pytest.fail("index not used"))
+
+    results = ai_ewg_bridge.search_episodes_by_title("carbon")
+    assert [r["episode_id"] for r in results] == ["ep1"]
+    assert [r["episode_id"] for r in ai_ewg_bridge.search_episodes_by_title("jane")] == ["ep1"]
+    assert ai_ewg_bridge.search_episodes_by_title("nothing matches") == []
+
+    conn = sqlite3.connect(str(ai_ewg_db))
+    conn.execute("UPDATE json_metadata_index SET title='Rental market outlook' WHERE episode_id='ep2'")
+    conn.commit()
+    conn.close()
+    st = os.stat(ai_ewg_db)
+    os.utime(ai_ewg_db, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    # Searching never refreshes; the next refresh picks the change up
+    assert ai_ewg_bridge.search_episodes_by_title("rental") == []
+    ai_ewg_bridge.refresh_episode_search_index(index)
+    index.close()
+    assert [r["episode_id"] for r in ai_ewg_bridge.search_episodes_by_title("rental")] == ["ep2"]
+    assert ai_ewg_bridge.search_episodes_by_title("housing") == []
+
+
+def test_episode_linker_links_matching_videos(ai_ewg_db, tmp_path, monkeypatch):
+    from ytseo import db as dbmod
+    from ytseo import episode_linker, models
+
+    monkeypatch.setenv("DB_PATH", str(tmp_path / "ytseo.sqlite"))
+    conn = dbmod.connect()
+    dbmod.apply_migrations(conn)
+    models.upsert_video(conn, video_id="v1", channel_id="c", title_original="The Carbon Tax Debate",
+                        description_original="With guest Jane Doe", tags_original=[], published_at="2024-01-01",
+                        episode_id=None, status="pending")
+    models.upsert_video(conn, video_id="v2", channel_id="c", title_original="Weekend cooking special",
+                        description_original="", tags_original=[], published_at="2024-01-01",
+                        episode_id=None, status="pending")
+
+    report = episode_linker.link_videos(conn)
+    assert report["videos"] == 2
+    assert [(v, e) for v, e, _ in report["links"]] == [("v1", "ep1")]
+    assert conn.execute("SELECT episode_id FROM yt_videos WHERE video_id='v1'").fetchone()[0] == "ep1"
+    assert conn.execute("SELECT confidence FROM yt_episode_links WHERE video_id='v1'").fetchone()[0] >= 0.55
+
+    # Videos are read in chunks; linking across chunk boundaries gives the same result
+    report = episode_linker.link_videos(conn, relink=True, chunk_size=1)
+    assert report["videos"] == 2
+    assert [(v, e) for v, e, _ in report["links"]] == [("v1", "ep1")]
+
+    # Re-syncing without an episode_id keeps the link
+    models.upsert_video(conn, video_id="v1", channel_id="c", title_original="The Carbon Tax Debate",
+                        description_original="", tags_original=[], published_at="2024-01-01",
+                        episode_id=None, status="pending")
+    conn.close()
+    assert ai_ewg_bridge.get_episode_for_youtube_video("v1")["episode_id"] == "ep1"
+    assert ai_ewg_bridge.get_episode_for_youtube_video("v2") is None
+
+
+def test_change_feed_queues_only_videos_of_changed_episodes(ai_ewg_db, tmp_path, monkeypatch):
+    from ytseo import ai_ewg_watcher
+    from ytseo import db as dbmod
+    from ytseo import models
+
+    monkeypatch.setenv("DB_PATH", str(tmp_path / "ytseo.sqlite"))
+    conn = dbmod.connect()
+    dbmod.apply_migrations(conn)
+    for vid, eid, status in (("v1", "ep1", "suggested"), ("v2", "ep2", "suggested"), ("v3", "ep1", "approved")):
+        models.upsert_video(conn, video_id=vid, title_original=vid, episode_id=eid, status=status)
+
+    assert ai_ewg_watcher.poll_changes(conn) == {"checked": 2, "changed": 0, "queued": 0, "review": []}
+    # Unchanged file: nothing is read at all
+    assert ai_ewg_watcher.poll_changes(conn)["checked"] == 0
+
+    source = sqlite3.connect(str(ai_ewg_db))
+    source.execute("UPDATE episodes SET metadata=? WHERE id='ep1'",
+                   (json.dumps({"enrichment": {"summary": "New summary"}, "transcript": "..."}),))
+    source.commit()
+    source.close()
+    st = os.stat(ai_ewg_db)
+    os.utime(ai_ewg_db, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    report = ai_ewg_watcher.poll_changes(conn)
+    assert report["changed"] == 1 and report["queued"] == 1
+    # The approved video keeps its status and is only reported
+    assert report["review"] == ["v3"]
+    assert [r[0] for r in conn.execute("SELECT video_id FROM yt_regen_queue")] == ["v1"]
+    conn.close()
+
+
+def test_episode_enrichment_extracted_without_full_metadata(ai_ewg_db):
+    conn = sqlite3.connect(str(ai_ewg_db))
+    conn.execute("UPDATE episodes SET metadata=? WHERE id='ep1'", (json.dumps({
+        "enrichment": {"summary": "Taxes", "entities": ["Ottawa"], "key_moments": [{"t": 10}]},
+        "transcript": "x" * 10000,
+    }),))
+    conn.execute("UPDATE episodes SET metadata='not json' WHERE id='ep2'")
+    conn.commit()
+    conn.close()
+
+    episode = ai_ewg_bridge.get_episode_by_id("ep1")
+    assert episode["entities"] == ["Ottawa"] and episode["key_moments"] == [{"t": 10}]
+    assert "full_metadata" not in episode
+    assert ai_ewg_bridge.get_episode_by_id("ep1", full_metadata=True)["full_metadata"]["transcript"] == "x" * 10000
+    assert "full_metadata" not in ai_ewg_bridge.get_episode_by_id("ep1")
+    assert "summary" not in ai_ewg_bridge.get_episodes_by_ids(["ep2"])["ep2"]
+
+
+def test_concurrent_index_refreshes_do_not_collide(ai_ewg_db, tmp_path):
+    db_file = str(tmp_path / "ytseo.sqlite")
+    conn = sqlite3.connect(db_file)
+    dbmod.apply_migrations(conn)
+    conn.close()
+
+    errors = []
+
+    def refresh():
+        own = sqlite3.connect(db_file, timeout=10)
+        try:
+            ai_ewg_bridge.refresh_episode_search_index(own, force=True)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            own.close()
+
+    threads = [threading.Thread(target=refresh) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    conn = sqlite3.connect(db_file)
+    assert conn.execute("SELECT COUNT(*) FROM ai_ewg_episodes").fetchone()[0] == 2
+    assert conn.execute("SELECT COUNT(*) FROM ai_ewg_episodes_fts").fetchone()[0] == 2
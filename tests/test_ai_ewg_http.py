@@ -0,0 +1,93 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+pytest.importorskip("requests")
+
+from ytseo.ai_ewg_http import AIEWGHttpClient
+
+
+EPISODES = {"ep1": {"episode_id": "ep1", "title": "Carbon tax debate"}, "ep2": {"episode_id": "ep2", "title": "Housing"}}
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    requests_seen = []
+
+    def do_GET(self):
+        self.requests_seen.append((self.path, self.headers.get("If-None-Match")))
+        if self.path.startswith("/episodes?ids="):
+            ids = self.path.split("=", 1)[1].replace("%2C", ",").split(",")
+            if "garbled" in ids:
+                self._send(200, None, raw=b"<html>proxy error</html>")
+                return
+            self._send(200, {"episodes": [EPISODES[i] for i in ids if i in EPISODES]})
+            return
+        eid = self.path.rsplit("/", 1)[-1]
+        if eid not in EPISODES:
+            self._send(404, {})
+        elif self.headers.get("If-None-Match") == f'"{eid}-v1"':
+            self.send_response(304)
+            self.end_headers()
+        else:
+            self._send(200, EPISODES[eid], etag=f'"{eid}-v1"')
+
+    def _send(self, status, body, etag=None, raw=None):
+        data = raw if raw is not None else json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    _StubHandler.requests_seen = []
+    server = HTTPServer(("127.0.0.1", 0), _StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+
+
+def test_http_client_caches_and_revalidates(stub_server, tmp_path):
+    client = AIEWGHttpClient(stub_server, str(tmp_path / "cache.sqlite"), ttl_seconds=0)
+    assert client.get_episode("ep1")["title"] == "Carbon tax debate"
+    assert client.get_episode("ep1")["title"] == "Carbon tax debate"
+    assert _StubHandler.requests_seen[-1] == ("/episodes/ep1", '"ep1-v1"')
+    assert client.get_episode("missing") is None
+    client.close()
+
+
+def test_http_client_batches_and_serves_fresh_entries_locally(stub_server, tmp_path):
+    client = AIEWGHttpClient(stub_server, str(tmp_path / "cache.sqlite"), ttl_seconds=300)
+    assert set(client.get_episodes(["ep1", "ep2", "missing"])) == {"ep1", "ep2"}
+    assert len(_StubHandler.requests_seen) == 1
+    assert client.get_episode("ep2")["title"] == "Housing"
+    assert len(_StubHandler.requests_seen) == 1
+    client.close()
+
+
+def test_http_client_revalidates_expired_batch_entries_singly(stub_server, tmp_path):
+    client = AIEWGHttpClient(stub_server, str(tmp_path / "cache.sqlite"), ttl_seconds=0)
+    assert set(client.get_episodes(["ep1"])) == {"ep1"}
+    # Expired batch entry: refetched singly, which stores its ETag ...
+    assert client.get_episodes(["ep1"])["ep1"]["title"] == "Carbon tax debate"
+    assert _StubHandler.requests_seen[-1] == ("/episodes/ep1", None)
+    # ... so from then on it is revalidated with a 304
+    assert client.get_episodes(["ep1"])["ep1"]["title"] == "Carbon tax debate"
+    assert _StubHandler.requests_seen[-1] == ("/episodes/ep1", '"ep1-v1"')
+    client.close()
+
+
+def test_http_client_survives_malformed_batch_response(stub_server, tmp_path):
+    client = AIEWGHttpClient(stub_server, str(tmp_path / "cache.sqlite"), ttl_seconds=300)
+    assert client.get_episodes(["garbled"]) == {}
+    client.close()
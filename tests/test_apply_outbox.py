@@ -0,0 +1,84 @@
+import sqlite3
+
+import pytest
+
+from ytseo import apply_outbox
+from ytseo import db as dbmod
+from ytseo import models
+
+
+@pytest.fixture
+def conn(tmp_path, monkeypatch):
+    monkeypatch.setenv("APPLY_MAX_ATTEMPTS", "3")
+    conn = sqlite3.connect(str(tmp_path / "ytseo.sqlite"))
+    dbmod.apply_migrations(conn)
+    for video_id in ("v1", "v2"):
+        models.upsert_video(conn, video_id, title_original=video_id, status="approved")
+        models.create_suggestion(conn, video_id, "en", f"New {video_id}", "desc", ["a"], [], "", "", [])
+    return conn
+
+
+def _status(conn, video_id):
+    return conn.execute(
+        "SELECT status, attempts, last_error, next_attempt_at > datetime('now') FROM yt_apply_outbox WHERE video_id=?",
+        (video_id,),
+    ).fetchone()
+
+
+def test_enqueue_is_idempotent_and_due_items_returns_changes(conn):
+    assert apply_outbox.enqueue_approved(conn) == 2
+    assert apply_outbox.enqueue_approved(conn) == 0
+    due = apply_outbox.due_items(conn, limit=10)
+    assert due["v1"] == {"title": "New v1", "description": "desc", "tags": ["a"]}
+
+
+def test_failures_back_off_then_dead_letter(conn):
+    apply_outbox.enqueue_approved(conn)
+    failure = {"status": "failed", "diff": None, "error": "HttpError 500", "quota_exhausted": False}
+
+    assert apply_outbox.record_result(conn, "v1", failure) == "queued"
+    assert _status(conn, "v1") == ("queued", 1, "HttpError 500", 1)
+    assert "v1" not in apply_outbox.due_items(conn, limit=10)
+
+    apply_outbox.record_result(conn, "v1", failure)
+    assert apply_outbox.record_result(conn, "v1", failure) == "dead"
+    assert _status(conn, "v1")[:3] == ("dead", 3, "HttpError 500")
+    # Dead entries are not re-enqueued while the video stays approved
+    assert apply_outbox.enqueue_approved(conn) == 0
+
+    assert apply_outbox.requeue_dead(conn) == 1
+    assert _status(conn, "v1")[:2] == ("queued", 0)
+
+
+def test_quota_exhaustion_waits_for_next_day_without_using_an_attempt(conn):
+    apply_outbox.enqueue_approved(conn)
+    result = {"status": "failed", "diff": None, "error": "quota", "quota_exhausted": True}
+    assert apply_outbox.record_result(conn, "v2", result) == "queued"
+    assert _status(conn, "v2") == ("queued", 0, "quota", 1)
+
+
+def test_success_marks_video_applied_and_stores_diff(conn):
+    apply_outbox.enqueue_approved(conn)
+    diff = {"title": {"old": "v1", "new": "New v1"}}
+    assert apply_outbox.record_result(conn, "v1", {"status": "updated", "diff": diff, "error": None}) == "done"
+    assert conn.execute("SELECT status FROM yt_videos WHERE video_id='v1'").fetchone()[0] == "applied"
+    assert conn.execute("SELECT COUNT(*) FROM yt_video_applied_changes WHERE video_id='v1'").fetchone()[0] == 1
+    assert apply_outbox.outbox_counts(conn) == {"done": 1, "queued": 1}
+
+
+def test_dry_run_leaves_entry_queued_and_video_approved(conn):
+    apply_outbox.enqueue_approved(conn)
+    assert apply_outbox.record_result(conn, "v1", {"status": "dry_run", "diff": None, "error": None}) == "queued"
+    assert _status(conn, "v1")[:2] == ("queued", 0)
+    assert conn.execute("SELECT status FROM yt_videos WHERE video_id='v1'").fetchone()[0] == "approved"
+    assert "v1" in apply_outbox.due_items(conn, limit=10)
+
+
+def test_due_items_use_latest_suggestion_and_drop_unapproved_videos(conn):
+    apply_outbox.enqueue_approved(conn)
+    models.create_suggestion(conn, "v1", "en", "Regenerated v1", "desc 2", ["b"], [], "", "", [])
+    models.mark_video_status(conn, "v2", "suggested")
+
+    due = apply_outbox.due_items(conn, limit=10)
+    assert due == {"v1": {"title": "Regenerated v1", "description": "desc 2", "tags": ["b"]}}
+    assert apply_outbox.outbox_counts(conn) == {"queued": 1}
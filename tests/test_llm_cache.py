@@ -0,0 +1,31 @@
+from ytseo.llm_cache import LLMCache
+
+
+def test_cache_hit_miss_and_lru_eviction(tmp_path):
+    cache = LLMCache(str(tmp_path / "cache.sqlite"), max_entries=2)
+    k1 = LLMCache.make_key(prompt="a", temperature=0.7)
+    k2 = LLMCache.make_key(prompt="b", temperature=0.7)
+    k3 = LLMCache.make_key(prompt="c", temperature=0.7)
+
+    assert cache.get(k1) is None
+    cache.put(k1, "one")
+    cache.put(k2, "two")
+    assert cache.get(k1) == "one"  # touch k1 so k2 is least recent
+
+    cache.put(k3, "three")
+    assert cache.get(k2) is None
+    assert cache.get(k3) == "three"
+
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 2
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 2
+
+
+def test_cache_ttl_expiry(tmp_path):
+    cache = LLMCache(str(tmp_path / "cache.sqlite"), ttl_seconds=1)
+    key = LLMCache.make_key(prompt="x")
+    cache.put(key, "value")
+    cache._conn.execute("UPDATE llm_cache SET created_at = created_at - 10")
+    assert cache.get(key) is None
@@ -0,0 +1,68 @@
+import asyncio
+import threading
+
+import pytest
+import requests
+
+from ytseo.llm_client import AsyncLLMClient, LLMClient
+
+
+class FakeResponse:
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"message": {"content": '"Pooled answer"'}}
+
+
+def test_session_is_shared_pooled_and_reused_for_retries(monkeypatch):
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "false")
+    monkeypatch.setenv("LLM_POOL_SIZE", "4")
+    client = LLMClient()
+
+    sessions = []
+    threads = [threading.Thread(target=lambda: sessions.append(client.session)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len({id(s) for s in sessions}) == 1
+    adapter = client.session.get_adapter("http://localhost:11434")
+    assert adapter._pool_maxsize == 4 and adapter._pool_block
+
+    calls = []
+
+    def post(url, json=None, timeout=None, **kwargs):
+        calls.append(timeout)
+        if len(calls) == 1:
+            raise requests.exceptions.ConnectionError("reset")
+        return FakeResponse()
+
+    monkeypatch.setattr(client.session, "post", post)
+    assert client.generate("prompt", "system") == "Pooled answer"
+    assert calls == [client.timeout, client.timeout]
+
+    client.close()
+    assert client._session is None
+
+
+def test_async_client_closes_http_client_of_previous_loop(monkeypatch):
+    pytest.importorskip("httpx")
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "false")
+    client = AsyncLLMClient()
+
+    async def http_client():
+        http, _, _ = client._loop_state()
+        return http
+
+    first = asyncio.run(http_client())
+
+    async def second_run():
+        http = await http_client()
+        await client._stale_close
+        return http
+
+    second = asyncio.run(second_run())
+    assert second is not first
+    assert first.is_closed
+    assert not second.is_closed
@@ -0,0 +1,43 @@
+import sqlite3
+
+from ytseo import db as dbmod
+from ytseo import models
+
+
+def test_upsert_videos_keeps_status_and_episode_and_checkpoints_round_trip(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "ytseo.sqlite"))
+    dbmod.apply_migrations(conn)
+    models.upsert_video(conn, "v1", channel_id="c1", title_original="Old", episode_id="ep1", status="approved")
+
+    page = [
+        {"video_id": "v1", "channel_id": "c1", "title_original": "New", "tags_original": ["a"], "status": "pending"},
+        {"video_id": "v2", "channel_id": "c1", "title_original": "Two", "status": "pending"},
+    ]
+    models.upsert_videos(conn, page, channel_handle="@chan", commit=False)
+    models.save_sync_checkpoint(conn, "c1", None, "TOKEN2", 0, "2024-07-01T00:00:00Z")
+    conn.commit()
+
+    rows = conn.execute("SELECT video_id, title_original, tags_original, episode_id, status FROM yt_videos ORDER BY video_id")
+    assert rows.fetchall() == [("v1", "New", '["a"]', "ep1", "approved"), ("v2", "Two", "[]", None, "pending")]
+    assert models.get_sync_checkpoint(conn, "c1") == {
+        "since": None, "page_token": "TOKEN2", "page_offset": 0, "newest": "2024-07-01T00:00:00Z"
+    }
+
+    models.clear_sync_checkpoint(conn, "c1")
+    assert models.get_sync_checkpoint(conn, "c1") is None
+
+
+def test_channel_id_for_handle_uses_only_local_data(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "ytseo.sqlite"))
+    dbmod.apply_migrations(conn)
+    conn.execute(
+        "INSERT INTO yt_channel_handles(handle, channel_id, title, uploads_playlist_id, resolved_at) "
+        "VALUES('resolved', 'c1', 'One', 'UU1', datetime('now'))"
+    )
+    assert models.get_channel_id_for_handle(conn, "@Resolved") == "c1"
+    assert models.get_channel_id_for_handle(conn, "@synced") is None
+
+    conn.execute("ALTER TABLE yt_videos ADD COLUMN channel_handle TEXT")
+    models.upsert_video(conn, "v1", channel_id="c2", channel_handle="@Synced", status="pending")
+    assert models.get_channel_id_for_handle(conn, "synced") == "c2"
+    assert models.get_channel_id_for_handle(conn, "@unknown") is None
@@ -0,0 +1,105 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ytseo import seo_engine
+
+
+def test_parallel_fields_fall_back_on_error_and_timeout(monkeypatch, capsys):
+    release = threading.Event()
+
+    def fail(context):
+        raise RuntimeError("boom")
+
+    def hang(context):
+        release.wait(5)
+        return "late"
+
+    generators = {field: (lambda context, f=field: f"ok-{f}") for field in seo_engine.FIELD_GENERATORS}
+    generators["tags"] = fail
+    generators["title"] = hang
+    monkeypatch.setattr(seo_engine, "FIELD_GENERATORS", generators)
+
+    context = {"title": "Housing costs explained", "description": "", "episode_data": {}}
+    try:
+        result = seo_engine.generate_fields_concurrently(context, timeout=0.2)
+    finally:
+        release.set()
+
+    assert list(result) == list(generators)
+    assert result["description"] == "ok-description"
+    assert result["title"] != "late"
+    assert isinstance(result["tags"], list)
+
+    out = capsys.readouterr().out
+    assert "Timed out generating title" in out
+    assert "Error generating tags: boom" in out
+    assert "Timed out generating tags" not in out
+
+
+def test_parallel_field_timeout_starts_when_the_field_runs(monkeypatch, capsys):
+    monkeypatch.setattr(seo_engine, "_field_pool", ThreadPoolExecutor(max_workers=1))
+
+    def slow(context):
+        time.sleep(0.1)
+        return "generated"
+
+    monkeypatch.setattr(seo_engine, "FIELD_GENERATORS", {field: slow for field in seo_engine.FIELD_GENERATORS})
+    result = seo_engine.generate_fields_concurrently({"episode_data": {}}, timeout=0.25)
+    assert set(result.values()) == {"generated"}
+    assert "Timed out" not in capsys.readouterr().out
+
+
+def test_parallel_fields_refuse_an_all_fallback_suggestion(monkeypatch):
+    def fail(context):
+        raise RuntimeError("LLM down")
+
+    monkeypatch.setattr(seo_engine, "FIELD_GENERATORS", {field: fail for field in seo_engine.FIELD_GENERATORS})
+    with pytest.raises(RuntimeError):
+        seo_engine.generate_fields_concurrently({"title_original": "T", "episode_data": {}}, timeout=1)
+
+
+class FakeLLM:
+    def __init__(self, combined):
+        self.combined = combined
+        self.calls = []
+
+    def generate(self, prompt, system_prompt=None, max_tokens=500, temperature=0.7, json_schema=None, refresh_cache=False):
+        self.calls.append("combined" if json_schema else system_prompt)
+        return self.combined if json_schema else "A regenerated description."
+
+
+def test_combined_mode_keeps_valid_fields_and_regenerates_the_rest(monkeypatch):
+    combined = json.dumps({
+        "title": '"Why rents keep rising in Toronto"',
+        "description": "Too short.",
+        "tags": ["rent", "housing", "toronto", "canada", "economy", "interest rates"],
+        "hashtags": ["#Housing", "#Toronto"],
+        "thumbnail_text": ["RENTS UP", "WHY?"],
+        "pinned_comment": "  What is your rent doing?  ",
+    })
+    llm = FakeLLM(combined)
+    monkeypatch.setattr(seo_engine, "get_llm_client", lambda: llm)
+
+    context = {"title_original": "Rents", "description_original": "", "tags_original": ["news"], "episode_data": {}}
+    result = seo_engine.generate_all_fields(context)
+
+    assert list(result) == list(seo_engine.FIELD_GENERATORS)
+    assert result["title"] == "Why rents keep rising in Toronto"
+    assert result["description"] == "A regenerated description."
+    assert "news" in result["tags"] and "housing" in result["tags"]
+    assert result["pinned_comment"] == "What is your rent doing?"
+    assert llm.calls == ["combined", seo_engine.DESCRIPTION_SYSTEM_PROMPT]
+
+
+def test_combined_mode_falls_back_per_field_on_invalid_json(monkeypatch):
+    llm = FakeLLM("not json")
+    monkeypatch.setattr(seo_engine, "get_llm_client", lambda: llm)
+
+    context = {"title_original": "Rents", "description_original": "", "tags_original": [], "episode_data": {}}
+    seo_engine.generate_all_fields(context)
+    assert llm.calls[0] == "combined"
+    assert len(llm.calls) == 1 + len(seo_engine.FIELD_GENERATORS)
@@ -0,0 +1,35 @@
+import sqlite3
+
+import pytest
+
+from ytseo import db as dbmod
+from ytseo import snapshots
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "ytseo.sqlite"))
+    dbmod.apply_migrations(conn)
+    return conn
+
+
+def test_pack_snippet_round_trips_editable_fields():
+    snippet = {"title": "Title", "description": "é" * 5000, "tags": ["a", "b"], "categoryId": "25"}
+    blob = snapshots.pack_snippet(snippet)
+    assert len(blob) < 200
+    assert snapshots.unpack_snippet(blob) == {"title": "Title", "description": "é" * 5000, "tags": ["a", "b"]}
+
+
+def test_snapshots_select_earliest_per_video_and_skip_rolled_back(conn):
+    snapshots.save_snapshots(conn, "apply-1", {"v1": {"title": "Old v1", "tags": ["x"]}, "v2": {"title": "Old v2"}})
+    snapshots.save_snapshots(conn, "apply-2", {"v1": {"title": "Newer v1", "description": "d"}})
+    snapshots.save_snapshots(conn, "rollback-1", {"v2": {"title": "New v2"}})
+
+    selected = snapshots.select_snapshots(conn, since="2000-01-01")
+    assert selected["v1"]["snippet"] == {"title": "Old v1", "description": "", "tags": ["x"]}
+    assert len(selected["v1"]["ids"]) == 2
+    assert selected["v2"]["snippet"]["title"] == "Old v2"
+    assert set(snapshots.select_snapshots(conn, batch_id="apply-2")) == {"v1"}
+
+    snapshots.mark_rolled_back(conn, selected["v1"]["ids"])
+    assert set(snapshots.select_snapshots(conn)) == {"v2"}
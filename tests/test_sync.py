@@ -0,0 +1,192 @@
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("googleapiclient")
+
+from ytseo import workflows, youtube_api  # noqa: E402
+
+UPLOADS = [
+    {
+        "video_id": f"v{i:03d}",
+        "channel_id": "c1",
+        "title_original": f"Video {i}",
+        "description_original": "",
+        "tags_original": [],
+        "published_at": (datetime(2024, 7, 1) - timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "status": "pending",
+        "episode_id": None,
+    }
+    for i in range(120)
+]
+
+
+def _fake_pages(channel, since=None, page_token=None, uploads=UPLOADS):
+    """Uploads playlist newest first, 50 per page; page tokens are offsets."""
+    start = int(page_token or 0)
+    for offset in range(start, len(uploads), 50):
+        page = [v for v in uploads[offset:offset + 50] if not since or v["published_at"] > since]
+        reached = len(page) < len(uploads[offset:offset + 50])
+        next_token = None if reached or offset + 50 >= len(uploads) else str(offset + 50)
+        if page:
+            yield [dict(v) for v in page], next_token
+        if not next_token:
+            return
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = tmp_path / "ytseo.sqlite"
+    monkeypatch.setenv("DB_PATH", str(path))
+    monkeypatch.setenv("AUTO_LINK_EPISODES", "false")
+    monkeypatch.setattr(
+        youtube_api, "get_channel",
+        lambda handle, refresh=False: {"handle": handle, "channel_id": "c1", "title": "Chan", "uploads_playlist_id": "UU1"},
+    )
+    monkeypatch.setattr(youtube_api, "iter_channel_videos", _fake_pages)
+    return path
+
+
+def test_limited_syncs_resume_inside_the_page_until_the_pass_completes(db_path):
+    first = workflows.sync_channel_report("@chan", limit=20)
+    second = workflows.sync_channel_report("@chan", limit=20)
+    assert (first["fetched"], first["new"], first["complete"]) == (20, 20, False)
+    assert (second["fetched"], second["new"], second["complete"]) == (20, 20, False)
+
+    conn = sqlite3.connect(str(db_path))
+    assert conn.execute("SELECT last_synced FROM yt_channels").fetchone()[0] is None
+    assert [r[0] for r in conn.execute("SELECT video_id FROM yt_videos ORDER BY video_id")] == [
+        f"v{i:03d}" for i in range(40)
+    ]
+
+    rest = workflows.sync_channel_report("@chan", limit=0)
+    assert (rest["fetched"], rest["new"], rest["complete"]) == (80, 80, True)
+    assert conn.execute("SELECT COUNT(*) FROM yt_videos").fetchone()[0] == 120
+    assert conn.execute("SELECT last_synced FROM yt_channels").fetchone()[0] == UPLOADS[0]["published_at"]
+    assert conn.execute("SELECT COUNT(*) FROM yt_sync_checkpoints").fetchone()[0] == 0
+
+    assert workflows.sync_channel_report("@chan", limit=20)["fetched"] == 0
+
+
+def test_new_uploads_are_fetched_before_a_limited_backfill_continues(db_path, monkeypatch):
+    uploads = list(UPLOADS)
+    monkeypatch.setattr(youtube_api, "iter_channel_videos", lambda *a, **kw: _fake_pages(*a, uploads=uploads, **kw))
+    workflows.sync_channel_report("@chan", limit=20)
+
+    fresh = dict(UPLOADS[0], video_id="new1", published_at="2024-07-02T00:00:00Z")
+    uploads.insert(0, fresh)
+    second = workflows.sync_channel_report("@chan", limit=20)
+    # The upload shifts the playlist by one, so the backfill re-reads one video (never skips one)
+    assert (second["fetched"], second["new"], second["complete"]) == (20, 19, False)
+
+    conn = sqlite3.connect(str(db_path))
+    stored = {r[0] for r in conn.execute("SELECT video_id FROM yt_videos")}
+    assert stored == {"new1"} | {f"v{i:03d}" for i in range(38)}
+
+    rest = workflows.sync_channel_report("@chan", limit=0)
+    assert rest["complete"] and rest["new"] == 82
+    assert conn.execute("SELECT last_synced FROM yt_channels").fetchone()[0] == "2024-07-02T00:00:00Z"
+
+
+def test_api_error_while_paging_keeps_stored_pages(db_path, monkeypatch):
+    from googleapiclient.errors import HttpError
+
+    def failing_pages(channel, since=None, page_token=None):
+        pages = _fake_pages(channel, since, page_token)
+        yield next(pages)
+        raise HttpError(type("Resp", (), {"status": 503, "reason": "Backend Error"})(), b"{}")
+
+    monkeypatch.setattr(youtube_api, "iter_channel_videos", failing_pages)
+    report = workflows.sync_channel_report("@chan", limit=0)
+    assert (report["fetched"], report["complete"]) == (50, False)
+
+    monkeypatch.setattr(youtube_api, "iter_channel_videos", _fake_pages)
+    assert workflows.sync_channel_report("@chan", limit=0)["fetched"] == 70
+
+
+def test_generation_runs_without_episode_context_when_ai_ewg_fails(db_path, monkeypatch):
+    workflows.sync_channel_report("@chan", limit=2)
+
+    def broken(episode_ids):
+        raise sqlite3.OperationalError("database is locked")
+
+    seen = []
+
+    def fake_generate(context):
+        seen.append(context["episode_data"])
+        return {
+            "title": "t", "description": "d", "tags": [], "hashtags": [],
+            "thumbnail_text": "", "pinned_comment": "",
+        }
+
+    monkeypatch.setattr(workflows.ai_ewg_bridge, "get_episodes_by_ids", broken)
+    monkeypatch.setattr(workflows.seo_engine, "generate_suggestion", fake_generate)
+
+    assert workflows.generate_suggestions(limit=2) == 2
+    assert seen == [{}, {}]
+
+
+def test_generation_fans_out_over_workers_and_skips_failed_videos(db_path, monkeypatch):
+    workflows.sync_channel_report("@chan", limit=8)
+    started = threading.Barrier(4, timeout=5)
+    threads = set()
+
+    def fake_generate(context):
+        threads.add(threading.get_ident())
+        started.wait()  # only passes if four videos are in flight at once
+        if context["video_id"] == "v003":
+            raise RuntimeError("LLM down")
+        return {
+            "title": "t", "description": "d", "tags": [], "hashtags": [],
+            "thumbnail_text": ["a", "b"], "pinned_comment": "",
+        }
+
+    monkeypatch.setattr(workflows.seo_engine, "generate_suggestion", fake_generate)
+    assert workflows.generate_suggestions(limit=8, workers=4) == 7
+    assert len(threads) == 4
+
+    conn = sqlite3.connect(str(db_path))
+    statuses = dict(conn.execute("SELECT video_id, status FROM yt_videos"))
+    assert statuses["v003"] == "pending"
+    assert sum(s == "suggested" for s in statuses.values()) == 7
+    assert conn.execute("SELECT COUNT(*) FROM yt_video_suggestions").fetchone()[0] == 7
+
+
+def test_sync_all_links_episodes_once_after_all_channels(db_path, tmp_path, monkeypatch):
+    from tests.test_ai_ewg_bridge import _make_ai_ewg_db
+
+    ai_ewg = tmp_path / "pipeline.db"
+    _make_ai_ewg_db(ai_ewg, [{"id": "ep1", "title": "Carbon tax debate", "date": "2024-07-01"}])
+    monkeypatch.setenv("AI_EWG_DB_PATH", str(ai_ewg))
+    monkeypatch.setenv("AUTO_LINK_EPISODES", "true")
+    monkeypatch.setattr(
+        youtube_api, "get_channel",
+        lambda handle, refresh=False: {"handle": handle, "channel_id": handle, "title": handle, "uploads_playlist_id": "UU"},
+    )
+
+    def pages(channel, since=None, page_token=None):
+        handle = channel["handle"]
+        yield [
+            dict(v, video_id=f"{handle}-{v['video_id']}", channel_id=handle,
+                 title_original="Carbon tax debate" if v["video_id"] == "v000" else v["title_original"])
+            for v in UPLOADS[:10]
+        ], None
+
+    refreshes = []
+    real_refresh = workflows.episode_linker.ai_ewg_bridge.refresh_episode_search_index
+    monkeypatch.setattr(youtube_api, "iter_channel_videos", pages)
+    monkeypatch.setattr(
+        workflows.episode_linker.ai_ewg_bridge, "refresh_episode_search_index",
+        lambda conn, force=False: refreshes.append(threading.get_ident()) or real_refresh(conn, force),
+    )
+
+    reports = workflows.sync_all_channels(["@a", "@b", "@c"], workers=3)
+    assert [(r["fetched"], r.get("error")) for r in reports] == [(10, None)] * 3
+    assert len(refreshes) == 1
+
+    conn = sqlite3.connect(str(db_path))
+    linked = conn.execute("SELECT video_id FROM yt_videos WHERE episode_id='ep1' ORDER BY video_id").fetchall()
+    assert [r[0] for r in linked] == ["@a-v000", "@b-v000", "@c-v000"]
+    workflows.ai_ewg_bridge.close_ai_ewg_connection()
@@ -0,0 +1,362 @@
+import socket
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("googleapiclient")
+
+import httplib2  # noqa: E402
+from googleapiclient.errors import HttpError  # noqa: E402
+
+from ytseo import db as dbmod  # noqa: E402
+from ytseo import models, snapshots, youtube_api  # noqa: E402
+
+
+def _http_error(status, content=b"error"):
+    return HttpError(httplib2.Response({"status": status}), content)
+
+
+class _Request:
+    def __init__(self, method_id, response=None, body=None, error=None):
+        self.methodId = method_id
+        self.response = response
+        self.body = body
+        self.error = error
+
+    def execute(self):
+        if self.error is not None:
+            raise self.error
+        return self.response
+
+
+class _Batch:
+    def __init__(self, service, callback):
+        self.service = service
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        self.service.batches.append([rid for rid, _ in self.requests])
+        failure = self.service.batch_failures.pop(0) if self.service.batch_failures else None
+        if failure is not None:
+            raise failure
+        for request_id, request in self.requests:
+            errors = self.service.item_failures.get(request_id)
+            if errors:
+                self.callback(request_id, None, errors.pop(0))
+                continue
+            self.service.snippets[request_id] = request.body["snippet"]
+            self.callback(request_id, {"id": request_id}, None)
+
+
+class _Videos:
+    def __init__(self, service):
+        self.service = service
+
+    def list(self, part, id):
+        ids = id.split(",")
+        self.service.list_calls.append(ids)
+        items = [{"id": v, "snippet": dict(self.service.snippets[v])} for v in ids if v in self.service.snippets]
+        return _Request("youtube.videos.list", {"items": items})
+
+    def update(self, part, body):
+        return _Request("youtube.videos.update", body=body)
+
+
+class _PlaylistItems:
+    def __init__(self, service):
+        self.service = service
+
+    def list(self, part, playlistId, maxResults, pageToken=None):
+        if playlistId in self.service.gone_playlists:
+            return _Request("youtube.playlistItems.list", error=_http_error(404))
+        start = int(pageToken or 0)
+        ids = sorted(self.service.snippets)[start:start + maxResults]
+        items = [
+            {"snippet": {}, "contentDetails": {"videoId": v, "videoPublishedAt": self.service.snippets[v]["publishedAt"]}}
+            for v in ids
+        ]
+        response = {"items": items}
+        if start + maxResults < len(self.service.snippets):
+            response["nextPageToken"] = str(start + maxResults)
+        return _Request("youtube.playlistItems.list", response)
+
+
+class _Channels:
+    def __init__(self, service):
+        self.service = service
+
+    def list(self, part, **lookup):
+        key, value = next(iter(lookup.items()))
+        channel_id = self.service.channel_ids.get((key, value))
+        items = [] if channel_id is None else [{
+            "id": channel_id,
+            "snippet": {"title": f"Channel {channel_id}"},
+            "contentDetails": {"relatedPlaylists": {"uploads": "UU" + channel_id[2:]}},
+        }]
+        return _Request("youtube.channels.list", {"items": items})
+
+
+class _Search:
+    def __init__(self, service):
+        self.service = service
+
+    def list(self, part, q, type, maxResults):
+        channel_id = self.service.channel_ids.get(("q", q))
+        return _Request("youtube.search.list", {"items": [{"id": {"channelId": channel_id}}] if channel_id else []})
+
+
+def _published(i):
+    return (datetime(2024, 7, 1) - timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class FakeYouTube:
+    """Just enough of the YouTube Data API for youtube_api, newest upload first."""
+
+    def __init__(self, snippets):
+        self.snippets = snippets
+        self.channel_ids = {}
+        self.gone_playlists = set()
+        self.list_calls = []
+        self.batches = []
+        self.batch_failures = []
+        self.item_failures = {}
+
+    def videos(self):
+        return _Videos(self)
+
+    def playlistItems(self):
+        return _PlaylistItems(self)
+
+    def channels(self):
+        return _Channels(self)
+
+    def search(self):
+        return _Search(self)
+
+    def new_batch_http_request(self, callback):
+        return _Batch(self, callback)
+
+
+class FakeLedger:
+    def __init__(self):
+        self.charged = []
+
+    def acquire(self, method_id, count=1, level=None):
+        self.charged.append((method_id, count))
+        return count
+
+
+@pytest.fixture
+def youtube(tmp_path, monkeypatch):
+    monkeypatch.setenv("DB_PATH", str(tmp_path / "ytseo.sqlite"))
+    monkeypatch.setenv("DRY_RUN", "false")
+    service = FakeYouTube({
+        f"v{i:03d}": {"title": f"Title {i}", "description": "", "tags": ["news"], "publishedAt": _published(i)}
+        for i in range(120)
+    })
+    monkeypatch.setattr(youtube_api, "_get_authenticated_service", lambda: service)
+    monkeypatch.setattr(youtube_api, "get_quota_ledger", lambda: service.ledger)
+    monkeypatch.setattr(youtube_api.time, "sleep", lambda seconds: None)
+    service.ledger = FakeLedger()
+    return service
+
+
+def test_transport_error_on_batch_is_retried(youtube):
+    youtube.batch_failures = [socket.timeout("timed out")]
+    results = youtube_api.update_videos_metadata({"v001": {"title": "New"}}, require_confirmation=False)
+    assert results["v001"]["status"] == "updated"
+    assert youtube.batches == [["v001"], ["v001"]]
+    assert youtube.snippets["v001"]["title"] == "New"
+
+
+def test_updates_are_batched_fifty_per_list_and_update_call(youtube):
+    changes = {f"v{i:03d}": {"title": f"New {i}"} for i in range(120)}
+    results = youtube_api.update_videos_metadata(changes, require_confirmation=False)
+
+    assert all(r["status"] == "updated" for r in results.values())
+    assert [len(ids) for ids in youtube.list_calls] == [50, 50, 20]
+    assert [len(ids) for ids in youtube.batches] == [50, 50, 20]
+    assert youtube.ledger.charged == [("youtube.videos.list", 1)] * 3 + [
+        ("youtube.videos.update", 50), ("youtube.videos.update", 50), ("youtube.videos.update", 20),
+    ]
+    assert youtube.snippets["v119"]["title"] == "New 119"
+
+
+def test_retryable_item_errors_are_retried_alone_and_others_fail(youtube):
+    youtube.item_failures = {
+        "v001": [_http_error(503)],
+        "v002": [_http_error(400, b"invalid title")],
+        "v003": [_http_error(500)] * 3,
+    }
+    changes = {v: {"title": "New"} for v in ("v000", "v001", "v002", "v003")}
+    results = youtube_api.update_videos_metadata(changes, require_confirmation=False, max_retries=2)
+
+    assert {v: r["status"] for v, r in results.items()} == {
+        "v000": "updated", "v001": "updated", "v002": "failed", "v003": "failed",
+    }
+    assert "invalid title" in results["v002"]["error"]
+    assert youtube.batches == [["v000", "v001", "v002", "v003"], ["v001", "v003"], ["v003"]]
+
+
+def test_snippet_diff_ignores_whitespace_line_endings_and_tag_order():
+    before = {"title": "Title ", "description": "Line 1\r\nLine 2\n", "tags": ["News", "canada"], "categoryId": "25"}
+    after = {"title": "Title", "description": "Line 1\nLine 2", "tags": ["Canada", " news"]}
+    assert youtube_api.snippet_diff(before, after) == {}
+
+    merged = youtube_api._merge_snippet(before, {"title": "New title", "description": "", "tags": ["economy", "news"]})
+    assert merged["description"] == before["description"]
+    assert merged["categoryId"] == "25"
+    assert youtube_api.snippet_diff(before, merged) == {
+        "title": {"old": "Title", "new": "New title"},
+        "tags": {"added": ["economy"], "removed": []},
+    }
+
+
+def test_unchanged_videos_are_not_updated(youtube):
+    changes = {"v001": {"title": " Title 1 ", "tags": ["NEWS"]}, "v002": {"title": "New"}}
+    results = youtube_api.update_videos_metadata(changes, require_confirmation=False)
+
+    assert results["v001"] == {"status": "unchanged", "diff": {}, "error": None, "quota_exhausted": False}
+    assert results["v002"]["diff"] == {"title": {"old": "Title 2", "new": "New"}}
+    assert youtube.batches == [["v002"]]
+    assert ("youtube.videos.update", 1) in youtube.ledger.charged
+
+
+def test_channel_pages_stop_at_the_watermark_and_fetch_details_in_chunks(youtube):
+    channel = {"handle": "@chan", "channel_id": "UC1", "uploads_playlist_id": "UU1"}
+
+    pages = list(youtube_api.iter_channel_videos(channel))
+    assert [(len(videos), token) for videos, token in pages] == [(50, "50"), (50, "100"), (20, None)]
+    assert pages[0][0][0]["video_id"] == "v000" and pages[0][0][0]["channel_id"] == "UC1"
+
+    youtube.list_calls.clear()
+    pages = list(youtube_api.iter_channel_videos(channel, since=_published(70)))
+    assert [(len(videos), token) for videos, token in pages] == [(50, "50"), (20, None)]
+    assert pages[-1][0][-1]["video_id"] == "v069"
+    assert [len(ids) for ids in youtube.list_calls] == [50, 20]
+
+    resumed = list(youtube_api.iter_channel_videos(channel, page_token="100"))
+    assert [v["video_id"] for v in resumed[0][0]][:2] == ["v100", "v101"]
+
+
+def test_channel_pages_are_fetched_lazily(youtube):
+    channel = {"handle": "@chan", "channel_id": "UC1", "uploads_playlist_id": "UU1"}
+    next(youtube_api.iter_channel_videos(channel))
+    assert [m for m, _ in youtube.ledger.charged] == ["youtube.playlistItems.list", "youtube.videos.list"]
+
+
+def test_handle_resolution_falls_back_and_is_stored(youtube):
+    youtube.channel_ids = {("forUsername", "Legacy"): "UCleg", ("q", "found"): "UCsrc", ("id", "UCsrc"): "UCsrc"}
+
+    assert youtube_api.get_channel("@Legacy")["channel_id"] == "UCleg"
+    assert [m for m, _ in youtube.ledger.charged] == ["youtube.channels.list"] * 2
+
+    youtube.ledger.charged.clear()
+    channel = youtube_api.get_channel("@found")
+    assert channel == {"handle": "@found", "channel_id": "UCsrc", "title": "Channel UCsrc", "uploads_playlist_id": "UUsrc"}
+    assert [m for m, _ in youtube.ledger.charged] == [
+        "youtube.channels.list", "youtube.channels.list", "youtube.search.list", "youtube.channels.list",
+    ]
+
+    youtube.ledger.charged.clear()
+    assert youtube_api.get_channel("@FOUND")["channel_id"] == "UCsrc"
+    assert youtube_api.get_channel("@nobody") is None
+    assert [m for m, _ in youtube.ledger.charged] == [
+        "youtube.channels.list", "youtube.channels.list", "youtube.search.list",
+    ]
+
+
+def test_stale_resolution_is_refreshed_when_the_uploads_playlist_is_gone(youtube):
+    youtube.channel_ids = {("forHandle", "moved"): "UCnew"}
+    youtube.gone_playlists = {"UUold"}
+    channel = {"handle": "@moved", "channel_id": "UCold", "title": "Old", "uploads_playlist_id": "UUold"}
+
+    videos, _ = next(youtube_api.iter_channel_videos(channel))
+    assert len(videos) == 50
+    assert channel["channel_id"] == "UCnew" and channel["uploads_playlist_id"] == "UUnew"
+    assert youtube_api.get_channel("@moved")["uploads_playlist_id"] == "UUnew"
+
+
+class FakeCredentials:
+    def __init__(self, expires_in):
+        self.expiry = datetime.utcnow() + timedelta(seconds=expires_in)
+        self.refresh_token = "refresh"
+        self.refreshed = 0
+
+    def refresh(self, request):
+        self.refreshed += 1
+        self.expiry = datetime.utcnow() + timedelta(hours=1)
+
+
+def test_service_is_built_once_per_thread_from_shared_state(monkeypatch):
+    monkeypatch.setenv("YOUTUBE_HTTP_CACHE_ENABLED", "false")
+    monkeypatch.setattr(youtube_api, "_local", threading.local())
+    monkeypatch.setattr(youtube_api, "_credentials", FakeCredentials(3600))
+    monkeypatch.setattr(youtube_api, "AuthorizedHttp", lambda creds, http: ("authorized", creds))
+    built = []
+
+    def build_from_document(doc, http):
+        built.append((id(doc), http))
+        return object()
+
+    monkeypatch.setattr(youtube_api, "build_from_document", build_from_document)
+
+    first = youtube_api._get_authenticated_service()
+    assert youtube_api._get_authenticated_service() is first
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(youtube_api._get_authenticated_service()))
+    thread.start()
+    thread.join()
+    assert other[0] is not first
+    assert len(built) == 2
+    assert built[0] == built[1]  # same credentials and discovery document
+
+
+def test_token_is_refreshed_ahead_of_expiry(monkeypatch):
+    creds = FakeCredentials(60)
+    saved = []
+    monkeypatch.setattr(youtube_api, "_credentials", creds)
+    monkeypatch.setattr(youtube_api, "_save_credentials", saved.append)
+    # The first sleep means the token is fresh again; dropping the credentials ends the loop
+    monkeypatch.setattr(youtube_api.time, "sleep", lambda seconds: setattr(youtube_api, "_credentials", None))
+
+    youtube_api._refresh_loop()
+    assert creds.refreshed == 1
+    assert saved == [creds]
+
+
+def test_only_successful_updates_keep_a_snapshot(youtube, tmp_path):
+    youtube.item_failures = {"v002": [_http_error(400, b"invalid title")]}
+    changes = {"v001": {"title": "New"}, "v002": {"title": "New"}}
+    youtube_api.update_videos_metadata(changes, require_confirmation=False, batch_id="apply-1")
+
+    conn = sqlite3.connect(str(tmp_path / "ytseo.sqlite"))
+    assert set(snapshots.select_snapshots(conn, batch_id="apply-1")) == {"v001"}
+
+
+def test_rollback_leaves_videos_that_were_never_applied_alone(youtube, tmp_path, monkeypatch):
+    from ytseo import workflows
+
+    monkeypatch.setattr("builtins.input", lambda prompt: "APPLY")
+
+    conn = sqlite3.connect(str(tmp_path / "ytseo.sqlite"))
+    dbmod.apply_migrations(conn)
+    models.upsert_video(conn, "v001", channel_id="c1", status="applied")
+    models.upsert_video(conn, "v002", channel_id="c1", status="approved")
+    models.upsert_video(conn, "v003", channel_id="c1", status="applied")
+    snapshots.save_snapshots(conn, "apply-1", {v: dict(youtube.snippets[v]) for v in ("v001", "v002", "v003")})
+    youtube.snippets["v003"]["title"] = "Applied title"
+
+    report = workflows.rollback_report(batch_id="apply-1", dry_run=False)
+    assert sorted(v for v, _ in report["unchanged"]) == ["v001", "v002"]
+    assert [v for v, _ in report["updated"]] == ["v003"]
+    assert dict(conn.execute("SELECT video_id, status FROM yt_videos")) == {
+        "v001": "suggested", "v002": "approved", "v003": "suggested",
+    }
@@ -0,0 +1,35 @@
+from ytseo.youtube_cache import ETagHttp, YouTubeResponseCache
+
+
+class _Response(dict):
+    def __init__(self, info):
+        super().__init__(info)
+        self.status = int(info["status"])
+
+
+class _FakeHttp:
+    def __init__(self):
+        self.calls = []
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        self.calls.append((method, dict(headers or {})))
+        if (headers or {}).get("If-None-Match") == '"v1"':
+            return _Response({"status": "304"}), b""
+        return _Response({"status": "200", "etag": '"v1"', "content-type": "application/json"}), b'{"items": []}'
+
+
+def test_etag_http_serves_304_from_cache(tmp_path):
+    cache = YouTubeResponseCache(str(tmp_path / "yt.sqlite"))
+    inner = _FakeHttp()
+    http = ETagHttp(inner, cache)
+    uri = "https://youtube.googleapis.com/youtube/v3/search?q=x&alt=json"
+
+    first = http.request(uri)
+    second = http.request(uri)
+    assert first[1] == second[1] == b'{"items": []}'
+    assert second[0].status == 200 and second[0]["content-type"] == "application/json"
+    assert inner.calls[1][1]["If-None-Match"] == '"v1"'
+    assert cache.stats() == {"hits": 1, "misses": 1}
+
+    http.request(uri, method="PUT", body="{}")
+    assert "If-None-Match" not in inner.calls[2][1]
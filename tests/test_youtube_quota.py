@@ -0,0 +1,43 @@
+import sqlite3
+from datetime import datetime, timezone
+
+import pytest
+
+from ytseo import db as dbmod
+from ytseo.youtube_quota import QuotaExhausted, QuotaLedger, metered, priority, quota_day
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "ytseo.sqlite"))
+    dbmod.apply_migrations(conn)
+    return QuotaLedger(conn, daily_limit=1000)
+
+
+def test_quota_day_resets_at_pacific_midnight():
+    # 07:59 UTC is still the previous day in Los Angeles (PDT, UTC-7)
+    assert quota_day(datetime(2024, 7, 2, 6, 59, tzinfo=timezone.utc)) == "2024-07-01"
+    assert quota_day(datetime(2024, 7, 2, 7, 1, tzinfo=timezone.utc)) == "2024-07-02"
+
+
+def test_ledger_charges_costs_and_keeps_reserve_for_higher_priority(ledger):
+    assert ledger.acquire("youtube.search.list") == 100
+    assert ledger.acquire("youtube.videos.update", count=10) == 500
+    assert ledger.remaining() == 400
+
+    # low priority keeps 30% (300 units) free
+    with priority("low"), pytest.raises(QuotaExhausted):
+        ledger.acquire("youtube.search.list", count=2)
+    with priority("high"):
+        ledger.acquire("youtube.search.list", count=2)
+    assert ledger.usage_by_operation()["youtube.search.list"] == {"units": 300, "calls": 3}
+    assert ledger.remaining() == 200
+
+
+def test_metered_counts_units_of_enclosed_calls(ledger):
+    ledger.acquire("youtube.search.list")
+    with metered() as meter:
+        ledger.acquire("youtube.playlistItems.list")
+        ledger.acquire("youtube.videos.update", count=2)
+    ledger.acquire("youtube.videos.list")
+    assert meter == {"units": 101, "calls": 3}
@@ -1,119 +1,548 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import re
 import sqlite3
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
-from .config import get_setting
+from . import db as dbmod
+from .config import get_bool_setting, get_int_setting, get_setting
+
+
+def _use_http() -> bool:
+    """AI_EWG_BACKEND=http reads episodes from AI_EWG_HTTP_URL instead of the SQLite file."""
+    return str(get_setting("AI_EWG_BACKEND", "sqlite")).lower() == "http"
+
+
+def _http_client():
+    # Imported lazily so the SQLite backend has no HTTP dependencies
+    from .ai_ewg_http import get_ai_ewg_http_client
+    return get_ai_ewg_http_client()
+
+
+def _ai_ewg_db_path() -> Path:
+    return Path(get_setting("AI_EWG_DB_PATH", "../ai-ewg/data/pipeline.db"))
+
+
+_local = threading.local()
 
 
 def _connect_ai_ewg() -> Optional[sqlite3.Connection]:
-    """Connect to AI-EWG database (read-only)."""
-    db_path = get_setting("AI_EWG_DB_PATH", "../ai-ewg/data/pipeline.db")
-    p = Path(db_path)
-    if not p.exists():
+    """
+    Return this thread's long-lived read-only connection to the AI-EWG DB.
+    
+    The connection is reused across calls and reopened automatically when
+    the DB file is replaced (or, with AI_EWG_IMMUTABLE, modified). Callers
+    must not close it.
+    """
+    p = _ai_ewg_db_path()
+    try:
+        st = p.stat()
+    except OSError:
+        close_ai_ewg_connection()
         return None
-    conn = sqlite3.connect(f"file:{p.absolute()}?mode=ro", uri=True)
+    
+    immutable = get_bool_setting("AI_EWG_IMMUTABLE", False)
+    # immutable=1 tells SQLite the file never changes, so we reopen on any write
+    identity = (str(p.absolute()), st.st_dev, st.st_ino, st.st_mtime_ns if immutable else None)
+    conn = getattr(_local, "conn", None)
+    if conn is not None and getattr(_local, "identity", None) == identity:
+        return conn
+    
+    close_ai_ewg_connection()
+    uri = f"file:{p.absolute()}?mode=ro" + ("&immutable=1" if immutable else "")
+    conn = sqlite3.connect(uri, uri=True)
     conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA query_only = ON")
+    conn.execute(f"PRAGMA mmap_size = {get_int_setting('AI_EWG_MMAP_SIZE', 256 * 1024 * 1024)}")
+    # Negative cache_size is in KiB
+    conn.execute(f"PRAGMA cache_size = -{get_int_setting('AI_EWG_PAGE_CACHE_KIB', 64 * 1024)}")
+    _local.conn = conn
+    _local.identity = identity
     return conn
 
 
-def get_episode_by_id(episode_id: str) -> Optional[Dict]:
+def close_ai_ewg_connection() -> None:
+    """Close the calling thread's AI-EWG connection, if any."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+    _local.conn = None
+    _local.identity = None
+
+
+def _db_version() -> Optional[Tuple]:
+    """
+    Cheap change marker for the AI-EWG DB: mtime/size of the file and its WAL
+    (writes in WAL mode only touch the main file on checkpoint).
+    """
+    p = _ai_ewg_db_path()
+    marker = []
+    for f in (p, p.with_name(p.name + "-wal")):
+        try:
+            st = f.stat()
+            marker.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            marker.append(None)
+    return tuple(marker) if marker[0] is not None else None
+
+
+class _EpisodeCache:
+    """
+    Process-wide LRU of episode lookups keyed by episode_id.
+    
+    The whole cache is dropped when the AI-EWG DB changes on disk, so
+    enrichment written by AI-EWG is picked up on the next lookup.
+    """
+    
+    _MISSING = object()
+    
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._data: "OrderedDict[str, Optional[Dict]]" = OrderedDict()
+        self._version: Optional[Tuple] = None
+        self._lock = threading.Lock()
+    
+    def _check_version(self) -> None:
+        version = _db_version()
+        if version != self._version:
+            self._data.clear()
+            self._version = version
+    
+    def get(self, episode_id: str):
+        """Return cached value (may be None for unknown episodes) or _MISSING."""
+        with self._lock:
+            self._check_version()
+            if episode_id not in self._data:
+                return self._MISSING
+            self._data.move_to_end(episode_id)
+            return self._data[episode_id]
+    
+    def put(self, episode_id: str, value: Optional[Dict]) -> None:
+        with self._lock:
+            self._data[episode_id] = value
+            self._data.move_to_end(episode_id)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_episode_cache = _EpisodeCache(get_int_setting("AI_EWG_CACHE_SIZE", 512))
+
+
+def get_episode_by_id(episode_id: str, full_metadata: bool = False) -> Optional[Dict]:
     """
     Fetch episode from AI-EWG by episode_id.
     
+    Results (including "not found") are memoized per process and invalidated
+    when the AI-EWG DB file changes.
+    
     Returns dict with:
-    - id, title, summary, topics, guest_names, duration_seconds, metadata (JSON)
+    - episode_id, title, topics, guest_names, duration_seconds, show_name, date
+    - summary, entities, key_moments (when the episode has enrichment)
+    - full_metadata (parsed episodes.metadata) only if full_metadata=True;
+      it is never cached since it can include whole transcripts
+    
+    With AI_EWG_BACKEND=http the lookup goes through the HTTP client and its
+    own revalidating response cache.
     """
+    if _use_http():
+        result = _http_client().get_episode(episode_id)
+        if result is None or not full_metadata:
+            return result
+        return dict(result, full_metadata=get_episode_metadata(episode_id))
+    
+    cached = _episode_cache.get(episode_id)
+    if cached is _EpisodeCache._MISSING:
+        cached = _fetch_episode(episode_id)
+        _episode_cache.put(episode_id, cached)
+    
+    if cached is None or not full_metadata:
+        return cached
+    return dict(cached, full_metadata=get_episode_metadata(episode_id))
+
+
+def get_episode_metadata(episode_id: str) -> Optional[Dict]:
+    """Parse and return the complete episodes.metadata blob (uncached, can be large)."""
+    if _use_http():
+        return _http_client().get_episode_metadata(episode_id)
+    
     conn = _connect_ai_ewg()
     if not conn:
         return None
-    
+    row = conn.execute("SELECT metadata FROM episodes WHERE id = ?", (episode_id,)).fetchone()
+    if not row or not row[0]:
+        return None
     try:
-        # Get from json_metadata_index for quick access
-        cur = conn.execute(
-            """
-            SELECT 
+        return json.loads(row[0])
+    except ValueError:
+        return None
+
+
+_INDEX_COLUMNS = """
                 episode_id, title, duration_seconds, 
                 show_name, date, guest_names, topics,
-                has_transcript, has_enrichment, has_editorial
-            FROM json_metadata_index
-            WHERE episode_id = ?
-            """,
-            (episode_id,)
-        )
-        row = cur.fetchone()
-        if not row:
-            return None
-        
-        result = dict(row)
-        
-        # Parse JSON fields if they're strings
-        if result.get("guest_names") and isinstance(result["guest_names"], str):
-            try:
-                result["guest_names"] = json.loads(result["guest_names"])
-            except:
-                result["guest_names"] = []
-        
-        if result.get("topics") and isinstance(result["topics"], str):
-            try:
-                result["topics"] = json.loads(result["topics"])
-            except:
-                result["topics"] = []
-        
-        # Try to get full metadata from episodes table
-        cur = conn.execute("SELECT metadata FROM episodes WHERE id = ?", (episode_id,))
-        meta_row = cur.fetchone()
-        if meta_row and meta_row[0]:
-            try:
-                full_meta = json.loads(meta_row[0])
-                result["full_metadata"] = full_meta
-                
-                # Extract enrichment data if available
-                if "enrichment" in full_meta and full_meta["enrichment"]:
-                    enrich = full_meta["enrichment"]
-                    result["summary"] = enrich.get("summary", "")
-                    result["entities"] = enrich.get("entities", [])
-                    result["key_moments"] = enrich.get("key_moments", [])
-            except:
-                pass
-        
-        return result
-    finally:
-        conn.close()
+                has_transcript, has_enrichment, has_editorial"""
+
+# Only the enrichment paths used for prompts are pulled out of episodes.metadata;
+# SQLite does the extraction, so transcripts never reach Python.
+_ENRICHMENT_COLUMNS = """
+                CASE WHEN json_valid(metadata) THEN json_type(metadata, '$.enrichment') END,
+                CASE WHEN json_valid(metadata) THEN json_extract(metadata, '$.enrichment.summary') END,
+                CASE WHEN json_valid(metadata) THEN json_extract(metadata, '$.enrichment.entities') END,
+                CASE WHEN json_valid(metadata) THEN json_extract(metadata, '$.enrichment.key_moments') END"""
+
+
+def _fetch_episode(episode_id: str) -> Optional[Dict]:
+    """Uncached lookup of one episode from the AI-EWG DB."""
+    conn = _connect_ai_ewg()
+    if not conn:
+        return None
+    
+    # Get from json_metadata_index for quick access
+    cur = conn.execute(
+        f"""
+        SELECT {_INDEX_COLUMNS}
+        FROM json_metadata_index
+        WHERE episode_id = ?
+        """,
+        (episode_id,)
+    )
+    row = cur.fetchone()
+    if not row:
+        return None
+    
+    # Enrichment fields from the episodes table
+    cur = conn.execute(f"SELECT {_ENRICHMENT_COLUMNS} FROM episodes WHERE id = ?", (episode_id,))
+    return _build_episode(row, cur.fetchone())
+
+
+def get_episodes_by_ids(episode_ids: Iterable[Optional[str]], chunk_size: int = 500) -> Dict[str, Dict]:
+    """
+    Fetch many episodes at once, keyed by episode_id.
+    
+    Uses one connection and chunked IN (...) queries for the ids that are not
+    already in the episode cache; fetched results are added to the cache.
+    Unknown ids are simply absent from the returned dict.
+    """
+    ids = list(dict.fromkeys(eid for eid in episode_ids if eid))
+    if _use_http():
+        return _http_client().get_episodes(ids)
+    
+    out: Dict[str, Dict] = {}
+    todo: List[str] = []
+    for eid in ids:
+        cached = _episode_cache.get(eid)
+        if cached is _EpisodeCache._MISSING:
+            todo.append(eid)
+        elif cached is not None:
+            out[eid] = cached
+    
+    if not todo:
+        return out
+    
+    conn = _connect_ai_ewg()
+    if not conn:
+        return out
+    
+    for i in range(0, len(todo), chunk_size):
+        chunk = todo[i:i + chunk_size]
+        placeholders = ",".join("?" * len(chunk))
+        index_rows = {
+            r["episode_id"]: r
+            for r in conn.execute(
+                f"SELECT {_INDEX_COLUMNS} FROM json_metadata_index WHERE episode_id IN ({placeholders})",
+                chunk,
+            )
+        }
+        enrichment = {
+            r[0]: r[1:]
+            for r in conn.execute(
+                f"SELECT id, {_ENRICHMENT_COLUMNS} FROM episodes WHERE id IN ({placeholders})", chunk
+            )
+        }
+        for eid in chunk:
+            row = index_rows.get(eid)
+            result = _build_episode(row, enrichment.get(eid)) if row else None
+            _episode_cache.put(eid, result)
+            if result is not None:
+                out[eid] = result
+    
+    return out
+
+
+def _build_episode(row: sqlite3.Row, enrichment: Optional[Tuple]) -> Dict:
+    """
+    Turn a json_metadata_index row plus the _ENRICHMENT_COLUMNS of its
+    episodes row (enrichment type, summary, entities JSON, key_moments JSON)
+    into an episode dict.
+    """
+    result = dict(row)
+    
+    # Parse JSON fields if they're strings
+    if result.get("guest_names") and isinstance(result["guest_names"], str):
+        try:
+            result["guest_names"] = json.loads(result["guest_names"])
+        except:
+            result["guest_names"] = []
+    
+    if result.get("topics") and isinstance(result["topics"], str):
+        try:
+            result["topics"] = json.loads(result["topics"])
+        except:
+            result["topics"] = []
+    
+    # Extract enrichment data if available
+    if enrichment and enrichment[0] == "object":
+        _, summary, entities, key_moments = enrichment
+        result["summary"] = summary or ""
+        result["entities"] = _loads_list(entities)
+        result["key_moments"] = _loads_list(key_moments)
+    
+    return result
+
+
+def _loads_list(value) -> list:
+    """Decode a json_extract() result that should be a JSON array."""
+    if not value:
+        return []
+    try:
+        parsed = json.loads(value)
+    except (TypeError, ValueError):
+        return []
+    return parsed if isinstance(parsed, list) else []
 
 
 def get_episode_for_youtube_video(video_id: str) -> Optional[Dict]:
     """
-    Map YouTube video_id to AI-EWG episode (stub for now).
+    Map YouTube video_id to AI-EWG episode.
     
-    TODO: Implement mapping logic:
-    - Check yt_videos.episode_id field
-    - Or match by title/date heuristics
+    Pure lookup of the stored yt_videos.episode_id link; videos are linked
+    by syncs and `ytseo link` (see episode_linker).
     """
-    # For now, this is a stub - will be implemented in Phase 9
-    return None
+    conn = dbmod.connect()
+    try:
+        row = conn.execute("SELECT episode_id FROM yt_videos WHERE video_id=?", (video_id,)).fetchone()
+    except sqlite3.OperationalError:
+        row = None  # ytseo schema not created yet
+    finally:
+        conn.close()
+    if not row or not row[0]:
+        return None
+    return get_episode_by_id(row[0])
 
 
 def search_episodes_by_title(title: str, limit: int = 5) -> List[Dict]:
-    """Search AI-EWG episodes by title (for manual mapping UI)."""
+    """
+    Search AI-EWG episodes by title, show or guest name (for manual mapping UI).
+    
+    Read-only: uses the ranked FTS5 index kept in ytseo's own DB, which is
+    brought up to date by refresh_episode_search_index (`ytseo
+    index-episodes`, episode linking after syncs, and `watch-episodes`).
+    Falls back to a LIKE scan of AI-EWG when FTS5 is unavailable or the
+    index has not been built yet.
+    """
+    conn = dbmod.connect()
+    try:
+        try:
+            row = conn.execute("SELECT value FROM ai_ewg_index_state WHERE key='tokenizer'").fetchone()
+            tokenizer = row[0] if row and conn.execute("SELECT 1 FROM ai_ewg_episodes LIMIT 1").fetchone() else None
+        except sqlite3.OperationalError:
+            tokenizer = None  # ytseo schema not created yet
+        if tokenizer:
+            match = _fts_query(title, tokenizer)
+            if not match:
+                # Too short for trigram matching; still answered from the local copy
+                cur = conn.execute(
+                    """
+                    SELECT episode_id, title, show_name, date, guest_names
+                    FROM ai_ewg_episodes WHERE title LIKE ? ORDER BY date DESC LIMIT ?
+                    """,
+                    (f"%{title}%", limit),
+                )
+                return [dict(r) for r in cur.fetchall()]
+            cur = conn.execute(
+                """
+                SELECT e.episode_id, e.title, e.show_name, e.date, e.guest_names
+                FROM ai_ewg_episodes_fts
+                JOIN ai_ewg_episodes e ON e.id = ai_ewg_episodes_fts.rowid
+                WHERE ai_ewg_episodes_fts MATCH ?
+                ORDER BY bm25(ai_ewg_episodes_fts, 10.0, 2.0, 5.0), e.date DESC
+                LIMIT ?
+                """,
+                (match, limit),
+            )
+            return [dict(r) for r in cur.fetchall()]
+    finally:
+        conn.close()
+    
+    return _search_episodes_like(title, limit)
+
+
+def _search_episodes_like(title: str, limit: int) -> List[Dict]:
+    """Unindexed fallback: LIKE scan of json_metadata_index."""
     conn = _connect_ai_ewg()
     if not conn:
         return []
     
-    try:
-        cur = conn.execute(
+    cur = conn.execute(
+        """
+        SELECT episode_id, title, show_name, date, guest_names
+        FROM json_metadata_index
+        WHERE title LIKE ?
+        ORDER BY date DESC
+        LIMIT ?
+        """,
+        (f"%{title}%", limit)
+    )
+    rows = cur.fetchall()
+    return [dict(r) for r in rows]
+
+
+def _fts_query(text: str, tokenizer: str) -> str:
+    """Build an FTS5 MATCH expression that ANDs the words of a free-text query."""
+    words = re.findall(r"\w+", text.lower())
+    if tokenizer == "trigram":
+        # Trigram matches substrings (like the old LIKE) but needs 3+ characters
+        return " ".join(f'"{w}"' for w in words if len(w) >= 3)
+    return " ".join(f'"{w}"*' for w in words)
+
+
+def _ensure_fts_table(conn: sqlite3.Connection) -> Optional[str]:
+    """Create the FTS5 table if needed; returns the tokenizer in use or None."""
+    row = conn.execute("SELECT value FROM ai_ewg_index_state WHERE key='tokenizer'").fetchone()
+    if row:
+        return row[0]
+    
+    for tokenizer in ("trigram", "unicode61 remove_diacritics 2"):
+        try:
+            conn.execute(
+                f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS ai_ewg_episodes_fts
+                USING fts5(title, show_name, guest_names, tokenize='{tokenizer}')
+                """
+            )
+        except sqlite3.OperationalError:
+            continue
+        name = tokenizer.split()[0]
+        conn.execute("INSERT OR REPLACE INTO ai_ewg_index_state(key, value) VALUES('tokenizer', ?)", (name,))
+        conn.commit()
+        return name
+    return None
+
+
+# Refreshes rewrite the shared index; one at a time per process (BEGIN
+# IMMEDIATE covers other processes)
+_index_lock = threading.Lock()
+
+
+def refresh_episode_search_index(conn: sqlite3.Connection, force: bool = False) -> Optional[str]:
+    """
+    Bring the local episode search index up to date with AI-EWG.
+    
+    Only runs when the AI-EWG DB changed since the last refresh (or force).
+    Rows are compared by signature, so only added, changed and removed
+    episodes are written. Concurrent refreshes are serialized; the ones that
+    wait find the index already current and return. Returns the FTS
+    tokenizer, or None if FTS5 is unavailable.
+    """
+    tokenizer = _ensure_fts_table(conn)
+    if tokenizer is None:
+        return None
+    
+    version = _db_version()
+    if version is None:
+        return tokenizer
+    
+    with _index_lock:
+        own_transaction = not conn.in_transaction
+        if own_transaction:
+            # Take the write lock before reading the index, not at the first write
+            conn.execute("BEGIN IMMEDIATE")
+        try:
+            counts = _refresh_episode_rows(conn, version, force)
+            conn.commit()
+        except BaseException:
+            if own_transaction:
+                conn.rollback()
+            raise
+    
+    if counts and any(counts):
+        print(f"Episode search index: {counts[0]} updated, {counts[1]} removed")
+    return tokenizer
+
+
+def _refresh_episode_rows(conn: sqlite3.Connection, version, force: bool) -> Optional[Tuple[int, int]]:
+    """Write the episode rows that differ from AI-EWG; returns (changed, removed) or None if current."""
+    state = conn.execute("SELECT value FROM ai_ewg_index_state WHERE key='source_version'").fetchone()
+    if not force and state and state[0] == json.dumps(version):
+        return None
+    
+    source = _connect_ai_ewg()
+    if not source:
+        return None
+    
+    existing = {
+        r[0]: (r[1], r[2])
+        for r in conn.execute("SELECT episode_id, id, signature FROM ai_ewg_episodes")
+    }
+    seen = set()
+    changed = 0
+    for row in source.execute("SELECT episode_id, title, show_name, date, guest_names FROM json_metadata_index"):
+        episode_id, title, show_name, date, guest_names = tuple(row)
+        seen.add(episode_id)
+        signature = hashlib.sha1(json.dumps([title, show_name, date, guest_names]).encode("utf-8")).hexdigest()
+        current = existing.get(episode_id)
+        if current and current[1] == signature:
+            continue
+        
+        guests_text = " ".join(_parse_guest_names(guest_names))
+        conn.execute(
             """
-            SELECT episode_id, title, show_name, date, guest_names
-            FROM json_metadata_index
-            WHERE title LIKE ?
-            ORDER BY date DESC
-            LIMIT ?
+            INSERT INTO ai_ewg_episodes(episode_id, title, show_name, date, guest_names, signature)
+            VALUES(?, ?, ?, ?, ?, ?)
+            ON CONFLICT(episode_id) DO UPDATE SET
+                title=excluded.title, show_name=excluded.show_name, date=excluded.date,
+                guest_names=excluded.guest_names, signature=excluded.signature
             """,
-            (f"%{title}%", limit)
+            (episode_id, title, show_name, date, guest_names, signature),
         )
-        rows = cur.fetchall()
-        return [dict(r) for r in rows]
-    finally:
-        conn.close()
+        rowid = conn.execute("SELECT id FROM ai_ewg_episodes WHERE episode_id=?", (episode_id,)).fetchone()[0]
+        conn.execute("DELETE FROM ai_ewg_episodes_fts WHERE rowid=?", (rowid,))
+        conn.execute(
+            "INSERT INTO ai_ewg_episodes_fts(rowid, title, show_name, guest_names) VALUES(?, ?, ?, ?)",
+            (rowid, title or "", show_name or "", guests_text),
+        )
+        changed += 1
+    
+    removed = [(rowid,) for episode_id, (rowid, _) in existing.items() if episode_id not in seen]
+    conn.executemany("DELETE FROM ai_ewg_episodes_fts WHERE rowid=?", removed)
+    conn.executemany("DELETE FROM ai_ewg_episodes WHERE id=?", removed)
+    
+    conn.execute(
+        "INSERT OR REPLACE INTO ai_ewg_index_state(key, value) VALUES('source_version', ?)",
+        (json.dumps(version),),
+    )
+    return changed, len(removed)
+
+
+def _parse_guest_names(value) -> List[str]:
+    """guest_names is stored as a JSON list in AI-EWG; tolerate plain strings."""
+    if not value:
+        return []
+    if isinstance(value, list):
+        return [str(v) for v in value]
+    try:
+        parsed = json.loads(value)
+    except (TypeError, ValueError):
+        return [str(value)]
+    if isinstance(parsed, list):
+        return [str(v) for v in parsed]
+    return [str(parsed)]
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .config import get_float_setting, get_int_setting, get_setting
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ai_ewg_http_cache (
+  url TEXT PRIMARY KEY,
+  etag TEXT,
+  last_modified TEXT,
+  body TEXT,
+  fetched_at REAL
+);
+"""
+
+
+class AIEWGHttpClient:
+    """
+    AI-EWG bridge backend that talks to the AI-EWG HTTP API instead of its
+    SQLite file, so generation can run on a different host.
+
+    Endpoints used (JSON):
+    - GET /episodes/{id}            -> episode dict (same shape as get_episode_by_id)
+    - GET /episodes?ids=a,b,c       -> {"episodes": [episode, ...]}
+    - GET /episodes/{id}/metadata   -> full episodes.metadata blob
+
+    Responses are kept in a local SQLite cache. Entries younger than
+    ``ttl_seconds`` are served without a request; older ones are revalidated
+    with If-None-Match / If-Modified-Since, and a 304 renews them.
+    """
+
+    def __init__(self, base_url: str, cache_path: str, ttl_seconds: int = 300, pool_size: int = 10, timeout: Tuple[float, float] = (5.0, 30.0)):
+        self.base_url = base_url.rstrip("/")
+        self.ttl_seconds = ttl_seconds
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Connection": "keep-alive", "Accept": "application/json"})
+
+        p = Path(cache_path)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(p), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def _cached(self, url: str) -> Optional[Tuple[Optional[str], Optional[str], str, float]]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT etag, last_modified, body, fetched_at FROM ai_ewg_http_cache WHERE url=?", (url,)
+            ).fetchone()
+
+    def _store(self, url: str, body: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ai_ewg_http_cache(url, etag, last_modified, body, fetched_at) VALUES(?, ?, ?, ?, ?)",
+                (url, etag, last_modified, body, time.time()),
+            )
+            self._conn.commit()
+
+    def _touch(self, url: str) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE ai_ewg_http_cache SET fetched_at=? WHERE url=?", (time.time(), url))
+            self._conn.commit()
+
+    def _episode_url(self, episode_id: str, suffix: str = "") -> str:
+        return f"{self.base_url}/episodes/{quote(str(episode_id), safe='')}{suffix}"
+
+    def _get_json(self, url: str):
+        """GET with local caching and conditional revalidation; None on 404 or error."""
+        cached = self._cached(url)
+        if cached and time.time() - cached[3] < self.ttl_seconds:
+            return json.loads(cached[2])
+
+        headers = {}
+        if cached:
+            if cached[0]:
+                headers["If-None-Match"] = cached[0]
+            if cached[1]:
+                headers["If-Modified-Since"] = cached[1]
+
+        try:
+            resp = self.session.get(url, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            print(f"AI-EWG HTTP error for {url}: {e}")
+            # Stale data beats no data when AI-EWG is briefly unreachable
+            return json.loads(cached[2]) if cached else None
+
+        if resp.status_code == 304 and cached:
+            self._touch(url)
+            return json.loads(cached[2])
+        if resp.status_code == 404:
+            return None
+        if resp.status_code != 200:
+            print(f"AI-EWG HTTP {resp.status_code} for {url}")
+            return json.loads(cached[2]) if cached else None
+
+        self._store(url, resp.text, resp.headers.get("ETag"), resp.headers.get("Last-Modified"))
+        return resp.json()
+
+    def get_episode(self, episode_id: str) -> Optional[Dict]:
+        return self._get_json(self._episode_url(episode_id))
+
+    def get_episode_metadata(self, episode_id: str) -> Optional[Dict]:
+        return self._get_json(self._episode_url(episode_id, "/metadata"))
+
+    def get_episodes(self, episode_ids: Iterable[str], chunk_size: int = 100) -> Dict[str, Dict]:
+        """
+        Fetch many episodes, keyed by episode_id.
+
+        Episodes with a fresh cache entry are served locally. Expired entries
+        are revalidated one by one like get_episode (usually a 304; stale data
+        is kept if AI-EWG is unreachable), which also stores the ETag of
+        entries first cached from a batch. Only episodes never seen before are
+        fetched with batched ?ids= requests.
+        """
+        out: Dict[str, Dict] = {}
+        todo: List[str] = []
+        now = time.time()
+        for eid in episode_ids:
+            url = self._episode_url(eid)
+            cached = self._cached(url)
+            if cached and now - cached[3] < self.ttl_seconds:
+                out[eid] = json.loads(cached[2])
+            elif cached:
+                episode = self._get_json(url)
+                if episode is not None:
+                    out[eid] = episode
+            else:
+                todo.append(eid)
+
+        for i in range(0, len(todo), chunk_size):
+            chunk = todo[i:i + chunk_size]
+            try:
+                resp = self.session.get(
+                    f"{self.base_url}/episodes", params={"ids": ",".join(chunk)}, timeout=self.timeout
+                )
+                resp.raise_for_status()
+                episodes = resp.json().get("episodes", [])
+            except (requests.RequestException, ValueError) as e:
+                print(f"AI-EWG HTTP batch error: {e}")
+                continue
+            for episode in episodes:
+                eid = episode.get("episode_id")
+                if not eid:
+                    continue
+                self._store(self._episode_url(eid), json.dumps(episode))
+                out[eid] = episode
+        return out
+
+    def close(self) -> None:
+        self.session.close()
+        with self._lock:
+            self._conn.close()
+
+
+_client: Optional[AIEWGHttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_ai_ewg_http_client() -> AIEWGHttpClient:
+    """Shared client built from AI_EWG_HTTP_* settings."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = AIEWGHttpClient(
+                    base_url=str(get_setting("AI_EWG_HTTP_URL", "http://localhost:8000")),
+                    cache_path=str(get_setting("AI_EWG_HTTP_CACHE_PATH", "data/ai_ewg_http_cache.sqlite")),
+                    ttl_seconds=get_int_setting("AI_EWG_HTTP_CACHE_TTL_SECONDS", 300),
+                    pool_size=get_int_setting("AI_EWG_HTTP_POOL_SIZE", 10),
+                    timeout=(
+                        get_float_setting("AI_EWG_HTTP_CONNECT_TIMEOUT", 5.0),
+                        get_float_setting("AI_EWG_HTTP_READ_TIMEOUT", 30.0),
+                    ),
+                )
+    return _client
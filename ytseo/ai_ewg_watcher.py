@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+from typing import Dict, List, Optional
+
+from . import ai_ewg_bridge
+
+
+# Only videos that already have a suggestion can go stale; pending ones are generated anyway.
+# Suggested videos are regenerated; approved/applied ones are only reported, so a
+# content change never silently replaces text someone already signed off on.
+STALE_STATUSES = ("suggested",)
+REVIEW_STATUSES = ("approved", "applied")
+
+
+def _watched_episodes(conn: sqlite3.Connection) -> Dict[str, Optional[str]]:
+    """Linked episode_ids mapped to their last seen content hash (None if never seen)."""
+    rows = conn.execute(
+        """
+        SELECT DISTINCT v.episode_id, s.content_hash
+        FROM yt_videos v
+        LEFT JOIN ai_ewg_episode_state s ON s.episode_id = v.episode_id
+        WHERE v.episode_id IS NOT NULL
+        """
+    ).fetchall()
+    return {r[0]: r[1] for r in rows}
+
+
+def _content_hashes(source: sqlite3.Connection, episode_ids: List[str], since: Optional[str], chunk_size: int = 500) -> Dict[str, tuple]:
+    """
+    Hash the prompt-relevant parts of each episode: index fields plus the
+    enrichment subtree of episodes.metadata (transcripts are never read).
+
+    With `since`, only episodes whose episodes.updated_at is not older are
+    returned. Values are (hash, updated_at).
+    """
+    has_updated_at = "updated_at" in {r[1] for r in source.execute("PRAGMA table_info(episodes)")}
+    updated_col = "e.updated_at" if has_updated_at else "NULL"
+    out: Dict[str, tuple] = {}
+    for i in range(0, len(episode_ids), chunk_size):
+        chunk = episode_ids[i:i + chunk_size]
+        query = f"""
+            SELECT i.episode_id, i.title, i.topics, i.guest_names,
+                   CASE WHEN json_valid(e.metadata) THEN json_extract(e.metadata, '$.enrichment') END,
+                   {updated_col}
+            FROM json_metadata_index i
+            LEFT JOIN episodes e ON e.id = i.episode_id
+            WHERE i.episode_id IN ({','.join('?' * len(chunk))})
+        """
+        params: List = list(chunk)
+        if since and has_updated_at:
+            query += " AND e.updated_at >= ?"
+            params.append(since)
+        for row in source.execute(query, params):
+            digest = hashlib.sha1(json.dumps(list(row[1:5])).encode("utf-8")).hexdigest()
+            out[row[0]] = (digest, row[5])
+    return out
+
+
+def poll_changes(conn: sqlite3.Connection, force: bool = False) -> Dict:
+    """
+    Detect AI-EWG episodes whose content changed and queue their linked videos.
+
+    Cheap when nothing happened: the AI-EWG file version is compared first,
+    and only episodes linked to yt_videos are examined after that. If AI-EWG
+    stores episodes.updated_at it is used as a high-water mark, otherwise the
+    enrichment content hash decides. The first sighting of an episode only
+    records a baseline.
+
+    Returns {"checked", "changed", "queued", "review"}; "review" lists the
+    approved or applied videos of changed episodes, which are not queued.
+    """
+    report = {"checked": 0, "changed": 0, "queued": 0, "review": []}
+    version = ai_ewg_bridge._db_version()
+    if version is None:
+        return report
+    state = dict(conn.execute(
+        "SELECT key, value FROM ai_ewg_index_state WHERE key IN ('watch_version', 'watch_updated_at')"
+    ).fetchall())
+    if not force and state.get("watch_version") == json.dumps(version):
+        return report
+
+    source = ai_ewg_bridge._connect_ai_ewg()
+    if not source:
+        return report
+    # Keep the episode search index current too, so lookups never have to
+    ai_ewg_bridge.refresh_episode_search_index(conn)
+
+    watched = _watched_episodes(conn)
+    unseen = [eid for eid, h in watched.items() if h is None]
+    known = [eid for eid, h in watched.items() if h is not None]
+    watermark = None if force else state.get("watch_updated_at")
+    current = _content_hashes(source, unseen, None)
+    current.update(_content_hashes(source, known, watermark))
+    report["checked"] = len(current)
+
+    changed = [eid for eid, (digest, _) in current.items() if watched.get(eid) not in (None, digest)]
+    conn.executemany(
+        """
+        INSERT INTO ai_ewg_episode_state(episode_id, content_hash, checked_at)
+        VALUES(?, ?, datetime('now'))
+        ON CONFLICT(episode_id) DO UPDATE SET content_hash=excluded.content_hash, checked_at=excluded.checked_at
+        """,
+        [(eid, digest) for eid, (digest, _) in current.items()],
+    )
+
+    if changed:
+        report["changed"] = len(changed)
+        report["queued"] = queue_videos_for_episodes(conn, changed, reason="ai_ewg_updated")
+        report["review"] = videos_needing_review(conn, changed)
+
+    updated = [u for _, u in current.values() if u]
+    if updated:
+        state["watch_updated_at"] = max(updated + [state.get("watch_updated_at") or ""])
+    state["watch_version"] = json.dumps(version)
+    conn.executemany(
+        "INSERT OR REPLACE INTO ai_ewg_index_state(key, value) VALUES(?, ?)",
+        [(k, v) for k, v in state.items() if v is not None],
+    )
+    conn.commit()
+    return report
+
+
+def videos_needing_review(conn: sqlite3.Connection, episode_ids: List[str]) -> List[str]:
+    """Approved or applied videos linked to the given episodes."""
+    out: List[str] = []
+    status_marks = ",".join("?" * len(REVIEW_STATUSES))
+    for i in range(0, len(episode_ids), 500):
+        chunk = episode_ids[i:i + 500]
+        rows = conn.execute(
+            f"""
+            SELECT video_id FROM yt_videos
+            WHERE episode_id IN ({','.join('?' * len(chunk))}) AND status IN ({status_marks})
+            ORDER BY video_id
+            """,
+            [*chunk, *REVIEW_STATUSES],
+        )
+        out.extend(r[0] for r in rows)
+    return out
+
+
+def queue_videos_for_episodes(conn: sqlite3.Connection, episode_ids: List[str], reason: str) -> int:
+    """Add videos linked to the given episodes (and only suggested so far) to the regeneration queue."""
+    queued = 0
+    status_marks = ",".join("?" * len(STALE_STATUSES))
+    for i in range(0, len(episode_ids), 500):
+        chunk = episode_ids[i:i + 500]
+        cur = conn.execute(
+            f"""
+            INSERT INTO yt_regen_queue(video_id, episode_id, reason, queued_at)
+            SELECT video_id, episode_id, ?, datetime('now') FROM yt_videos
+            WHERE episode_id IN ({','.join('?' * len(chunk))}) AND status IN ({status_marks})
+            ON CONFLICT(video_id) DO UPDATE SET reason=excluded.reason, queued_at=excluded.queued_at
+            """,
+            [reason, *chunk, *STALE_STATUSES],
+        )
+        queued += cur.rowcount
+    conn.commit()
+    return queued
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import json
+import random
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from . import models
+from .config import get_int_setting
+from .youtube_quota import next_quota_reset
+
+
+def _ts(dt: datetime) -> str:
+    """UTC timestamp in SQLite's datetime('now') format, so the two compare as text."""
+    return dt.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def enqueue_approved(conn: sqlite3.Connection, limit: Optional[int] = None) -> int:
+    """
+    Queue approved videos for apply with their latest suggestion.
+
+    Videos already queued or dead-lettered are left alone; a finished entry
+    is re-queued when its video is approved again.
+    """
+    query = """
+        SELECT v.video_id, s.title, s.description, s.tags_json
+        FROM yt_videos v
+        JOIN yt_video_suggestions s ON s.id = (
+            SELECT id FROM yt_video_suggestions WHERE video_id = v.video_id ORDER BY created_at DESC, id DESC LIMIT 1
+        )
+        LEFT JOIN yt_apply_outbox o ON o.video_id = v.video_id
+        WHERE v.status = 'approved' AND (o.video_id IS NULL OR o.status = 'done')
+        ORDER BY v.published_at DESC
+    """
+    params: List = []
+    if limit:
+        query += " LIMIT ?"
+        params.append(limit)
+    rows = conn.execute(query, params).fetchall()
+
+    conn.executemany(
+        """
+        INSERT INTO yt_apply_outbox(video_id, changes_json, status, attempts, next_attempt_at, last_error, created_at, updated_at)
+        VALUES(?, ?, 'queued', 0, datetime('now'), NULL, datetime('now'), datetime('now'))
+        ON CONFLICT(video_id) DO UPDATE SET
+            changes_json=excluded.changes_json, status='queued', attempts=0,
+            next_attempt_at=excluded.next_attempt_at, last_error=NULL, updated_at=excluded.updated_at
+        """,
+        [
+            (r[0], json.dumps({"title": r[1], "description": r[2], "tags": json.loads(r[3]) if r[3] else []}))
+            for r in rows
+        ],
+    )
+    conn.commit()
+    return len(rows)
+
+
+def due_items(conn: sqlite3.Connection, limit: int) -> Dict[str, Dict]:
+    """
+    Changes of queued entries whose next attempt is due, keyed by video_id
+    (oldest first).
+
+    The video's latest suggestion is read now, not when it was queued, so a
+    regenerated suggestion is what gets applied; changes_json is refreshed to
+    match. Entries whose video is no longer approved are dropped from the
+    queue (it is queued again if the video is re-approved).
+    """
+    conn.execute(
+        """
+        DELETE FROM yt_apply_outbox WHERE status = 'queued'
+        AND video_id NOT IN (SELECT video_id FROM yt_videos WHERE status = 'approved')
+        """
+    )
+    rows = conn.execute(
+        """
+        SELECT o.video_id, s.title, s.description, s.tags_json
+        FROM yt_apply_outbox o
+        JOIN yt_video_suggestions s ON s.id = (
+            SELECT id FROM yt_video_suggestions WHERE video_id = o.video_id ORDER BY created_at DESC, id DESC LIMIT 1
+        )
+        WHERE o.status = 'queued' AND o.next_attempt_at <= datetime('now')
+        ORDER BY o.next_attempt_at, o.created_at LIMIT ?
+        """,
+        (limit,),
+    ).fetchall()
+    changes = {r[0]: {"title": r[1], "description": r[2], "tags": json.loads(r[3]) if r[3] else []} for r in rows}
+    conn.executemany(
+        "UPDATE yt_apply_outbox SET changes_json=?, updated_at=datetime('now') WHERE video_id=?",
+        [(json.dumps(c), video_id) for video_id, c in changes.items()],
+    )
+    conn.commit()
+    return changes
+
+
+def record_result(conn: sqlite3.Connection, video_id: str, result: Dict) -> str:
+    """
+    Store the outcome of one apply attempt and return the entry's new state:
+    "done", "queued" (retry scheduled) or "dead". Done entries get the usual
+    bookkeeping: the diff goes to yt_video_applied_changes and the video is
+    marked applied. Dry runs and confirmations declined by the user leave the
+    entry and the video as they were.
+
+    Failures back off exponentially with jitter. Quota exhaustion is not the
+    item's fault: it moves to the next quota day without using an attempt.
+    After APPLY_MAX_ATTEMPTS failures the entry is dead-lettered with its error.
+    """
+    if result["status"] == "dry_run" or result.get("error") == "cancelled":
+        return "queued"
+
+    if result["status"] != "failed":
+        if result["status"] == "updated":
+            conn.execute(
+                "INSERT INTO yt_video_applied_changes(video_id, diff_json, applied_at) VALUES(?, ?, datetime('now'))",
+                (video_id, json.dumps(result["diff"])),
+            )
+        models.mark_video_status(conn, video_id, "applied")
+        conn.execute(
+            "UPDATE yt_apply_outbox SET status='done', last_error=NULL, updated_at=datetime('now') WHERE video_id=?",
+            (video_id,),
+        )
+        return "done"
+
+    if result.get("quota_exhausted"):
+        conn.execute(
+            "UPDATE yt_apply_outbox SET next_attempt_at=?, last_error=?, updated_at=datetime('now') WHERE video_id=?",
+            (_ts(next_quota_reset()), result.get("error"), video_id),
+        )
+        return "queued"
+
+    row = conn.execute("SELECT attempts FROM yt_apply_outbox WHERE video_id=?", (video_id,)).fetchone()
+    attempts = (row[0] if row else 0) + 1
+    if attempts >= get_int_setting("APPLY_MAX_ATTEMPTS", 5):
+        state, next_at = "dead", None
+    else:
+        base = get_int_setting("APPLY_BACKOFF_BASE_SECONDS", 60)
+        delay = min(get_int_setting("APPLY_BACKOFF_MAX_SECONDS", 6 * 3600), base * 2 ** (attempts - 1))
+        state, next_at = "queued", _ts(datetime.utcnow() + timedelta(seconds=delay * random.uniform(0.5, 1.5)))
+    conn.execute(
+        """
+        UPDATE yt_apply_outbox SET status=?, attempts=?, next_attempt_at=COALESCE(?, next_attempt_at),
+            last_error=?, updated_at=datetime('now')
+        WHERE video_id=?
+        """,
+        (state, attempts, next_at, result.get("error"), video_id),
+    )
+    return state
+
+
+def requeue_dead(conn: sqlite3.Connection) -> int:
+    """Give dead-lettered entries a fresh set of attempts."""
+    cur = conn.execute(
+        """
+        UPDATE yt_apply_outbox SET status='queued', attempts=0, next_attempt_at=datetime('now'), updated_at=datetime('now')
+        WHERE status='dead'
+        """
+    )
+    conn.commit()
+    return cur.rowcount
+
+
+def outbox_counts(conn: sqlite3.Connection) -> Dict[str, int]:
+    return {r[0]: r[1] for r in conn.execute("SELECT status, COUNT(*) FROM yt_apply_outbox GROUP BY status")}
@@ -63,3 +63,27 @@ def get_default_channel() -> str:
     """Get the default channel (first in list or DEFAULT_CHANNEL_HANDLE)."""
     channels = get_available_channels()
     return channels[0] if channels else "@TheNewsForum"
+
+
+def get_bool_setting(key: str, default: bool = False) -> bool:
+    """Read a boolean setting (accepts true/1/yes from env or TOML)."""
+    val = get_setting(key, None)
+    if val is None:
+        return default
+    return str(val).strip().lower() in ("true", "1", "yes")
+
+
+def get_int_setting(key: str, default: int) -> int:
+    """Read an integer setting, falling back to default on bad values."""
+    try:
+        return int(get_setting(key, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def get_float_setting(key: str, default: float) -> float:
+    """Read a float setting, falling back to default on bad values."""
+    try:
+        return float(get_setting(key, default))
+    except (TypeError, ValueError):
+        return default
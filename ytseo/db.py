@@ -27,10 +27,26 @@ def _find_migration_file(filename: str = "0001_init.sql") -> Optional[Path]:
     return None
 
 
+# Applied on every connect, so each file must be idempotent (CREATE ... IF NOT EXISTS).
+# 0002_add_channel_handle.sql uses ALTER TABLE and is applied manually.
+MIGRATIONS = [
+    "0001_init.sql",
+    "0003_ai_ewg_episode_index.sql",
+    "0004_yt_episode_links.sql",
+    "0005_ai_ewg_change_feed.sql",
+    "0006_yt_channel_handles.sql",
+    "0007_yt_quota_usage.sql",
+    "0008_yt_apply_outbox.sql",
+    "0009_yt_video_snapshots.sql",
+    "0010_yt_sync_checkpoints.sql",
+]
+
+
 def apply_migrations(conn: sqlite3.Connection) -> None:
-    mig = _find_migration_file()
-    if not mig:
-        return
-    sql = mig.read_text(encoding="utf-8")
-    conn.executescript(sql)
+    for filename in MIGRATIONS:
+        mig = _find_migration_file(filename)
+        if not mig:
+            continue
+        sql = mig.read_text(encoding="utf-8")
+        conn.executescript(sql)
     conn.commit()
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import re
+import sqlite3
+from collections import Counter, defaultdict
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from . import ai_ewg_bridge
+from .config import get_float_setting, get_int_setting
+
+
+# Words that carry no signal when matching titles
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how", "in", "is", "it",
+    "of", "on", "or", "the", "this", "to", "vs", "what", "who", "why", "with", "will", "you",
+    "your", "episode", "ep", "part", "full", "interview", "news", "forum",
+}
+
+# Scoring weights (sum to 1.0)
+_W_TITLE = 0.6
+_W_GUESTS = 0.25
+_W_DATE = 0.15
+
+
+def _tokens(text: str) -> List[str]:
+    return [w for w in re.findall(r"[a-z0-9]+", (text or "").lower()) if w not in _STOPWORDS and len(w) > 1]
+
+
+def _trigrams(text: str) -> Set[str]:
+    norm = " " + " ".join(_tokens(text)) + " "
+    return {norm[i:i + 3] for i in range(len(norm) - 2)}
+
+
+def _parse_date(value: Optional[str]) -> Optional[date]:
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+class EpisodeIndex:
+    """
+    Precomputed match signatures for all AI-EWG episodes.
+
+    Built once per linking run: title trigram sets for similarity, an
+    inverted index of title tokens for candidate lookup, guest surname sets
+    and parsed dates. Candidate lookup only touches episodes sharing a
+    reasonably rare title token with the video, so linking a channel is
+    not an O(videos x episodes) comparison.
+    """
+
+    def __init__(self, episodes: Iterable[Tuple[str, str, str, Optional[str]]]):
+        self.episode_ids: List[str] = []
+        self.trigrams: List[Set[str]] = []
+        self.guests: List[Set[str]] = []
+        self.dates: List[Optional[date]] = []
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+
+        for episode_id, title, guest_names, episode_date in episodes:
+            idx = len(self.episode_ids)
+            self.episode_ids.append(episode_id)
+            self.trigrams.append(_trigrams(title))
+            self.dates.append(_parse_date(episode_date))
+            surnames = set()
+            for name in ai_ewg_bridge._parse_guest_names(guest_names):
+                parts = _tokens(name)
+                if parts and len(parts[-1]) >= 3:
+                    surnames.add(parts[-1])
+            self.guests.append(surnames)
+            for tok in set(_tokens(title)):
+                self.postings[tok].append(idx)
+
+        # Tokens found in too many titles (show names, "canada", ...) don't narrow anything
+        self.max_df = max(50, len(self.episode_ids) // 20)
+
+    @classmethod
+    def from_db(cls, conn: sqlite3.Connection) -> "EpisodeIndex":
+        """Build from the local AI-EWG episode copy (see refresh_episode_search_index)."""
+        ai_ewg_bridge.refresh_episode_search_index(conn)
+        rows = conn.execute("SELECT episode_id, title, guest_names, date FROM ai_ewg_episodes").fetchall()
+        return cls(tuple(r) for r in rows)
+
+    def best_match(self, title: str, text: str, published: Optional[date], window_days: int, candidates: int = 20) -> Optional[Tuple[str, float]]:
+        """Return (episode_id, confidence) of the best candidate, or None."""
+        counts: Counter = Counter()
+        for tok in set(_tokens(title)):
+            posting = self.postings.get(tok)
+            if posting and len(posting) <= self.max_df:
+                counts.update(posting)
+        if not counts:
+            return None
+
+        video_trigrams = _trigrams(title)
+        words = set(_tokens(text))
+        best: Optional[Tuple[str, float]] = None
+        for idx, _ in counts.most_common(candidates):
+            ep_date = self.dates[idx]
+            date_score = 0.5
+            if published and ep_date:
+                days = abs((published - ep_date).days)
+                if days > window_days:
+                    continue
+                date_score = 1.0 - days / (window_days + 1)
+
+            ep_trigrams = self.trigrams[idx]
+            title_score = 2 * len(video_trigrams & ep_trigrams) / (len(video_trigrams) + len(ep_trigrams) or 1)
+            guests = self.guests[idx]
+            guest_score = len(guests & words) / len(guests) if guests else 0.0
+
+            score = _W_TITLE * title_score + _W_GUESTS * guest_score + _W_DATE * date_score
+            if best is None or score > best[1]:
+                best = (self.episode_ids[idx], round(score, 4))
+        return best
+
+
+def link_videos(
+    conn: sqlite3.Connection,
+    channel_handle: Optional[str] = None,
+    video_ids: Optional[List[str]] = None,
+    relink: bool = False,
+    min_confidence: Optional[float] = None,
+    chunk_size: int = 500,
+) -> Dict:
+    """
+    Match yt_videos to AI-EWG episodes and persist links above min_confidence.
+
+    By default only videos without an episode_id are considered; relink=True
+    re-scores every selected video. Links are written to yt_videos.episode_id
+    and recorded with their confidence in yt_episode_links.
+
+    Returns a report: {"videos", "linked", "links": [(video_id, episode_id, confidence)]}.
+    """
+    min_confidence = min_confidence if min_confidence is not None else get_float_setting("LINKER_MIN_CONFIDENCE", 0.55)
+    window_days = get_int_setting("LINKER_DATE_WINDOW_DAYS", 14)
+
+    # Only the first 1000 description characters are scored, so only those are read
+    query = (
+        "SELECT video_id, title_original, substr(description_original, 1, 1000), published_at "
+        "FROM yt_videos WHERE video_id > ?"
+    )
+    params: List = []
+    if not relink:
+        query += " AND episode_id IS NULL"
+    if video_ids:
+        query += f" AND video_id IN ({','.join('?' * len(video_ids))})"
+        params.extend(video_ids)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(yt_videos)")}
+    if channel_handle and "channel_handle" in columns:
+        query += " AND channel_handle=?"
+        params.append(channel_handle)
+    query += " ORDER BY video_id LIMIT ?"
+
+    report: Dict = {"videos": 0, "linked": 0, "links": []}
+    index: Optional[EpisodeIndex] = None
+    last = ""
+    # Videos are read and linked in chunks (keyed on video_id), so memory does not grow with the channel
+    while True:
+        videos = conn.execute(query, [last] + params + [chunk_size]).fetchall()
+        if not videos:
+            break
+        last = videos[-1][0]
+        report["videos"] += len(videos)
+        if index is None:
+            index = EpisodeIndex.from_db(conn)
+        if not index.episode_ids:
+            continue
+
+        links = []
+        for video_id, title, description, published_at in videos:
+            text = f"{title or ''} {description or ''}"
+            match = index.best_match(title or "", text, _parse_date(published_at), window_days)
+            if match and match[1] >= min_confidence:
+                links.append((video_id, match[0], match[1]))
+
+        conn.executemany("UPDATE yt_videos SET episode_id=? WHERE video_id=?", [(e, v) for v, e, _ in links])
+        conn.executemany(
+            """
+            INSERT INTO yt_episode_links(video_id, episode_id, confidence, method, linked_at)
+            VALUES(?, ?, ?, 'auto', datetime('now'))
+            ON CONFLICT(video_id) DO UPDATE SET
+                episode_id=excluded.episode_id,
+                confidence=excluded.confidence,
+                method=excluded.method,
+                linked_at=excluded.linked_at
+            """,
+            links,
+        )
+        conn.commit()
+        report["linked"] += len(links)
+        report["links"].extend(links)
+    return report
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .config import get_bool_setting, get_float_setting, get_int_setting, get_setting
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+  key TEXT PRIMARY KEY,
+  provider TEXT,
+  model TEXT,
+  response TEXT,
+  size INTEGER,
+  created_at REAL,
+  accessed_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache(accessed_at);
+"""
+
+
+class LLMCache:
+    """
+    Content-addressed on-disk cache for LLM responses.
+
+    Entries are keyed by a hash of everything that affects the output
+    (provider, model, prompts, sampling params). Entries expire after
+    ``ttl_seconds`` and the least recently used ones are evicted once the
+    cache grows past ``max_entries`` or ``max_bytes``.
+    """
+
+    def __init__(self, path: str, ttl_seconds: int = 7 * 24 * 3600, max_entries: int = 5000, max_bytes: int = 50 * 1024 * 1024):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        p = Path(path)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        # Shared across worker threads; all access goes through self._lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(p), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(**parts: Any) -> str:
+        """Build a stable cache key from the request parameters."""
+        raw = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return cached response or None. Expired entries count as misses."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_cache WHERE key=?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            if self.ttl_seconds > 0 and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_cache WHERE key=?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+            # Touch for LRU ordering
+            self._conn.execute("UPDATE llm_cache SET accessed_at=? WHERE key=?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, response: str, provider: Optional[str] = None, model: Optional[str] = None) -> None:
+        """Store a response and evict old entries if over the size caps."""
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO llm_cache(key, provider, model, response, size, created_at, accessed_at)
+                VALUES(?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    response=excluded.response,
+                    size=excluded.size,
+                    created_at=excluded.created_at,
+                    accessed_at=excluded.accessed_at
+                """,
+                (key, provider, model, response, size, now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until within max_entries/max_bytes."""
+        count, total = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+        ).fetchone()
+
+        if self.max_entries > 0 and count > self.max_entries:
+            excess = count - self.max_entries
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY accessed_at ASC LIMIT ?)",
+                (excess,),
+            )
+            self.evictions += excess
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+            ).fetchone()
+
+        if self.max_bytes > 0 and total > self.max_bytes:
+            to_free = total - self.max_bytes
+            victims = []
+            for key, size in self._conn.execute("SELECT key, size FROM llm_cache ORDER BY accessed_at ASC"):
+                victims.append((key,))
+                to_free -= size or 0
+                if to_free <= 0:
+                    break
+            self._conn.executemany("DELETE FROM llm_cache WHERE key=?", victims)
+            self.evictions += len(victims)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters for this process plus current on-disk size."""
+        with self._lock:
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": int(count),
+            "bytes": int(total),
+        }
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """Build the cache from settings, or None when LLM_CACHE_ENABLED is off."""
+    if not get_bool_setting("LLM_CACHE_ENABLED", True):
+        return None
+    return LLMCache(
+        path=str(get_setting("LLM_CACHE_PATH", "data/llm_cache.sqlite")),
+        ttl_seconds=get_int_setting("LLM_CACHE_TTL_SECONDS", 7 * 24 * 3600),
+        max_entries=get_int_setting("LLM_CACHE_MAX_ENTRIES", 5000),
+        max_bytes=get_int_setting("LLM_CACHE_MAX_BYTES", 50 * 1024 * 1024),
+    )
+
+
+def cache_allowed(temperature: float) -> bool:
+    """Sampling-heavy calls above LLM_CACHE_MAX_TEMPERATURE are never cached."""
+    return temperature <= get_float_setting("LLM_CACHE_MAX_TEMPERATURE", 1.0)
@@ -1,11 +1,21 @@
 from __future__ import annotations
 
+import asyncio
+import itertools
 import json
-from typing import Dict, Optional
+import threading
+from typing import Dict, List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
 
-from .config import get_setting
+try:  # Optional: only needed for AsyncLLMClient
+    import httpx
+except Exception:
+    httpx = None  # type: ignore
+
+from .config import get_float_setting, get_int_setting, get_setting
+from .llm_cache import LLMCache, cache_allowed, get_llm_cache
 
 
 class LLMClient:
@@ -20,8 +30,55 @@ class LLMClient:
         self.model_name = get_setting("MODEL_NAME", "llama3.1")
         self.openai_api_key = get_setting("OPENAI_API_KEY")
         self.openai_model = get_setting("OPENAI_MODEL", "gpt-4o-mini")
+        self.cache: Optional[LLMCache] = get_llm_cache()
+        
+        # HTTP connection pool (see `session`)
+        self.pool_size = get_int_setting("LLM_POOL_SIZE", 10)
+        self.timeout: Tuple[float, float] = (
+            get_float_setting("LLM_CONNECT_TIMEOUT", 5.0),
+            get_float_setting("LLM_READ_TIMEOUT", 60.0),
+        )
+        self._session: Optional[requests.Session] = None
+        self._session_lock = threading.Lock()
+    
+    @property
+    def session(self) -> requests.Session:
+        """
+        Keep-alive session with a bounded connection pool.
+        
+        Created lazily and shared by all threads: urllib3's pool is thread-safe
+        and pool_block makes extra threads wait for a free connection instead
+        of opening throwaway ones. Per-request auth headers are passed on each
+        call so nothing provider-specific is stored on the session.
+        """
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=self.pool_size, pool_block=True)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    session.headers.update({"Connection": "keep-alive"})
+                    self._session = session
+        return self._session
     
-    def generate(self, prompt: str, system_prompt: Optional[str] = None, max_tokens: int = 500, temperature: float = 0.7) -> str:
+    def close(self) -> None:
+        """Close pooled connections."""
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+    
+    def generate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: int = 500,
+        temperature: float = 0.7,
+        json_schema: Optional[Dict] = None,
+        use_cache: bool = True,
+        refresh_cache: bool = False,
+    ) -> str:
         """
         Generate text using configured LLM provider.
         
@@ -30,20 +87,112 @@ class LLMClient:
             system_prompt: Optional system prompt
             max_tokens: Max tokens to generate
             temperature: Sampling temperature (0-1)
+            json_schema: Request structured JSON output (Ollama `format`,
+                OpenAI JSON mode); the schema is enforced where supported
+            use_cache: Set False to bypass the response cache entirely
+            refresh_cache: Skip the cache lookup but store the new response
+                (used by "Regenerate" so users get a fresh answer)
         
         Returns:
             Generated text
         """
+        if self.provider not in ("ollama", "openai"):
+            raise ValueError(f"Unknown LLM provider: {self.provider}")
+        
+        cache = self.cache if use_cache and cache_allowed(temperature) else None
+        key = None
+        if cache is not None:
+            key = self._cache_key(prompt, system_prompt, max_tokens, temperature, json_schema)
+            if not refresh_cache:
+                cached = cache.get(key)
+                if cached is not None:
+                    return cached
+        
         if self.provider == "ollama":
-            return self._generate_ollama(prompt, system_prompt, max_tokens, temperature)
-        elif self.provider == "openai":
-            return self._generate_openai(prompt, system_prompt, max_tokens, temperature)
+            result = self._generate_ollama(prompt, system_prompt, max_tokens, temperature, json_schema)
         else:
-            raise ValueError(f"Unknown LLM provider: {self.provider}")
+            result = self._generate_openai(prompt, system_prompt, max_tokens, temperature, json_schema)
+        
+        # Don't cache empty responses, they are almost always a backend hiccup
+        if cache is not None and result:
+            cache.put(key, result, provider=self.provider, model=self._model_for_provider())
+        return result
     
-    def _generate_ollama(self, prompt: str, system_prompt: Optional[str], max_tokens: int, temperature: float) -> str:
+    def _model_for_provider(self) -> str:
+        return self.openai_model if self.provider == "openai" else self.model_name
+    
+    def _cache_key(self, prompt: str, system_prompt: Optional[str], max_tokens: int, temperature: float, json_schema: Optional[Dict]) -> str:
+        return LLMCache.make_key(
+            provider=self.provider,
+            model=self._model_for_provider(),
+            system_prompt=system_prompt,
+            prompt=prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            json_schema=json_schema,
+        )
+    
+    def cache_stats(self) -> Dict[str, int]:
+        """Cache hit/miss counters (empty when caching is disabled)."""
+        return self.cache.stats() if self.cache is not None else {}
+    
+    def _generate_ollama(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        max_tokens: int,
+        temperature: float,
+        json_schema: Optional[Dict] = None,
+    ) -> str:
         """Generate using Ollama chat API for better system/user separation."""
-        url = f"{self.ollama_base_url}/api/chat"
+        url, payload = self._ollama_request(self.ollama_base_url, prompt, system_prompt, max_tokens, temperature, json_schema)
+        
+        try:
+            # Retry logic for Ollama (GPU overload handling)
+            max_retries = 2
+            for attempt in range(max_retries + 1):
+                try:
+                    response = self.session.post(url, json=payload, timeout=self.timeout)
+                    response.raise_for_status()
+                    return self._parse_ollama(response.json(), json_schema)
+                except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                    if attempt < max_retries:
+                        print(f"Ollama retry {attempt + 1}/{max_retries} after error: {e}")
+                        continue
+                    raise
+        except Exception as e:
+            raise RuntimeError(f"Ollama API error: {e}")
+    
+    def _generate_openai(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        max_tokens: int,
+        temperature: float,
+        json_schema: Optional[Dict] = None,
+    ) -> str:
+        """Generate using OpenAI API (fallback)."""
+        url, headers, payload = self._openai_request(prompt, system_prompt, max_tokens, temperature, json_schema)
+        
+        try:
+            response = self.session.post(url, json=payload, headers=headers, timeout=self.timeout)
+            response.raise_for_status()
+            return self._parse_openai(response.json())
+        except Exception as e:
+            raise RuntimeError(f"OpenAI API error: {e}")
+    
+    # --- Request building / response parsing (shared with AsyncLLMClient) ---
+    
+    def _ollama_request(
+        self,
+        base_url: str,
+        prompt: str,
+        system_prompt: Optional[str],
+        max_tokens: int,
+        temperature: float,
+        json_schema: Optional[Dict],
+    ) -> Tuple[str, Dict]:
+        url = f"{base_url}/api/chat"
         
         # Build messages array for chat endpoint
         messages = []
@@ -60,34 +209,31 @@ class LLMClient:
                 "temperature": temperature,
             }
         }
+        if json_schema is not None:
+            # Ollama >= 0.5 accepts a JSON schema; older servers only understand "json"
+            structured = str(get_setting("OLLAMA_STRUCTURED_OUTPUT", "schema")).lower()
+            payload["format"] = json_schema if structured == "schema" else "json"
+        return url, payload
+    
+    @staticmethod
+    def _parse_ollama(result: Dict, json_schema: Optional[Dict]) -> str:
+        # Extract response from chat format
+        message = result.get("message", {})
+        content = message.get("content", "").strip()
         
-        try:
-            # Retry logic for Ollama (GPU overload handling)
-            max_retries = 2
-            for attempt in range(max_retries + 1):
-                try:
-                    response = requests.post(url, json=payload, timeout=60)
-                    response.raise_for_status()
-                    result = response.json()
-                    
-                    # Extract response from chat format
-                    message = result.get("message", {})
-                    content = message.get("content", "").strip()
-                    
-                    # Clean common LLM artifacts
-                    content = content.strip('"').strip("'")
-                    
-                    return content
-                except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
-                    if attempt < max_retries:
-                        print(f"Ollama retry {attempt + 1}/{max_retries} after error: {e}")
-                        continue
-                    raise
-        except Exception as e:
-            raise RuntimeError(f"Ollama API error: {e}")
+        # Clean common LLM artifacts (structured output must stay valid JSON)
+        if json_schema is None:
+            content = content.strip('"').strip("'")
+        return content
     
-    def _generate_openai(self, prompt: str, system_prompt: Optional[str], max_tokens: int, temperature: float) -> str:
-        """Generate using OpenAI API (fallback)."""
+    def _openai_request(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        max_tokens: int,
+        temperature: float,
+        json_schema: Optional[Dict],
+    ) -> Tuple[str, Dict, Dict]:
         if not self.openai_api_key:
             raise ValueError("OPENAI_API_KEY not configured")
         
@@ -108,23 +254,175 @@ class LLMClient:
             "max_tokens": max_tokens,
             "temperature": temperature,
         }
+        if json_schema is not None:
+            # JSON mode guarantees a JSON object; the prompt describes the fields
+            payload["response_format"] = {"type": "json_object"}
+        return url, headers, payload
+    
+    @staticmethod
+    def _parse_openai(result: Dict) -> str:
+        return result["choices"][0]["message"]["content"].strip()
+
+
+class AsyncLLMClient(LLMClient):
+    """
+    asyncio LLM client (httpx) with bounded concurrency.
+    
+    Reuses LLMClient's settings, payload building and response cache. Every
+    request holds a slot from a global semaphore (LLM_MAX_CONCURRENCY) and from
+    its provider's semaphore (LLM_OLLAMA_CONCURRENCY / LLM_OPENAI_CONCURRENCY).
+    Ollama requests are spread round-robin over OLLAMA_BASE_URLS when set.
+    """
+    
+    def __init__(self):
+        if httpx is None:
+            raise RuntimeError("AsyncLLMClient requires httpx: pip install 'yt-seo-tool[async]'")
+        super().__init__()
+        self.max_concurrency = get_int_setting("LLM_MAX_CONCURRENCY", 8)
+        self.provider_concurrency = {
+            "ollama": get_int_setting("LLM_OLLAMA_CONCURRENCY", 2),
+            "openai": get_int_setting("LLM_OPENAI_CONCURRENCY", 8),
+        }
+        replicas = str(get_setting("OLLAMA_BASE_URLS", "") or "")
+        self.ollama_base_urls: List[str] = [u.strip().rstrip("/") for u in replicas.split(",") if u.strip()] or [self.ollama_base_url]
+        self._replica_counter = itertools.count()
+        
+        # Per-event-loop state; rebuilt if the client is used from a new loop
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._http = None
+        self._global_sem: Optional[asyncio.Semaphore] = None
+        self._provider_sems: Dict[str, asyncio.Semaphore] = {}
+        self._stale_close: Optional[asyncio.Task] = None
+    
+    def _loop_state(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._close_stale_http(loop)
+            self._loop = loop
+            self._http = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout[1], connect=self.timeout[0]),
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+            )
+            self._global_sem = asyncio.Semaphore(self.max_concurrency)
+            self._provider_sems = {name: asyncio.Semaphore(n) for name, n in self.provider_concurrency.items()}
+        return self._http, self._global_sem, self._provider_sems[self.provider]
+    
+    def _close_stale_http(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Close the HTTP client left behind by a previous event loop."""
+        old, old_loop = self._http, self._loop
+        self._http = None
+        if old is None:
+            return
+        if old_loop is not None and old_loop.is_running():
+            # Still alive in another thread: close it there
+            asyncio.run_coroutine_threadsafe(old.aclose(), old_loop)
+        else:
+            # The loop is gone (e.g. a finished asyncio.run); release what can be released
+            self._stale_close = loop.create_task(_aclose_quietly(old))
+    
+    async def agenerate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: int = 500,
+        temperature: float = 0.7,
+        json_schema: Optional[Dict] = None,
+        use_cache: bool = True,
+        refresh_cache: bool = False,
+    ) -> str:
+        """Async counterpart of LLMClient.generate (same arguments and caching)."""
+        if self.provider not in ("ollama", "openai"):
+            raise ValueError(f"Unknown LLM provider: {self.provider}")
+        
+        cache = self.cache if use_cache and cache_allowed(temperature) else None
+        key = None
+        if cache is not None:
+            key = self._cache_key(prompt, system_prompt, max_tokens, temperature, json_schema)
+            if not refresh_cache:
+                cached = await asyncio.to_thread(cache.get, key)
+                if cached is not None:
+                    return cached
+        
+        http, global_sem, provider_sem = self._loop_state()
+        # Take the provider slot first so waiting on a busy provider doesn't hold a global slot
+        async with provider_sem, global_sem:
+            if self.provider == "ollama":
+                result = await self._agenerate_ollama(http, prompt, system_prompt, max_tokens, temperature, json_schema)
+            else:
+                result = await self._agenerate_openai(http, prompt, system_prompt, max_tokens, temperature, json_schema)
+        
+        if cache is not None and result:
+            await asyncio.to_thread(cache.put, key, result, self.provider, self._model_for_provider())
+        return result
+    
+    async def _agenerate_ollama(self, http, prompt, system_prompt, max_tokens, temperature, json_schema) -> str:
+        base_url = self.ollama_base_urls[next(self._replica_counter) % len(self.ollama_base_urls)]
+        url, payload = self._ollama_request(base_url, prompt, system_prompt, max_tokens, temperature, json_schema)
         
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=60)
+            # Same retry policy as the sync client (GPU overload handling)
+            max_retries = 2
+            for attempt in range(max_retries + 1):
+                try:
+                    response = await http.post(url, json=payload)
+                    response.raise_for_status()
+                    return self._parse_ollama(response.json(), json_schema)
+                except (httpx.TimeoutException, httpx.ConnectError) as e:
+                    if attempt < max_retries:
+                        print(f"Ollama retry {attempt + 1}/{max_retries} after error: {e}")
+                        continue
+                    raise
+        except Exception as e:
+            raise RuntimeError(f"Ollama API error: {e}")
+    
+    async def _agenerate_openai(self, http, prompt, system_prompt, max_tokens, temperature, json_schema) -> str:
+        url, headers, payload = self._openai_request(prompt, system_prompt, max_tokens, temperature, json_schema)
+        
+        try:
+            response = await http.post(url, json=payload, headers=headers)
             response.raise_for_status()
-            result = response.json()
-            return result["choices"][0]["message"]["content"].strip()
+            return self._parse_openai(response.json())
         except Exception as e:
             raise RuntimeError(f"OpenAI API error: {e}")
+    
+    async def aclose(self) -> None:
+        """Close the pooled async HTTP client."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+            self._loop = None
+
+
+async def _aclose_quietly(http) -> None:
+    try:
+        await http.aclose()
+    except Exception:
+        pass  # connections bound to a closed loop; their sockets go with it
 
 
 # Singleton instance
 _client: Optional[LLMClient] = None
+_client_lock = threading.Lock()
 
 
 def get_llm_client() -> LLMClient:
-    """Get or create singleton LLM client."""
+    """Get or create singleton LLM client (safe to call from worker threads)."""
     global _client
     if _client is None:
-        _client = LLMClient()
+        with _client_lock:
+            if _client is None:
+                _client = LLMClient()
     return _client
+
+
+_async_client: Optional[AsyncLLMClient] = None
+
+
+def get_async_llm_client() -> AsyncLLMClient:
+    """Get or create singleton async LLM client."""
+    global _async_client
+    if _async_client is None:
+        with _client_lock:
+            if _async_client is None:
+                _async_client = AsyncLLMClient()
+    return _async_client
@@ -19,6 +19,36 @@ def upsert_channel(conn: sqlite3.Connection, channel_id: str, title: str, last_s
     conn.commit()
 
 
+# Re-syncing refreshes YouTube fields but keeps the workflow status and episode link
+_UPSERT_VIDEO_SQL = """
+    INSERT INTO yt_videos(video_id, channel_id, channel_handle, title_original, description_original, tags_original, published_at, episode_id, status)
+    VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(video_id) DO UPDATE SET
+        channel_id=excluded.channel_id,
+        channel_handle=excluded.channel_handle,
+        title_original=excluded.title_original,
+        description_original=excluded.description_original,
+        tags_original=excluded.tags_original,
+        published_at=excluded.published_at,
+        episode_id=COALESCE(excluded.episode_id, yt_videos.episode_id),
+        status=COALESCE(yt_videos.status, excluded.status)
+"""
+
+# Fallback for old schema without channel_handle
+_UPSERT_VIDEO_SQL_NO_HANDLE = """
+    INSERT INTO yt_videos(video_id, channel_id, title_original, description_original, tags_original, published_at, episode_id, status)
+    VALUES(?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(video_id) DO UPDATE SET
+        channel_id=excluded.channel_id,
+        title_original=excluded.title_original,
+        description_original=excluded.description_original,
+        tags_original=excluded.tags_original,
+        published_at=excluded.published_at,
+        episode_id=COALESCE(excluded.episode_id, yt_videos.episode_id),
+        status=COALESCE(yt_videos.status, excluded.status)
+"""
+
+
 def upsert_video(
     conn: sqlite3.Connection,
     video_id: str,
@@ -30,49 +60,101 @@ def upsert_video(
     published_at: Optional[str] = None,
     episode_id: Optional[str] = None,
     status: Optional[str] = None,
+    commit: bool = True,
 ) -> None:
-    tags_json = json.dumps(tags_original or [])
-    
+    video = {
+        "video_id": video_id,
+        "channel_id": channel_id,
+        "title_original": title_original,
+        "description_original": description_original,
+        "tags_original": tags_original,
+        "published_at": published_at,
+        "episode_id": episode_id,
+        "status": status,
+    }
+    upsert_videos(conn, [video], channel_handle=channel_handle, commit=commit)
+
+
+def upsert_videos(
+    conn: sqlite3.Connection,
+    videos: List[Dict[str, Any]],
+    channel_handle: Optional[str] = None,
+    commit: bool = True,
+) -> None:
+    """Upsert many video dicts (as returned by youtube_api) with one executemany."""
     # Check if channel_handle column exists (for backward compatibility)
     cursor = conn.execute("PRAGMA table_info(yt_videos)")
     columns = [row[1] for row in cursor.fetchall()]
     has_channel_handle = "channel_handle" in columns
     
-    if has_channel_handle:
-        conn.execute(
-            """
-            INSERT INTO yt_videos(video_id, channel_id, channel_handle, title_original, description_original, tags_original, published_at, episode_id, status)
-            VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(video_id) DO UPDATE SET
-                channel_id=excluded.channel_id,
-                channel_handle=excluded.channel_handle,
-                title_original=excluded.title_original,
-                description_original=excluded.description_original,
-                tags_original=excluded.tags_original,
-                published_at=excluded.published_at,
-                episode_id=excluded.episode_id,
-                status=excluded.status
-            """,
-            (video_id, channel_id, channel_handle, title_original, description_original, tags_json, published_at, episode_id, status),
-        )
-    else:
-        # Fallback for old schema without channel_handle
-        conn.execute(
-            """
-            INSERT INTO yt_videos(video_id, channel_id, title_original, description_original, tags_original, published_at, episode_id, status)
-            VALUES(?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(video_id) DO UPDATE SET
-                channel_id=excluded.channel_id,
-                title_original=excluded.title_original,
-                description_original=excluded.description_original,
-                tags_original=excluded.tags_original,
-                published_at=excluded.published_at,
-                episode_id=excluded.episode_id,
-                status=excluded.status
-            """,
-            (video_id, channel_id, title_original, description_original, tags_json, published_at, episode_id, status),
+    rows = []
+    for v in videos:
+        row = (
+            v.get("video_id"),
+            v.get("channel_id"),
+            v.get("title_original"),
+            v.get("description_original"),
+            json.dumps(v.get("tags_original") or []),
+            v.get("published_at"),
+            v.get("episode_id"),
+            v.get("status"),
         )
-    conn.commit()
+        rows.append(row[:2] + (channel_handle,) + row[2:] if has_channel_handle else row)
+    conn.executemany(_UPSERT_VIDEO_SQL if has_channel_handle else _UPSERT_VIDEO_SQL_NO_HANDLE, rows)
+    if commit:
+        conn.commit()
+
+
+def get_channel_id_for_handle(conn: sqlite3.Connection, channel_handle: str) -> Optional[str]:
+    """
+    Channel ID for a handle from local data only: handles resolved by
+    youtube_api.get_channel, then videos synced under that handle.
+    """
+    key = channel_handle.lstrip("@").lower()
+    row = conn.execute("SELECT channel_id FROM yt_channel_handles WHERE handle=?", (key,)).fetchone()
+    if row:
+        return row[0]
+    
+    columns = [r[1] for r in conn.execute("PRAGMA table_info(yt_videos)").fetchall()]
+    if "channel_handle" not in columns:
+        return None
+    row = conn.execute(
+        """
+        SELECT channel_id FROM yt_videos
+        WHERE LOWER(LTRIM(channel_handle, '@')) = ? AND channel_id IS NOT NULL LIMIT 1
+        """,
+        (key,),
+    ).fetchone()
+    return row[0] if row else None
+
+
+def get_sync_checkpoint(conn: sqlite3.Connection, channel_id: str) -> Optional[Dict[str, Any]]:
+    row = conn.execute(
+        "SELECT since, page_token, page_offset, newest FROM yt_sync_checkpoints WHERE channel_id=?", (channel_id,)
+    ).fetchone()
+    return {"since": row[0], "page_token": row[1], "page_offset": row[2] or 0, "newest": row[3]} if row else None
+
+
+def save_sync_checkpoint(
+    conn: sqlite3.Connection,
+    channel_id: str,
+    since: Optional[str],
+    page_token: Optional[str],
+    page_offset: int,
+    newest: Optional[str],
+) -> None:
+    """Record sync progress; not committed, so it lands in the caller's page transaction."""
+    conn.execute(
+        """
+        INSERT OR REPLACE INTO yt_sync_checkpoints(channel_id, since, page_token, page_offset, newest, updated_at)
+        VALUES(?, ?, ?, ?, ?, datetime('now'))
+        """,
+        (channel_id, since, page_token, page_offset, newest),
+    )
+
+
+def clear_sync_checkpoint(conn: sqlite3.Connection, channel_id: str) -> None:
+    conn.execute("DELETE FROM yt_sync_checkpoints WHERE channel_id=?", (channel_id,))
 
 
 def create_suggestion(
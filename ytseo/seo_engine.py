@@ -1,9 +1,16 @@
 from __future__ import annotations
 
+import asyncio
+import json
 import re
-from typing import Dict, List, Optional
-
-from .llm_client import get_llm_client
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from .config import get_float_setting, get_int_setting, get_setting
+from .llm_client import get_async_llm_client, get_llm_client
 from .ai_ewg_bridge import get_episode_by_id
 
 
@@ -114,14 +121,83 @@ Output format:
 - A short pinned comment as plain text, no quotes and no explanation.
 """
 
+COMBINED_SYSTEM_PROMPT = """
+You are an SEO specialist for a YouTube channel publishing news, politics, economics, and interview content.
+
+Produce every piece of SEO metadata for one video in a single JSON object with these keys:
+- "title": search-intent focused, professional, non-clickbait, max 100 characters. Mention a country/region only when it matters to the topic.
+- "description": 200–300 words. The first 1–2 lines state what the video covers in natural search language; summarize the topic, key names and entities; end with a short professional call-to-action. No markdown, no emojis.
+- "tags": array of 20–30 short keyword phrases (1–4 words) mixing broad and specific search terms.
+- "hashtags": array of 5–10 topic hashtags, each starting with # and containing no spaces.
+- "thumbnail_text": array of 3–5 very short options (2–6 words each), easy to read on a small screen, no clickbait.
+- "pinned_comment": 2–3 polite, professional sentences thanking viewers and inviting them to comment, like and subscribe. No emojis.
+
+Return ONLY the JSON object, with no explanation.
+"""
+
+COMBINED_JSON_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "description": {"type": "string"},
+        "tags": {"type": "array", "items": {"type": "string"}},
+        "hashtags": {"type": "array", "items": {"type": "string"}},
+        "thumbnail_text": {"type": "array", "items": {"type": "string"}},
+        "pinned_comment": {"type": "string"},
+    },
+    "required": ["title", "description", "tags", "hashtags", "thumbnail_text", "pinned_comment"],
+}
+
 
 def generate_title(context: Dict) -> str:
     """
     Generate SEO-optimized title focused on search intent.
     Max 100 characters, topic-first, region only when relevant.
     """
+    return _generate_field("title", context)
+
+
+def generate_description(context: Dict) -> str:
+    """
+    Generate SEO-optimized description (200-300 words).
+    Search-intent focused, includes summary, key segments, and CTA.
+    """
+    return _generate_field("description", context)
+
+
+def generate_tags(context: Dict) -> List[str]:
+    """
+    Generate 20-30 SEO tags based on content.
+    Merges with existing tags (never deletes).
+    """
+    return _generate_field("tags", context)
+
+
+def generate_hashtags(context: Dict) -> List[str]:
+    """
+    Generate 5-10 hashtags for social media.
+    """
+    return _generate_field("hashtags", context)
+
+
+def generate_thumbnail_text(context: Dict) -> List[str]:
+    """
+    Generate 3-5 punchy thumbnail text options (short, attention-grabbing).
+    """
+    return _generate_field("thumbnail_text", context)
+
+
+def generate_pinned_comment(context: Dict) -> str:
+    """
+    Generate polite, Canadian-toned pinned comment with CTA.
+    """
+    return _generate_field("pinned_comment", context)
+
+
+# --- Prompt builders: (context, episode_data) -> user prompt ---
+
+def _title_prompt(context: Dict, episode_data: Dict) -> str:
     original_title = context.get("title_original", "")
-    episode_data = _get_episode_context(context)
     
     # Build context for LLM
     show_name = episode_data.get("show_name", "")
@@ -136,36 +212,17 @@ def generate_title(context: Dict) -> str:
     topics_str = ", ".join(topics[:3]) if topics else ""
     guests_str = ", ".join(guests[:2]) if guests else ""
     
-    user_prompt = f"""Original title: {original_title}
+    return f"""Original title: {original_title}
 Main topics: {topics_str or 'N/A'}
 Guests/speakers: {guests_str or 'N/A'}
 Show name (optional): {show_name or 'N/A'}
 
 Generate an improved YouTube title that focuses on search intent and the main topic. Return ONLY the title, no explanation."""
-    
-    try:
-        llm = get_llm_client()
-        generated = llm.generate(user_prompt, TITLE_SYSTEM_PROMPT, max_tokens=100, temperature=0.7)
-        title = generated.strip().strip('"').strip("'")
-        
-        # Safety: enforce max length
-        if len(title) > 100:
-            title = title[:97] + "..."
-        
-        return title if title else original_title
-    except Exception as e:
-        print(f"LLM error generating title: {e}")
-        return original_title
 
 
-def generate_description(context: Dict) -> str:
-    """
-    Generate SEO-optimized description (200-300 words).
-    Search-intent focused, includes summary, key segments, and CTA.
-    """
+def _description_prompt(context: Dict, episode_data: Dict) -> str:
     original_desc = context.get("description_original", "")
     original_title = context.get("title_original", "")
-    episode_data = _get_episode_context(context)
     
     show_name = episode_data.get("show_name", "")
     summary = episode_data.get("summary", "")
@@ -181,7 +238,7 @@ def generate_description(context: Dict) -> str:
     guests_str = ", ".join(guests) if guests else "N/A"
     moments_str = "\n".join([f"- {m.get('title', '')}" for m in key_moments[:5]]) if key_moments else ""
     
-    user_prompt = f"""Video title: {original_title}
+    return f"""Video title: {original_title}
 Original description: {original_desc[:800]}
 Summary: {summary or 'N/A'}
 Main topics: {topics_str}
@@ -191,30 +248,12 @@ Key moments:
 Show name (optional): {show_name or 'N/A'}
 
 Generate a YouTube description (200-300 words) that clearly explains what this video covers and why viewers should watch. Focus on search intent and natural language."""
-    
-    try:
-        llm = get_llm_client()
-        description = llm.generate(user_prompt, DESCRIPTION_SYSTEM_PROMPT, max_tokens=500, temperature=0.7)
-        
-        # Safety: enforce reasonable length
-        if len(description) > 5000:
-            description = description[:4997] + "..."
-        
-        return description.strip() if description else original_desc
-    except Exception as e:
-        print(f"LLM error generating description: {e}")
-        return original_desc
 
 
-def generate_tags(context: Dict) -> List[str]:
-    """
-    Generate 20-30 SEO tags based on content.
-    Merges with existing tags (never deletes).
-    """
+def _tags_prompt(context: Dict, episode_data: Dict) -> str:
     original_tags = context.get("tags_original", [])
     original_title = context.get("title_original", "")
     original_desc = context.get("description_original", "")
-    episode_data = _get_episode_context(context)
     
     topics = episode_data.get("topics", [])
     entities = episode_data.get("entities", [])
@@ -229,7 +268,7 @@ def generate_tags(context: Dict) -> List[str]:
     entities_str = ", ".join([e.get("name", "") for e in entities[:10]]) if entities else ""
     guests_str = ", ".join(guests) if guests else ""
     
-    user_prompt = f"""Video title: {original_title}
+    return f"""Video title: {original_title}
 Video description (first 400 chars): {original_desc[:400] if original_desc else 'N/A'}
 Main topics: {topics_str or 'N/A'}
 Guests/speakers: {guests_str or 'N/A'}
@@ -238,167 +277,586 @@ Show name: {show_name or 'N/A'}
 Existing tags: {', '.join(original_tags[:10]) if original_tags else 'None'}
 
 Generate 20-30 YouTube tags as a comma-separated list. Focus on search terms related to the specific video content, including guest names, topics discussed, and key themes. Return ONLY the comma-separated tags."""
-    
-    try:
-        llm = get_llm_client()
-        generated = llm.generate(user_prompt, TAGS_SYSTEM_PROMPT, max_tokens=300, temperature=0.6)
-        
-        # Parse tags from response
-        import json
-        new_tags = []
-        
-        # Clean the response first
-        generated = generated.strip()
-        
-        # Try to parse as JSON array
-        if generated.startswith("[") and generated.endswith("]"):
-            try:
-                parsed = json.loads(generated)
-                if isinstance(parsed, list):
-                    new_tags = [str(t).strip() for t in parsed if t and isinstance(t, str)]
-            except json.JSONDecodeError:
-                # Fallback to comma parsing
-                pass
-        
-        # If not parsed yet, treat as comma-separated
-        if not new_tags:
-            # Split by comma and clean each tag
-            raw_tags = generated.split(",")
-            for tag in raw_tags:
-                tag = tag.strip().strip('"').strip("'").strip("[").strip("]").strip()
-                if tag and len(tag) > 2 and len(tag) < 100:
-                    new_tags.append(tag)
-        
-        # Merge with original (deduplicate, preserve order)
-        all_tags = list(original_tags) + new_tags
-        seen = set()
-        unique_tags = []
-        for tag in all_tags:
-            if isinstance(tag, str) and len(tag) > 2:
-                tag_lower = tag.lower()
-                if tag_lower not in seen:
-                    seen.add(tag_lower)
-                    unique_tags.append(tag)
-        return unique_tags[:30]  # Limit to 30
-    except Exception as e:
-        print(f"LLM error generating tags: {e}")
-        import traceback
-        traceback.print_exc()
-        return list(original_tags) + ["news", "politics", "analysis"]
 
 
-def generate_hashtags(context: Dict) -> List[str]:
-    """
-    Generate 5-10 hashtags for social media.
-    """
+def _hashtags_prompt(context: Dict, episode_data: Dict) -> str:
     original_title = context.get("title_original", "")
-    episode_data = _get_episode_context(context)
     topics = episode_data.get("topics", [])
     
     # Fallback to title if no topics
     if not topics and original_title:
         topics = [original_title]
     
-    user_prompt = f"""Video title: {original_title}
+    return f"""Video title: {original_title}
 Main topics: {', '.join(topics) if topics else 'N/A'}
 
 Generate 5-10 relevant hashtags as a comma-separated list. Return ONLY the hashtags with # prefix."""
-    
-    try:
-        llm = get_llm_client()
-        generated = llm.generate(user_prompt, HASHTAGS_SYSTEM_PROMPT, max_tokens=100, temperature=0.6)
-        
-        # Parse hashtags (handle various formats)
-        hashtags = []
-        
-        # Split by common delimiters
-        parts = re.split(r'[,\n]', generated)
-        for part in parts:
-            part = part.strip()
-            # Extract hashtags from text
-            found = re.findall(r'#\w+', part)
-            if found:
-                hashtags.extend(found)
-            elif part and not any(c in part for c in [':', '?', '.']):
-                # Clean text that might be a hashtag
-                clean = part.strip('#').strip()
-                if clean and len(clean) > 2:
-                    clean_no_spaces = re.sub(r'\s+', '', clean)
-                    hashtags.append(f"#{clean_no_spaces}")
-        
-        # Deduplicate and limit
-        seen = set()
-        unique_hashtags = []
-        for h in hashtags:
-            h_lower = h.lower()
-            if h_lower not in seen and len(h) > 2:
-                seen.add(h_lower)
-                unique_hashtags.append(h)
-        
-        return unique_hashtags[:10] if unique_hashtags else ["#CanadianNews", "#Canada", "#News"]
-    except Exception as e:
-        print(f"LLM error generating hashtags: {e}")
-        return ["#CanadianNews", "#Canada", "#News"]
 
 
-def generate_thumbnail_text(context: Dict) -> List[str]:
-    """
-    Generate 3-5 punchy thumbnail text options (short, attention-grabbing).
-    """
+def _thumbnail_prompt(context: Dict, episode_data: Dict) -> str:
     original_title = context.get("title_original", "")
-    episode_data = _get_episode_context(context)
     topics = episode_data.get("topics", [])
     
-    user_prompt = f"""Video title: {original_title}
+    return f"""Video title: {original_title}
 Main topics: {', '.join(topics[:3]) if topics else 'N/A'}
 
 Generate 3-5 short thumbnail text options (2-6 words each). Return as a numbered list."""
+
+
+def _pinned_comment_prompt(context: Dict, episode_data: Dict) -> str:
+    original_title = context.get("title_original", "this episode")
+    show_name = episode_data.get("show_name", "The News Forum")
+    
+    return f"""Video topic: {original_title}
+Show name (optional): {show_name or 'N/A'}
+
+Generate a professional pinned comment that thanks viewers, encourages them to subscribe, and invites discussion."""
+
+
+@dataclass(frozen=True)
+class _FieldSpec:
+    """How to prompt for, parse and fall back on a single SEO field."""
+    label: str
+    system_prompt: str
+    max_tokens: int
+    temperature: float
+    build_prompt: Callable[[Dict, Dict], str]
+    parse: Callable[[Dict, str], Any]
+    fallback: Callable[[Dict, Dict], Any]
+
+
+_FIELD_SPECS: Dict[str, _FieldSpec] = {
+    "title": _FieldSpec(
+        "title", TITLE_SYSTEM_PROMPT, 100, 0.7, _title_prompt,
+        lambda ctx, generated: _clean_title(generated),
+        lambda ctx, ep: ctx.get("title_original", ""),
+    ),
+    "description": _FieldSpec(
+        "description", DESCRIPTION_SYSTEM_PROMPT, 500, 0.7, _description_prompt,
+        lambda ctx, generated: _clean_description(generated),
+        lambda ctx, ep: ctx.get("description_original", ""),
+    ),
+    "tags": _FieldSpec(
+        "tags", TAGS_SYSTEM_PROMPT, 300, 0.6, _tags_prompt,
+        lambda ctx, generated: _merge_tags(ctx.get("tags_original", []), _parse_tags(generated)),
+        lambda ctx, ep: _fallback_tags(ctx),
+    ),
+    "hashtags": _FieldSpec(
+        "hashtags", HASHTAGS_SYSTEM_PROMPT, 100, 0.6, _hashtags_prompt,
+        lambda ctx, generated: _parse_hashtags(generated),
+        lambda ctx, ep: _fallback_hashtags(ctx),
+    ),
+    "thumbnail_text": _FieldSpec(
+        "thumbnail text", THUMBNAIL_SYSTEM_PROMPT, 150, 0.8, _thumbnail_prompt,
+        lambda ctx, generated: _parse_thumbnail_text(generated),
+        lambda ctx, ep: _fallback_thumbnail_text(ctx),
+    ),
+    "pinned_comment": _FieldSpec(
+        "pinned comment", PINNED_COMMENT_SYSTEM_PROMPT, 150, 0.7, _pinned_comment_prompt,
+        lambda ctx, generated: generated.strip(),
+        lambda ctx, ep: _fallback_pinned_comment(ep.get("show_name", "The News Forum")),
+    ),
+}
+
+
+def _generate_field(field: str, context: Dict) -> Any:
+    """Prompt, call the LLM and parse one field, falling back on errors or empty output."""
+    spec = _FIELD_SPECS[field]
+    episode_data = _get_episode_context(context)
+    user_prompt = spec.build_prompt(context, episode_data)
     
     try:
-        llm = get_llm_client()
-        generated = llm.generate(user_prompt, THUMBNAIL_SYSTEM_PROMPT, max_tokens=150, temperature=0.8)
-        
-        # Parse options (handle numbered lists or line breaks)
-        lines = [l.strip() for l in generated.split("\n") if l.strip()]
-        options = []
-        for line in lines:
-            # Remove numbering (1., 1), -, etc.)
-            text = re.sub(r'^[\d\-\.\)\*]+\s*', '', line).strip().strip('"').strip("'")
-            if text and len(text.split()) <= 10:  # Reasonable length
-                options.append(text)
-        
-        return options[:5] if options else [original_title[:40]]
+        generated = _llm_generate(context, user_prompt, spec.system_prompt, spec.max_tokens, spec.temperature)
+        value = spec.parse(context, generated)
+        return value if value else spec.fallback(context, episode_data)
     except Exception as e:
-        print(f"LLM error generating thumbnail text: {e}")
-        return [original_title[:40]]
+        print(f"LLM error generating {spec.label}: {e}")
+        return spec.fallback(context, episode_data)
 
 
-def generate_pinned_comment(context: Dict) -> str:
+async def _agenerate_field(field: str, context: Dict) -> Any:
+    """Async counterpart of _generate_field."""
+    spec = _FIELD_SPECS[field]
+    episode_data = await asyncio.to_thread(_get_episode_context, context)
+    user_prompt = spec.build_prompt(context, episode_data)
+    
+    try:
+        generated = await _allm_generate(context, user_prompt, spec.system_prompt, spec.max_tokens, spec.temperature)
+        value = spec.parse(context, generated)
+        return value if value else spec.fallback(context, episode_data)
+    except Exception as e:
+        print(f"LLM error generating {spec.label}: {e}")
+        return spec.fallback(context, episode_data)
+
+
+async def agenerate_title(context: Dict) -> str:
+    return await _agenerate_field("title", context)
+
+
+async def agenerate_description(context: Dict) -> str:
+    return await _agenerate_field("description", context)
+
+
+async def agenerate_tags(context: Dict) -> List[str]:
+    return await _agenerate_field("tags", context)
+
+
+async def agenerate_hashtags(context: Dict) -> List[str]:
+    return await _agenerate_field("hashtags", context)
+
+
+async def agenerate_thumbnail_text(context: Dict) -> List[str]:
+    return await _agenerate_field("thumbnail_text", context)
+
+
+async def agenerate_pinned_comment(context: Dict) -> str:
+    return await _agenerate_field("pinned_comment", context)
+
+
+# Per-field generators, in the order they are stored on a suggestion
+FIELD_GENERATORS: Dict[str, Callable[[Dict], Any]] = {
+    "title": generate_title,
+    "description": generate_description,
+    "tags": generate_tags,
+    "hashtags": generate_hashtags,
+    "thumbnail_text": generate_thumbnail_text,
+    "pinned_comment": generate_pinned_comment,
+}
+
+
+def generate_suggestion(context: Dict, mode: Optional[str] = None) -> Dict[str, Any]:
     """
-    Generate polite, Canadian-toned pinned comment with CTA.
+    Generate all SEO fields for one video.
+    
+    Modes (default from SEO_GENERATION_MODE):
+    - 'per_field': one LLM call per field, one after another (original behaviour)
+    - 'parallel': one LLM call per field, issued concurrently on a shared pool
+    - 'combined': one JSON-mode call for all fields, per-field fallback for
+      any field that fails validation
+    """
+    mode = mode or str(get_setting("SEO_GENERATION_MODE", "per_field"))
+    context = prepare_context(context)
+    if mode == "combined":
+        return generate_all_fields(context)
+    if mode == "parallel":
+        return generate_fields_concurrently(context)
+    return {field: gen(context) for field, gen in FIELD_GENERATORS.items()}
+
+
+_field_pool: Optional[ThreadPoolExecutor] = None
+_field_pool_lock = threading.Lock()
+
+
+def _get_field_pool() -> ThreadPoolExecutor:
+    """
+    Process-wide pool for parallel field generation, sized by SEO_FIELD_WORKERS.
+    
+    Shared by every video (and every `generate --workers` thread), so the
+    number of in-flight field calls stays bounded however many videos run.
+    """
+    global _field_pool
+    if _field_pool is None:
+        with _field_pool_lock:
+            if _field_pool is None:
+                _field_pool = ThreadPoolExecutor(
+                    max_workers=max(1, get_int_setting("SEO_FIELD_WORKERS", len(FIELD_GENERATORS))),
+                    thread_name_prefix="seo-field",
+                )
+    return _field_pool
+
+
+# How often to look for queued fields that have started running
+_FIELD_POLL_SECONDS = 0.05
+
+
+def generate_fields_concurrently(context: Dict, timeout: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Run the six per-field generators concurrently and assemble the result.
+    
+    The fields are independent, so wall time is roughly that of the slowest
+    field. A field that raises, or is still running `timeout` seconds (default
+    SEO_FIELD_TIMEOUT) after it started, gets its fallback value instead; time
+    spent waiting for a free SEO_FIELD_WORKERS thread does not count. A
+    timed-out call cannot be interrupted; it finishes in the background and
+    its result is discarded. Raises RuntimeError if no field was generated,
+    so an all-fallback result is never stored as a suggestion.
+    """
+    timeout = timeout if timeout is not None else get_float_setting("SEO_FIELD_TIMEOUT", 120.0)
+    started: Dict[str, float] = {}
+    
+    def run(field: str, gen: Callable[[Dict], Any]) -> Any:
+        started[field] = time.monotonic()
+        return gen(context)
+    
+    pending = {field: _get_field_pool().submit(run, field, gen) for field, gen in FIELD_GENERATORS.items()}
+    results: Dict[str, Any] = {}
+    fallbacks: List[str] = []
+    while pending:
+        now = time.monotonic()
+        for field, future in list(pending.items()):
+            label = _FIELD_SPECS[field].label
+            if future.done():
+                if future.exception() is None:
+                    results[field] = future.result()
+                else:
+                    print(f"Error generating {label}: {future.exception()}, using fallback")
+                    fallbacks.append(field)
+            elif field in started and now - started[field] >= timeout:
+                print(f"Timed out generating {label} after {timeout:g}s, using fallback")
+                fallbacks.append(field)
+            else:
+                continue
+            del pending[field]
+        if not pending:
+            break
+        
+        remaining = [started[f] + timeout - now for f in pending if f in started]
+        if len(remaining) < len(pending):
+            remaining.append(_FIELD_POLL_SECONDS)  # some are still queued
+        wait(pending.values(), timeout=max(0.0, min(remaining)), return_when=FIRST_COMPLETED)
+    
+    if not results:
+        raise RuntimeError("no SEO field could be generated")
+    for field in fallbacks:
+        results[field] = _FIELD_SPECS[field].fallback(context, _get_episode_context(context))
+    return {field: results[field] for field in FIELD_GENERATORS}
+
+
+def generate_all_fields(context: Dict) -> Dict[str, Any]:
+    """
+    Generate every SEO field in a single structured (JSON) LLM call.
+    
+    Each field is validated with the same parsers as the per-field path;
+    only fields that are missing or invalid are regenerated individually.
     """
-    original_title = context.get("title_original", "this episode")
     episode_data = _get_episode_context(context)
-    show_name = episode_data.get("show_name", "The News Forum")
+    user_prompt = _combined_prompt(context, episode_data)
     
-    user_prompt = f"""Video topic: {original_title}
-Show name (optional): {show_name or 'N/A'}
+    results: Dict[str, Any] = {}
+    try:
+        generated = _llm_generate(
+            context,
+            user_prompt,
+            COMBINED_SYSTEM_PROMPT,
+            max_tokens=1200,
+            temperature=0.7,
+            json_schema=COMBINED_JSON_SCHEMA,
+        )
+        results = _validate_combined(json.loads(generated), context.get("tags_original", []))
+    except Exception as e:
+        print(f"LLM error generating combined suggestion: {e}")
+    
+    missing = [field for field in FIELD_GENERATORS if field not in results]
+    if missing:
+        print(f"Combined generation fell back to per-field for: {', '.join(missing)}")
+    for field in missing:
+        results[field] = FIELD_GENERATORS[field](context)
+    
+    return {field: results[field] for field in FIELD_GENERATORS}
 
-Generate a professional pinned comment that thanks viewers, encourages them to subscribe, and invites discussion."""
+
+async def agenerate_suggestion(context: Dict, mode: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Async counterpart of generate_suggestion.
     
+    In per-field mode the six calls are issued concurrently; overall
+    concurrency is bounded by the AsyncLLMClient semaphores, so callers can
+    gather many videos at once.
+    """
+    mode = mode or str(get_setting("SEO_GENERATION_MODE", "per_field"))
+    context = await asyncio.to_thread(prepare_context, context)
+    if mode == "combined":
+        return await agenerate_all_fields(context)
+    values = await asyncio.gather(*(_agenerate_field(field, context) for field in FIELD_GENERATORS))
+    return dict(zip(FIELD_GENERATORS, values))
+
+
+async def agenerate_all_fields(context: Dict) -> Dict[str, Any]:
+    """Async counterpart of generate_all_fields."""
+    episode_data = await asyncio.to_thread(_get_episode_context, context)
+    user_prompt = _combined_prompt(context, episode_data)
+    
+    results: Dict[str, Any] = {}
     try:
-        llm = get_llm_client()
-        comment = llm.generate(user_prompt, PINNED_COMMENT_SYSTEM_PROMPT, max_tokens=150, temperature=0.7)
-        return comment.strip() if comment else "Thanks for watching! Subscribe for more news and analysis. Share your thoughts in the comments below."
+        generated = await _allm_generate(
+            context,
+            user_prompt,
+            COMBINED_SYSTEM_PROMPT,
+            max_tokens=1200,
+            temperature=0.7,
+            json_schema=COMBINED_JSON_SCHEMA,
+        )
+        results = _validate_combined(json.loads(generated), context.get("tags_original", []))
     except Exception as e:
-        print(f"LLM error generating pinned comment: {e}")
-        return f"Thanks for watching! Subscribe to {show_name} for more Canadian news and analysis."
+        print(f"LLM error generating combined suggestion: {e}")
+    
+    missing = [field for field in FIELD_GENERATORS if field not in results]
+    if missing:
+        print(f"Combined generation fell back to per-field for: {', '.join(missing)}")
+        values = await asyncio.gather(*(_agenerate_field(field, context) for field in missing))
+        results.update(zip(missing, values))
+    
+    return {field: results[field] for field in FIELD_GENERATORS}
+
+
+def _combined_prompt(context: Dict, episode_data: Dict) -> str:
+    original_title = context.get("title_original", "")
+    original_desc = context.get("description_original", "") or ""
+    original_tags = context.get("tags_original", [])
+    
+    show_name = episode_data.get("show_name", "")
+    summary = episode_data.get("summary", "")
+    topics = episode_data.get("topics", [])
+    guests = episode_data.get("guest_names", [])
+    entities = episode_data.get("entities", [])
+    key_moments = episode_data.get("key_moments", [])
+    
+    if not topics and original_title:
+        topics = [original_title]
+    
+    entities_str = ", ".join([e.get("name", "") for e in entities[:10]]) if entities else ""
+    moments_str = "\n".join([f"- {m.get('title', '')}" for m in key_moments[:5]]) if key_moments else ""
+    
+    return f"""Video title: {original_title}
+Original description: {original_desc[:800]}
+Summary: {summary or 'N/A'}
+Main topics: {', '.join(topics) if topics else 'N/A'}
+Guests/speakers: {', '.join(guests) if guests else 'N/A'}
+Organizations mentioned: {entities_str or 'N/A'}
+Key moments:
+{moments_str or 'N/A'}
+Show name (optional): {show_name or 'N/A'}
+Existing tags: {', '.join(original_tags[:10]) if original_tags else 'None'}
+
+Generate all SEO fields for this video and return them as a single JSON object."""
+
+
+def _validate_combined(data: Any, original_tags: List[str]) -> Dict[str, Any]:
+    """Validate each field of a combined JSON response; invalid ones are dropped."""
+    if not isinstance(data, dict):
+        return {}
+    
+    out: Dict[str, Any] = {}
+    
+    title = _clean_title(data.get("title")) if isinstance(data.get("title"), str) else ""
+    if title:
+        out["title"] = title
+    
+    description = _clean_description(data.get("description")) if isinstance(data.get("description"), str) else ""
+    if len(description.split()) >= 30:
+        out["description"] = description
+    
+    tags = _parse_tags(_as_text(data.get("tags"), ", "))
+    if len(tags) >= 5:
+        out["tags"] = _merge_tags(original_tags, tags)
+    
+    hashtags = _parse_hashtags(_as_text(data.get("hashtags"), ", "))
+    if hashtags:
+        out["hashtags"] = hashtags
+    
+    thumbnail = _parse_thumbnail_text(_as_text(data.get("thumbnail_text"), "\n"))
+    if thumbnail:
+        out["thumbnail_text"] = thumbnail
+    
+    comment = data.get("pinned_comment")
+    if isinstance(comment, str) and comment.strip():
+        out["pinned_comment"] = comment.strip()
+    
+    return out
+
+
+def _as_text(value: Any, sep: str) -> str:
+    """Normalize a JSON list-or-string field to the text format the parsers expect."""
+    if isinstance(value, list):
+        return sep.join(str(v) for v in value if isinstance(v, (str, int, float)))
+    if isinstance(value, str):
+        return value
+    return ""
+
+
+# --- Response parsing (shared by per-field and combined modes) ---
+
+def _clean_title(generated: str) -> str:
+    title = generated.strip().strip('"').strip("'")
+    
+    # Safety: enforce max length
+    if len(title) > 100:
+        title = title[:97] + "..."
+    return title
+
+
+def _clean_description(description: str) -> str:
+    # Safety: enforce reasonable length
+    if len(description) > 5000:
+        description = description[:4997] + "..."
+    return description.strip()
+
+
+def _parse_tags(generated: str) -> List[str]:
+    new_tags: List[str] = []
+    
+    # Clean the response first
+    generated = generated.strip()
+    
+    # Try to parse as JSON array
+    if generated.startswith("[") and generated.endswith("]"):
+        try:
+            parsed = json.loads(generated)
+            if isinstance(parsed, list):
+                new_tags = [str(t).strip() for t in parsed if t and isinstance(t, str)]
+        except json.JSONDecodeError:
+            # Fallback to comma parsing
+            pass
+    
+    # If not parsed yet, treat as comma-separated
+    if not new_tags:
+        # Split by comma and clean each tag
+        raw_tags = generated.split(",")
+        for tag in raw_tags:
+            tag = tag.strip().strip('"').strip("'").strip("[").strip("]").strip()
+            if tag and len(tag) > 2 and len(tag) < 100:
+                new_tags.append(tag)
+    return new_tags
+
+
+def _merge_tags(original_tags: List[str], new_tags: List[str]) -> List[str]:
+    # Merge with original (deduplicate, preserve order)
+    all_tags = list(original_tags) + new_tags
+    seen = set()
+    unique_tags = []
+    for tag in all_tags:
+        if isinstance(tag, str) and len(tag) > 2:
+            tag_lower = tag.lower()
+            if tag_lower not in seen:
+                seen.add(tag_lower)
+                unique_tags.append(tag)
+    return unique_tags[:30]  # Limit to 30
+
+
+def _parse_hashtags(generated: str) -> List[str]:
+    # Parse hashtags (handle various formats)
+    hashtags = []
+    
+    # Split by common delimiters
+    parts = re.split(r'[,\n]', generated)
+    for part in parts:
+        part = part.strip()
+        # Extract hashtags from text
+        found = re.findall(r'#\w+', part)
+        if found:
+            hashtags.extend(found)
+        elif part and not any(c in part for c in [':', '?', '.']):
+            # Clean text that might be a hashtag
+            clean = part.strip('#').strip()
+            if clean and len(clean) > 2:
+                clean_no_spaces = re.sub(r'\s+', '', clean)
+                hashtags.append(f"#{clean_no_spaces}")
+    
+    # Deduplicate and limit
+    seen = set()
+    unique_hashtags = []
+    for h in hashtags:
+        h_lower = h.lower()
+        if h_lower not in seen and len(h) > 2:
+            seen.add(h_lower)
+            unique_hashtags.append(h)
+    return unique_hashtags[:10]
+
+
+def _parse_thumbnail_text(generated: str) -> List[str]:
+    # Parse options (handle numbered lists or line breaks)
+    lines = [l.strip() for l in generated.split("\n") if l.strip()]
+    options = []
+    for line in lines:
+        # Remove numbering (1., 1), -, etc.)
+        text = re.sub(r'^[\d\-\.\)\*]+\s*', '', line).strip().strip('"').strip("'")
+        if text and len(text.split()) <= 10:  # Reasonable length
+            options.append(text)
+    return options[:5]
+
+
+# --- Fallback values when the LLM fails ---
+
+def _fallback_tags(context: Dict) -> List[str]:
+    return list(context.get("tags_original", [])) + ["news", "politics", "analysis"]
+
+
+def _fallback_hashtags(context: Dict) -> List[str]:
+    return ["#CanadianNews", "#Canada", "#News"]
+
+
+def _fallback_thumbnail_text(context: Dict) -> List[str]:
+    return [context.get("title_original", "")[:40]]
+
+
+def _fallback_pinned_comment(show_name: str) -> str:
+    return f"Thanks for watching! Subscribe to {show_name} for more Canadian news and analysis."
+
+
+def _llm_generate(
+    context: Dict,
+    prompt: str,
+    system_prompt: str,
+    max_tokens: int,
+    temperature: float,
+    json_schema: Optional[Dict] = None,
+) -> str:
+    """
+    Call the shared LLM client. Setting context["refresh_cache"] skips cached
+    responses (e.g. an explicit "Regenerate") while still refreshing the cache.
+    """
+    llm = get_llm_client()
+    return llm.generate(
+        prompt,
+        system_prompt,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        json_schema=json_schema,
+        refresh_cache=bool(context.get("refresh_cache")),
+    )
+
+
+async def _allm_generate(
+    context: Dict,
+    prompt: str,
+    system_prompt: str,
+    max_tokens: int,
+    temperature: float,
+    json_schema: Optional[Dict] = None,
+) -> str:
+    """Async counterpart of _llm_generate."""
+    llm = get_async_llm_client()
+    return await llm.agenerate(
+        prompt,
+        system_prompt,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        json_schema=json_schema,
+        refresh_cache=bool(context.get("refresh_cache")),
+    )
+
+
+def prepare_context(context: Dict) -> Dict:
+    """
+    Return a copy of context with AI-EWG episode data resolved once.
+    
+    The result carries it under "episode_data", so every generator for the
+    same video reuses it instead of looking the episode up again.
+    """
+    if "episode_data" in context:
+        return context
+    ctx = dict(context)
+    ctx["episode_data"] = _get_episode_context(context)
+    return ctx
 
 
 def _get_episode_context(context: Dict) -> Dict:
     """
     Enrich context with AI-EWG episode data if available.
     """
+    if "episode_data" in context:
+        return context["episode_data"] or {}
+    
     episode_id = context.get("episode_id")
     if not episode_id:
         return {}
@@ -416,14 +874,7 @@ def generate_multilanguage_variants(context: Dict, languages: List[str]) -> Dict
     Generate SEO metadata for multiple languages.
     Currently generates English base, future: LLM-based translation.
     """
-    base = {
-        "title": generate_title(context),
-        "description": generate_description(context),
-        "tags": generate_tags(context),
-        "hashtags": generate_hashtags(context),
-        "thumbnail_text": generate_thumbnail_text(context),
-        "pinned_comment": generate_pinned_comment(context),
-    }
+    base = generate_suggestion(context)
     
     # TODO: Implement LLM-based translation for non-English languages
     # For now, return same content for all languages
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import uuid
+import zlib
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+def new_batch_id(kind: str = "apply") -> str:
+    """Sortable, unique ID for one apply (or rollback) run."""
+    return f"{kind}-{datetime.utcnow():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+
+
+def pack_snippet(snippet: Dict) -> bytes:
+    """The fields an apply can change, as compressed compact JSON."""
+    fields = {
+        "title": snippet.get("title") or "",
+        "description": snippet.get("description") or "",
+        "tags": list(snippet.get("tags") or []),
+    }
+    return zlib.compress(json.dumps(fields, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 9)
+
+
+def unpack_snippet(blob: bytes) -> Dict:
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+def save_snapshots(conn: sqlite3.Connection, batch_id: str, snippets: Dict[str, Dict]) -> None:
+    """Store the current snippets of videos about to be updated in `batch_id`."""
+    conn.executemany(
+        "INSERT INTO yt_video_snapshots(batch_id, video_id, snippet_z, created_at) VALUES(?, ?, ?, datetime('now'))",
+        [(batch_id, video_id, sqlite3.Binary(pack_snippet(snippet))) for video_id, snippet in snippets.items()],
+    )
+    conn.commit()
+
+
+def discard_snapshots(conn: sqlite3.Connection, batch_id: str, video_ids: List[str]) -> None:
+    """Drop the snapshots of videos whose update in `batch_id` did not go through."""
+    conn.executemany(
+        "DELETE FROM yt_video_snapshots WHERE batch_id = ? AND video_id = ?",
+        [(batch_id, video_id) for video_id in video_ids],
+    )
+    conn.commit()
+
+
+def select_snapshots(
+    conn: sqlite3.Connection,
+    batch_id: Optional[str] = None,
+    channel_id: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+) -> Dict[str, Dict]:
+    """
+    Snapshots to roll back, keyed by video_id: {"ids": [...], "snippet": {...}}.
+
+    Filters combine with AND; since/until compare against the UTC snapshot
+    time (until is exclusive, so a bare date means "before that day"). A
+    video updated several times in the selection is restored to its earliest
+    snapshot, i.e. to its state before the whole selection. Snapshots taken
+    by rollbacks themselves are only selected by their batch_id.
+    """
+    query = "SELECT id, video_id, snippet_z FROM yt_video_snapshots WHERE rolled_back_at IS NULL"
+    params: List = []
+    if batch_id:
+        query += " AND batch_id = ?"
+        params.append(batch_id)
+    else:
+        query += " AND batch_id NOT LIKE 'rollback-%'"
+    if channel_id:
+        query += " AND video_id IN (SELECT video_id FROM yt_videos WHERE channel_id = ?)"
+        params.append(channel_id)
+    if since:
+        query += " AND created_at >= ?"
+        params.append(since)
+    if until:
+        query += " AND created_at < ?"
+        params.append(until)
+    query += " ORDER BY id"
+
+    out: Dict[str, Dict] = {}
+    for snapshot_id, video_id, blob in conn.execute(query, params):
+        if video_id in out:
+            out[video_id]["ids"].append(snapshot_id)
+        else:
+            out[video_id] = {"ids": [snapshot_id], "snippet": unpack_snippet(bytes(blob))}
+    return out
+
+
+def mark_rolled_back(conn: sqlite3.Connection, snapshot_ids: List[int]) -> None:
+    conn.executemany(
+        "UPDATE yt_video_snapshots SET rolled_back_at = datetime('now') WHERE id = ?",
+        [(i,) for i in snapshot_ids],
+    )
+    conn.commit()
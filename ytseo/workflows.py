@@ -1,32 +1,264 @@
 from __future__ import annotations
 
-from typing import Dict, List
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
 
+from googleapiclient.errors import HttpError
+
+from . import ai_ewg_bridge
+from . import ai_ewg_watcher
+from . import apply_outbox
 from . import db as dbmod
+from . import episode_linker
 from . import models
 from . import seo_engine
+from . import snapshots
 from . import youtube_api
+from . import youtube_quota
+from .config import get_available_channels, get_bool_setting, get_int_setting
+
+
+def sync_channel(channel_handle: str, limit: int = 20, full: bool = False, refresh_channel: bool = False) -> int:
+    """
+    Sync videos from YouTube channel to local database.
+    
+    Returns the number of videos fetched; see sync_channel_report.
+    """
+    return sync_channel_report(channel_handle, limit=limit, full=full, refresh_channel=refresh_channel)["fetched"]
 
 
-def sync_channel(channel_handle: str, limit: int = 20) -> int:
-    """Sync videos from YouTube channel to local database."""
+def sync_channel_report(
+    channel_handle: str,
+    limit: int = 20,
+    full: bool = False,
+    refresh_channel: bool = False,
+    link_episodes: bool = True,
+) -> Dict:
+    """
+    Sync videos from YouTube channel to local database.
+    
+    Pages through the uploads playlist newest first and stops at the
+    channel's watermark (yt_channels.last_synced, the newest published_at
+    seen by the last complete sync), so routine syncs cost one or two API
+    calls. limit=0 means no limit; full=True ignores the watermark (backfill);
+    refresh_channel=True re-resolves the stored handle -> channel mapping.
+    With link_episodes (and AUTO_LINK_EPISODES), new videos are linked to
+    AI-EWG episodes afterwards.
+    
+    Pages are streamed: each one is written with executemany in its own
+    transaction together with a checkpoint (yt_sync_checkpoints) holding the
+    page token and in-page offset to continue from, so memory stays at one
+    page however large the channel.
+    A pass cut short by `limit`, the quota or a crash is resumed from its
+    checkpoint by the next sync with the same watermark, after that sync has
+    first fetched the uploads published since the pass began (so a limited
+    backfill never delays new videos). The watermark only advances once a
+    pass completes, so older videos are never skipped.
+    
+    Returns {"channel", "fetched", "new", "changed", "units", "complete"}:
+    "changed" counts known videos whose title, description or tags differ,
+    "units" the YouTube quota this sync charged.
+    """
+    report = {"channel": channel_handle, "fetched": 0, "new": 0, "changed": 0, "units": 0, "complete": False}
     conn = dbmod.connect()
     dbmod.apply_migrations(conn)
-    videos = youtube_api.list_videos_by_channel(channel_handle, limit=limit)
-    for v in videos:
-        models.upsert_video(
-            conn,
-            video_id=v.get("video_id"),
-            channel_id=v.get("channel_id"),
-            channel_handle=channel_handle,
-            title_original=v.get("title_original"),
-            description_original=v.get("description_original"),
-            tags_original=v.get("tags_original"),
-            published_at=v.get("published_at"),
-            episode_id=v.get("episode_id"),
-            status=v.get("status", "pending"),
-        )
-    return len(videos)
+    
+    # Syncs run at low quota priority so they never starve applies
+    with youtube_quota.priority("low"), youtube_quota.metered() as meter:
+        try:
+            channel = youtube_api.get_channel(channel_handle, refresh=refresh_channel)
+        except (HttpError, youtube_quota.QuotaExhausted) as e:
+            print(f"Sync skipped: {e}")
+            channel = None
+        if not channel:
+            report["units"] = meter["units"]
+            return report
+        channel_id = channel["channel_id"]
+        row = conn.execute("SELECT last_synced FROM yt_channels WHERE channel_id=?", (channel_id,)).fetchone()
+        watermark = row[0] if row else None
+        since = None if full else watermark
+        
+        checkpoint = models.get_sync_checkpoint(conn, channel_id)
+        if checkpoint and checkpoint["since"] == since:
+            resume, newest = (checkpoint["page_token"], checkpoint["page_offset"]), checkpoint["newest"]
+        else:
+            checkpoint, resume, newest = None, (None, 0), None
+        
+        try:
+            caught_up = True
+            if checkpoint and newest:
+                # Uploads published since the pass began come first, so a long backfill never holds them back
+                caught_up, newest = _sync_pages(
+                    conn, channel, channel_handle, report, limit, since, newest, (None, 0), newest,
+                    checkpoint=(resume[0], resume[1], newest),
+                )
+                if caught_up:
+                    models.save_sync_checkpoint(conn, channel_id, since, resume[0], resume[1], newest)
+                    conn.commit()
+            if caught_up and not (limit and report["fetched"] >= limit):
+                if checkpoint:
+                    print(f"Resuming interrupted sync of {channel_handle}")
+                report["complete"], newest = _sync_pages(
+                    conn, channel, channel_handle, report, limit, since, since, resume, newest
+                )
+        except (HttpError, youtube_quota.QuotaExhausted) as e:
+            # Pages stored so far are kept; the checkpoint lets the next sync continue
+            print(f"Sync stopped early: {e}")
+        report["units"] = meter["units"]
+    
+    if report["complete"]:
+        models.clear_sync_checkpoint(conn, channel_id)
+        models.upsert_channel(conn, channel_id, channel["title"], max(watermark or "", newest or "") or None)
+    else:
+        print(f"Stopped after {report['fetched']} videos; watermark not advanced, the next sync resumes from here")
+        models.upsert_channel(conn, channel_id, channel["title"], watermark)
+    
+    if report["fetched"] and link_episodes:
+        _auto_link(conn, channel_handle)
+    conn.close()
+    return report
+
+
+def _auto_link(conn, channel_handle: Optional[str] = None) -> None:
+    """Link unlinked videos (of one channel, or all) to AI-EWG episodes, if AUTO_LINK_EPISODES."""
+    if not get_bool_setting("AUTO_LINK_EPISODES", True):
+        return
+    links = episode_linker.link_videos(conn, channel_handle=channel_handle)
+    if links["linked"]:
+        print(f"Linked {links['linked']}/{links['videos']} videos to AI-EWG episodes")
+
+
+def _sync_pages(
+    conn,
+    channel: Dict,
+    channel_handle: str,
+    report: Dict,
+    limit: int,
+    since: Optional[str],
+    fetch_since: Optional[str],
+    start: Tuple[Optional[str], int],
+    newest: Optional[str],
+    checkpoint: Optional[Tuple[Optional[str], int, Optional[str]]] = None,
+) -> Tuple[bool, Optional[str]]:
+    """
+    Store uploads from `start` (page token, offset into that page) down to
+    `fetch_since`, the end of the playlist or `limit` videos in `report`.
+    
+    Each page is written with the checkpoint of the pass with watermark
+    `since`: the position right after the page or, while catching up on new
+    uploads ahead of a resumed pass, the fixed `checkpoint` (token, offset,
+    newest). Returns (reached the end, newest published_at seen).
+    """
+    token, offset = start
+    pages = youtube_api.iter_channel_videos(channel, since=fetch_since, page_token=token)
+    try:
+        for page, next_token in pages:
+            # Only the first page of a resumed pass has videos stored already
+            first, offset = offset, 0
+            page = page[first:]
+            cut = bool(limit) and report["fetched"] + len(page) > limit
+            if cut:
+                # Resume inside this page, right after the videos stored now
+                page = page[:limit - report["fetched"]]
+                resume = (token, first + len(page))
+            else:
+                resume = (next_token, 0)
+            newest = max([newest or ""] + [v.get("published_at") or "" for v in page]) or None
+            new, changed = _store_page(
+                conn, channel["channel_id"], channel_handle, page, since, checkpoint or (resume[0], resume[1], newest)
+            )
+            report["fetched"] += len(page)
+            report["new"] += new
+            report["changed"] += changed
+            if not cut and next_token is None:
+                return True, newest
+            token = resume[0]
+            if cut or (limit and report["fetched"] >= limit):
+                return False, newest
+        return True, newest
+    finally:
+        pages.close()
+
+
+def _store_page(
+    conn,
+    channel_id: str,
+    channel_handle: str,
+    page: List[Dict],
+    since: Optional[str],
+    checkpoint: Tuple[Optional[str], int, Optional[str]],
+) -> Tuple[int, int]:
+    """Write one page of synced videos and the sync checkpoint in one transaction; returns (new, changed)."""
+    ids = [v["video_id"] for v in page]
+    rows = conn.execute(
+        f"SELECT video_id, title_original, description_original, tags_original FROM yt_videos "
+        f"WHERE video_id IN ({','.join('?' * len(ids))})",
+        ids,
+    )
+    existing = {r[0]: tuple(r[1:]) for r in rows}
+    
+    new = changed = 0
+    for v in page:
+        before = existing.get(v["video_id"])
+        if before is None:
+            new += 1
+        elif before != (v.get("title_original"), v.get("description_original"), json.dumps(v.get("tags_original") or [])):
+            changed += 1
+    
+    models.upsert_videos(conn, page, channel_handle=channel_handle, commit=False)
+    models.save_sync_checkpoint(conn, channel_id, since, *checkpoint)
+    conn.commit()
+    return new, changed
+
+
+def sync_all_channels(
+    channels: Optional[List[str]] = None,
+    workers: Optional[int] = None,
+    limit: int = 20,
+    full: bool = False,
+    refresh_channel: bool = False,
+) -> List[Dict]:
+    """
+    Sync several channels (default: every configured channel) concurrently.
+    
+    At most `workers` (SYNC_WORKERS, default 4) channels sync at once. The
+    OAuth credentials and discovery document are shared; each worker thread
+    keeps its own service object, as httplib2 connections are not thread-safe.
+    Episode linking runs once after all channels are done rather than in each
+    worker, since every linking run refreshes the shared episode index.
+    
+    Returns one sync_channel_report per channel, in the given order; a channel
+    whose sync raised gets a zero report with an "error".
+    """
+    channels = channels or get_available_channels()
+    if not channels:
+        return []
+    workers = workers or get_int_setting("SYNC_WORKERS", 4)
+    
+    reports: Dict[str, Dict] = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(channels)))) as pool:
+        futures = {pool.submit(sync_channel_report, ch, limit, full, refresh_channel, False): ch for ch in channels}
+        for future in as_completed(futures):
+            ch = futures[future]
+            try:
+                reports[ch] = future.result()
+            except Exception as e:
+                print(f"Error syncing channel {ch}: {e}")
+                reports[ch] = {
+                    "channel": ch, "fetched": 0, "new": 0, "changed": 0, "units": 0, "complete": False, "error": str(e)
+                }
+    
+    if any(r["fetched"] for r in reports.values()):
+        conn = dbmod.connect()
+        try:
+            _auto_link(conn)
+        except Exception as e:
+            # The channels themselves synced fine; unlinked videos are picked up next time
+            print(f"Episode linking failed: {e}")
+        finally:
+            conn.close()
+    return [reports[ch] for ch in channels]
 
 
 def fetch_and_process_video(video_id: str, language_code: str = "en") -> int:
@@ -65,10 +297,11 @@ def fetch_and_process_video(video_id: str, language_code: str = "en") -> int:
     return generate_suggestions_for_video(video_id, language_code)
 
 
-def generate_suggestions_for_video(video_id: str, language_code: str = "en") -> int:
+def generate_suggestions_for_video(video_id: str, language_code: str = "en", refresh_cache: bool = False) -> int:
     """
     Generate SEO suggestions for a specific video by ID.
     Useful for targeted regeneration or processing a single video.
+    Pass refresh_cache=True to force fresh LLM output instead of cached responses.
     """
     conn = dbmod.connect()
     dbmod.apply_migrations(conn)
@@ -85,16 +318,10 @@ def generate_suggestions_for_video(video_id: str, language_code: str = "en") ->
     
     # Build context with video data
     ctx = dict(v)
+    ctx["refresh_cache"] = refresh_cache
     
     # Generate all SEO fields
-    suggestion = {
-        "title": seo_engine.generate_title(ctx),
-        "description": seo_engine.generate_description(ctx),
-        "tags": seo_engine.generate_tags(ctx),
-        "hashtags": seo_engine.generate_hashtags(ctx),
-        "thumbnail_text": seo_engine.generate_thumbnail_text(ctx),
-        "pinned_comment": seo_engine.generate_pinned_comment(ctx),
-    }
+    suggestion = seo_engine.generate_suggestion(ctx)
     
     # Store suggestion
     models.create_suggestion(
@@ -118,11 +345,15 @@ def generate_suggestions_for_video(video_id: str, language_code: str = "en") ->
     return 1
 
 
-def generate_suggestions(limit: int = 10, language_code: str = "en", priority: str = "recent") -> int:
+def generate_suggestions(limit: int = 10, language_code: str = "en", priority: str = "recent", workers: int = 1) -> int:
     """
     Generate SEO suggestions for pending videos using LLM.
     Context is enriched with AI-EWG episode data if episode_id is set.
     
+    With workers > 1, videos are generated concurrently in a thread pool and
+    stored in completion order. Only this thread writes to the database, so
+    SQLite never sees concurrent writers.
+    
     Priority modes:
     - 'recent': Process newest videos first (default)
     - 'oldest': Process oldest videos first
@@ -145,75 +376,194 @@ def generate_suggestions(limit: int = 10, language_code: str = "en", priority: s
     
     query = f"SELECT * FROM yt_videos WHERE status='pending' ORDER BY {order_by} LIMIT ?"
     vids = [dict(row) for row in conn.execute(query, (limit,)).fetchall()]
-    created = 0
+    return len(_generate_batch(conn, vids, language_code, workers))
+
+
+def regenerate_stale(limit: int = 10, language_code: str = "en", workers: int = 1) -> int:
+    """
+    Regenerate suggestions for videos queued by the AI-EWG change feed
+    (ai_ewg_watcher.poll_changes). Done videos are removed from the queue.
+    Videos approved or applied since they were queued are dropped from the
+    queue untouched.
+    """
+    conn = dbmod.connect()
+    dbmod.apply_migrations(conn)
+    conn.execute(
+        "DELETE FROM yt_regen_queue WHERE video_id IN (SELECT video_id FROM yt_videos WHERE status IN (?, ?))",
+        ai_ewg_watcher.REVIEW_STATUSES,
+    )
     
-    for v in vids:
-        # Build context with video data
-        ctx = dict(v)
-        
-        # Generate all SEO fields
-        suggestion = {
-            "title": seo_engine.generate_title(ctx),
-            "description": seo_engine.generate_description(ctx),
-            "tags": seo_engine.generate_tags(ctx),
-            "hashtags": seo_engine.generate_hashtags(ctx),
-            "thumbnail_text": seo_engine.generate_thumbnail_text(ctx),
-            "pinned_comment": seo_engine.generate_pinned_comment(ctx),
-        }
-        
-        # Store suggestion
-        models.create_suggestion(
-            conn,
-            video_id=v["video_id"],
-            language_code=language_code,
-            title=suggestion["title"],
-            description=suggestion["description"],
-            tags=suggestion["tags"],
-            hashtags=suggestion["hashtags"],
-            thumbnail_text=", ".join(suggestion["thumbnail_text"]) if isinstance(suggestion["thumbnail_text"], list) else suggestion["thumbnail_text"],
-            pinned_comment=suggestion["pinned_comment"],
-            playlists=[],
-        )
-        
-        # Mark video as suggested
-        models.mark_video_status(conn, v["video_id"], "suggested")
-        created += 1
+    vids = [
+        dict(row)
+        for row in conn.execute(
+            """
+            SELECT v.* FROM yt_regen_queue q JOIN yt_videos v ON v.video_id = q.video_id
+            ORDER BY q.queued_at LIMIT ?
+            """,
+            (limit,),
+        ).fetchall()
+    ]
+    done = _generate_batch(conn, vids, language_code, workers)
+    conn.executemany("DELETE FROM yt_regen_queue WHERE video_id=?", [(vid,) for vid in done])
+    conn.commit()
+    return len(done)
+
+
+def _generate_batch(conn, vids: List[Dict], language_code: str, workers: int) -> List[str]:
+    """Generate and store suggestions for `vids`; returns the video_ids that succeeded."""
+    done: List[str] = []
+    
+    # Prefetch AI-EWG context for the whole batch in a few queries
+    try:
+        episodes = ai_ewg_bridge.get_episodes_by_ids(v.get("episode_id") for v in vids)
+    except Exception as e:
+        print(f"Could not load AI-EWG episodes, generating without episode context: {e}")
+        episodes = {}
+    contexts = {v["video_id"]: dict(v, episode_data=episodes.get(v.get("episode_id")) or {}) for v in vids}
     
-    return created
+    # Workers only call the LLM; results are written here as they complete
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(seo_engine.generate_suggestion, contexts[v["video_id"]]): v for v in vids}
+        for future in as_completed(futures):
+            v = futures[future]
+            try:
+                suggestion = future.result()
+            except Exception as e:
+                print(f"Error generating suggestion for {v['video_id']}: {e}")
+                continue
+            
+            # Store suggestion
+            models.create_suggestion(
+                conn,
+                video_id=v["video_id"],
+                language_code=language_code,
+                title=suggestion["title"],
+                description=suggestion["description"],
+                tags=suggestion["tags"],
+                hashtags=suggestion["hashtags"],
+                thumbnail_text=", ".join(suggestion["thumbnail_text"]) if isinstance(suggestion["thumbnail_text"], list) else suggestion["thumbnail_text"],
+                pinned_comment=suggestion["pinned_comment"],
+                playlists=[],
+            )
+            
+            # Mark video as suggested
+            models.mark_video_status(conn, v["video_id"], "suggested")
+            done.append(v["video_id"])
+            print(f"[{len(done)}/{len(vids)}] Generated suggestion for video: {v['video_id']} - {(v['title_original'] or '')[:50]}")
+    
+    return done
 
 
 def apply_suggestions(limit: int = 10, dry_run: bool = True) -> int:
     """
     Apply approved suggestions to YouTube.
     Respects DRY_RUN and REQUIRE_CONFIRMATION settings.
+    
+    Returns the number of videos now matching their suggestion (updated or
+    already unchanged); see apply_suggestions_report for the details.
     """
+    report = apply_suggestions_report(limit=limit, dry_run=dry_run)
+    return len(report["updated"]) + len(report["unchanged"]) + len(report["dry_run"])
+
+
+def apply_suggestions_report(limit: int = 10, dry_run: bool = True) -> Dict[str, List]:
+    """
+    Apply approved suggestions and report what happened per video.
+    
+    Approved videos are first queued in the apply outbox (yt_apply_outbox),
+    then up to `limit` due entries are sent together: snippets are read 50 per
+    call and updates go out as batched requests (see
+    youtube_api.update_videos_metadata). Videos that already match their
+    suggestion are not updated. Each real update stores its structured diff in
+    yt_video_applied_changes.
+    
+    Failed entries stay queued and are retried by later runs with exponential
+    backoff; when the quota runs out they wait for the next quota day, and
+    after APPLY_MAX_ATTEMPTS failures they are dead-lettered (see apply_outbox).
+    A dry run only previews: its entries stay queued for the next real run.
+    
+    Returns {"updated", "unchanged", "failed", "dead", "dry_run"}: lists of
+    (video_id, result) with result as returned by update_videos_metadata;
+    "failed" entries are scheduled for a retry, "dead" ones are not.
+    """
+    conn = dbmod.connect()
+    dbmod.apply_migrations(conn)
+    apply_outbox.enqueue_approved(conn)
+    changes_by_video = apply_outbox.due_items(conn, limit)
+    
+    # Apply to YouTube (high quota priority: may use the budget reserved from syncs)
+    with youtube_quota.priority("high"):
+        results = youtube_api.update_videos_metadata(changes_by_video, require_confirmation=not dry_run)
+    
+    report: Dict[str, List] = {"updated": [], "unchanged": [], "failed": [], "dead": [], "dry_run": []}
+    for video_id, result in results.items():
+        state = apply_outbox.record_result(conn, video_id, result)
+        report["dead" if state == "dead" else result["status"]].append((video_id, result))
+    conn.commit()
+    
+    return report
+
+
+def rollback_report(
+    batch_id: Optional[str] = None,
+    channel_handle: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    dry_run: bool = True,
+) -> Dict[str, List]:
+    """
+    Restore videos to the snapshots stored before their updates.
+    
+    Videos are selected by apply batch, channel and/or UTC time range (see
+    snapshots.select_snapshots); the channel handle is resolved from local
+    data, without an API call. They are restored together through
+    youtube_api.update_videos_metadata in replace mode: 50 snippets per
+    list call, 50 updates per batch request, and no update at all for videos
+    already back at their original. Restored videos go back to "suggested"
+    (videos found already at their original only if they were "applied").
+    A rollback that runs out of quota can simply be repeated; restored
+    snapshots are marked and not selected again.
+    
+    Returns {"updated", "unchanged", "failed", "dry_run"} like
+    apply_suggestions_report.
+    """
+    report: Dict[str, List] = {"updated": [], "unchanged": [], "failed": [], "dry_run": []}
     conn = dbmod.connect()
     dbmod.apply_migrations(conn)
-    vids = models.get_videos_by_status(conn, status="approved", limit=limit)
-    applied = 0
-    
-    for v in vids:
-        # Get latest suggestion for this video
-        cur = conn.execute(
-            "SELECT title, description, tags_json FROM yt_video_suggestions WHERE video_id=? ORDER BY created_at DESC LIMIT 1",
-            (v["video_id"],)
+    channel_id = None
+    if channel_handle:
+        channel_id = models.get_channel_id_for_handle(conn, channel_handle)
+        if not channel_id:
+            print(f"No synced channel found for {channel_handle}")
+            conn.close()
+            return report
+    
+    selected = snapshots.select_snapshots(conn, batch_id=batch_id, channel_id=channel_id, since=since, until=until)
+    originals = {video_id: s["snippet"] for video_id, s in selected.items()}
+    
+    with youtube_quota.priority("high"):
+        results = youtube_api.update_videos_metadata(
+            originals,
+            require_confirmation=not dry_run,
+            replace=True,
+            batch_id=snapshots.new_batch_id("rollback"),
         )
-        suggestion = cur.fetchone()
-        if not suggestion:
-            continue
-        
-        import json
-        changes = {
-            "title": suggestion[0],
-            "description": suggestion[1],
-            "tags": json.loads(suggestion[2]) if suggestion[2] else []
-        }
-        
-        # Apply to YouTube
-        success = youtube_api.update_video_metadata(v["video_id"], changes, require_confirmation=not dry_run)
-        
-        if success:
-            models.mark_video_status(conn, v["video_id"], "applied")
-            applied += 1
     
-    return applied
+    restored: List[int] = []
+    for video_id, result in results.items():
+        report[result["status"]].append((video_id, result))
+        if result["status"] in ("updated", "unchanged"):
+            restored.extend(selected[video_id]["ids"])
+        if result["status"] == "unchanged":
+            # Already at its original: only an applied suggestion is undone, other states (e.g. a queued retry) stay
+            conn.execute("UPDATE yt_videos SET status='suggested' WHERE video_id=? AND status='applied'", (video_id,))
+        if result["status"] == "updated":
+            models.mark_video_status(conn, video_id, "suggested")
+            conn.execute(
+                "INSERT INTO yt_video_applied_changes(video_id, diff_json, applied_at) VALUES(?, ?, datetime('now'))",
+                (video_id, json.dumps(result["diff"])),
+            )
+    snapshots.mark_rolled_back(conn, restored)
+    conn.close()
+    
+    return report
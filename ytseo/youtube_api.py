@@ -1,31 +1,49 @@
 from __future__ import annotations
 
+import json
 import os
 import pickle
+import threading
+import time
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
+import httplib2
 from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.discovery_cache import get_static_doc
 from googleapiclient.errors import HttpError
 
-from .config import get_setting
+from . import db as dbmod
+from . import snapshots
+from .config import get_int_setting, get_setting
+from .youtube_cache import ETagHttp, get_youtube_cache
+from .youtube_quota import QuotaExhausted, get_quota_ledger
 
 
 SCOPES = ["https://www.googleapis.com/auth/youtube", "https://www.googleapis.com/auth/youtube.force-ssl"]
 
 
-def _get_authenticated_service():
-    """Get authenticated YouTube API service."""
+TOKEN_PATH = Path("token.pickle")
+
+_auth_lock = threading.RLock()
+_credentials = None
+_local = threading.local()
+_discovery_doc: Optional[Dict] = None
+
+
+def _load_credentials():
+    """Load token.pickle, refreshing it or running the OAuth flow if needed."""
     creds = None
-    token_path = Path("token.pickle")
     client_secret_path = get_setting("YOUTUBE_CLIENT_SECRET_PATH", "config/client_secret.json")
     
     # Load existing credentials
-    if token_path.exists():
-        with open(token_path, "rb") as token:
+    if TOKEN_PATH.exists():
+        with open(TOKEN_PATH, "rb") as token:
             creds = pickle.load(token)
     
     # Refresh or get new credentials
@@ -38,125 +56,286 @@ def _get_authenticated_service():
             flow = InstalledAppFlow.from_client_secrets_file(client_secret_path, SCOPES)
             creds = flow.run_local_server(port=0)
         
-        # Save credentials
-        with open(token_path, "wb") as token:
-            pickle.dump(creds, token)
+        _save_credentials(creds)
     
-    return build("youtube", "v3", credentials=creds)
+    return creds
+
+
+def _save_credentials(creds) -> None:
+    with open(TOKEN_PATH, "wb") as token:
+        pickle.dump(creds, token)
+
+
+def _get_credentials():
+    """Process-wide credentials, loaded once; a daemon thread keeps them fresh."""
+    global _credentials
+    with _auth_lock:
+        if _credentials is None:
+            _credentials = _load_credentials()
+            if _credentials.refresh_token:
+                threading.Thread(target=_refresh_loop, name="youtube-token-refresh", daemon=True).start()
+        return _credentials
+
+
+def _refresh_loop() -> None:
+    """
+    Refresh the access token YOUTUBE_TOKEN_REFRESH_MARGIN seconds before it
+    expires, so API calls never stall on a synchronous refresh.
+    """
+    margin = get_int_setting("YOUTUBE_TOKEN_REFRESH_MARGIN", 300)
+    while True:
+        creds = _credentials
+        if creds is None or creds.expiry is None:
+            return
+        # google-auth keeps expiry as naive UTC
+        wait = (creds.expiry - datetime.utcnow()).total_seconds() - margin
+        if wait > 0:
+            time.sleep(min(wait, 600))
+            continue
+        try:
+            with _auth_lock:
+                creds.refresh(Request())
+                _save_credentials(creds)
+        except Exception as e:
+            print(f"YouTube token refresh failed: {e}")
+            time.sleep(60)
+
+
+def _get_discovery_doc() -> Optional[Dict]:
+    """The YouTube v3 discovery document bundled with googleapiclient, parsed once."""
+    global _discovery_doc
+    if _discovery_doc is None:
+        raw = get_static_doc("youtube", "v3")
+        if raw:
+            _discovery_doc = json.loads(raw)
+    return _discovery_doc
 
 
-def _resolve_channel_handle_to_id(youtube, handle: str) -> Optional[str]:
-    """Resolve @handle to channel ID."""
+def _get_authenticated_service():
+    """
+    Get authenticated YouTube API service.
+    
+    Each thread gets its own service (httplib2 connections are not
+    thread-safe), built once from the shared credentials and discovery
+    document and reused for every later call on that thread.
+    """
+    service = getattr(_local, "service", None)
+    if service is not None:
+        return service
+    
+    http = AuthorizedHttp(_get_credentials(), http=httplib2.Http())
+    # GET responses are revalidated with their ETag (see youtube_cache)
+    cache = get_youtube_cache()
+    if cache is not None:
+        http = ETagHttp(http, cache)
+    
+    doc = _get_discovery_doc()
+    service = build_from_document(doc, http=http) if doc else build("youtube", "v3", http=http)
+    _local.service = service
+    return service
+
+
+def _execute(request):
+    """Execute an API request after charging its quota cost (see youtube_quota)."""
+    get_quota_ledger().acquire(request.methodId)
+    return request.execute()
+
+
+def cache_stats() -> Dict[str, int]:
+    """Conditional request cache counters (empty when the cache is disabled)."""
+    cache = get_youtube_cache()
+    return cache.stats() if cache is not None else {}
+
+
+def _resolve_channel(youtube, handle: str) -> Optional[Dict]:
+    """
+    Resolve @handle to {"channel_id", "title", "uploads_playlist_id"}.
+    
+    Tries the native forHandle lookup, then legacy forUsername (1 quota unit
+    each), and only then search().list (100 units).
+    """
     # Remove @ if present
     handle_clean = handle.lstrip("@")
+    part = "id,snippet,contentDetails"
     
     try:
-        # Try forUsername first
-        request = youtube.channels().list(part="id", forUsername=handle_clean)
-        response = request.execute()
-        if response.get("items"):
-            return response["items"][0]["id"]
+        for lookup in ({"forHandle": handle_clean}, {"forUsername": handle_clean}):
+            response = _execute(youtube.channels().list(part=part, **lookup))
+            if response.get("items"):
+                return _channel_from_item(response["items"][0])
         
         # Try search as fallback
-        request = youtube.search().list(part="id", q=handle_clean, type="channel", maxResults=1)
-        response = request.execute()
+        response = _execute(youtube.search().list(part="id", q=handle_clean, type="channel", maxResults=1))
         if response.get("items"):
-            return response["items"][0]["id"]["channelId"]
+            channel_id = response["items"][0]["id"]["channelId"]
+            response = _execute(youtube.channels().list(part=part, id=channel_id))
+            if response.get("items"):
+                return _channel_from_item(response["items"][0])
     except HttpError as e:
         print(f"Error resolving channel handle: {e}")
     
     return None
 
 
+def _channel_from_item(item: Dict) -> Dict:
+    return {
+        "channel_id": item["id"],
+        "title": item["snippet"].get("title", ""),
+        "uploads_playlist_id": item["contentDetails"]["relatedPlaylists"]["uploads"],
+    }
+
+
+# videos().list accepts at most 50 IDs per call
+VIDEO_BATCH_SIZE = 50
+
+
+def _video_from_item(item: Dict, channel_id: Optional[str] = None) -> Dict:
+    """Convert a videos().list item into a yt_videos row dict."""
+    snippet = item["snippet"]
+    return {
+        "video_id": item["id"],
+        "channel_id": channel_id or snippet.get("channelId", ""),
+        "title_original": snippet.get("title", ""),
+        "description_original": snippet.get("description", ""),
+        "tags_original": snippet.get("tags", []),
+        "published_at": snippet.get("publishedAt", ""),
+        "status": "pending",
+        "episode_id": None,
+    }
+
+
+def _fetch_video_details(youtube, video_ids: List[str], channel_id: Optional[str] = None) -> List[Dict]:
+    """Full details for many videos, VIDEO_BATCH_SIZE IDs per videos().list call."""
+    videos = []
+    for i in range(0, len(video_ids), VIDEO_BATCH_SIZE):
+        response = _execute(youtube.videos().list(
+            part="snippet,contentDetails,statistics",
+            id=",".join(video_ids[i:i + VIDEO_BATCH_SIZE]),
+        ))
+        videos.extend(_video_from_item(item, channel_id) for item in response.get("items", []))
+    return videos
+
+
 def get_video_by_id(video_id: str) -> Optional[Dict]:
     """Fetch a single video by its YouTube ID."""
     youtube = _get_authenticated_service()
     
     try:
-        # Get video details
-        videos_request = youtube.videos().list(
-            part="snippet,contentDetails,statistics",
-            id=video_id
-        )
-        videos_response = videos_request.execute()
-        
-        items = videos_response.get("items", [])
-        if not items:
+        videos = _fetch_video_details(youtube, [video_id])
+        if not videos:
             print(f"Video {video_id} not found")
             return None
-        
-        item = items[0]
-        snippet = item["snippet"]
-        
-        return {
-            "video_id": item["id"],
-            "channel_id": snippet.get("channelId", ""),
-            "title_original": snippet.get("title", ""),
-            "description_original": snippet.get("description", ""),
-            "tags_original": snippet.get("tags", []),
-            "published_at": snippet.get("publishedAt", ""),
-            "status": "pending",
-            "episode_id": None,
-        }
-    except HttpError as e:
+        return videos[0]
+    except (HttpError, QuotaExhausted) as e:
         print(f"YouTube API error fetching video {video_id}: {e}")
         return None
 
 
-def list_videos_by_channel(channel_handle: str, limit: int = 20) -> List[Dict]:
-    """Fetch latest videos from a YouTube channel."""
-    youtube = _get_authenticated_service()
-    
-    # Resolve handle to channel ID
-    channel_id = _resolve_channel_handle_to_id(youtube, channel_handle)
-    if not channel_id:
-        print(f"Could not resolve channel: {channel_handle}")
-        return []
-    
-    videos = []
+def get_channel(channel_handle: str, refresh: bool = False) -> Optional[Dict]:
+    """
+    Resolve a channel handle to {"handle", "channel_id", "title", "uploads_playlist_id"}.
     
+    Resolutions are stored in yt_channel_handles and reused without any API
+    call; pass refresh=True to look the handle up again.
+    """
+    key = channel_handle.lstrip("@").lower()
+    conn = dbmod.connect()
     try:
-        # Get channel's uploads playlist
-        channel_response = youtube.channels().list(part="contentDetails", id=channel_id).execute()
-        if not channel_response.get("items"):
-            return []
-        
-        uploads_playlist_id = channel_response["items"][0]["contentDetails"]["relatedPlaylists"]["uploads"]
+        dbmod.apply_migrations(conn)
+        if not refresh:
+            row = conn.execute(
+                "SELECT channel_id, title, uploads_playlist_id FROM yt_channel_handles WHERE handle=?", (key,)
+            ).fetchone()
+            if row:
+                return {"handle": channel_handle, **dict(row)}
         
-        # Get videos from uploads playlist
-        playlist_request = youtube.playlistItems().list(
+        channel = _resolve_channel(_get_authenticated_service(), channel_handle)
+        if not channel:
+            print(f"Could not resolve channel: {channel_handle}")
+            return None
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO yt_channel_handles(handle, channel_id, title, uploads_playlist_id, resolved_at)
+            VALUES(?, ?, ?, ?, datetime('now'))
+            """,
+            (key, channel["channel_id"], channel["title"], channel["uploads_playlist_id"]),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    return {"handle": channel_handle, **channel}
+
+
+def iter_channel_videos(
+    channel: Dict, since: Optional[str] = None, page_token: Optional[str] = None
+) -> Iterator[Tuple[List[Dict], Optional[str]]]:
+    """
+    Yield the channel's uploads one page (up to 50 videos) at a time, newest
+    first, as (videos, next_page_token) pairs.
+    
+    Follows nextPageToken through the whole uploads playlist, starting at
+    `page_token` (a token from an earlier pass, to resume it), and stops after
+    the page that reaches a video published at or before `since` (the sync
+    watermark); such older videos are not returned. Pages are fetched
+    lazily, so a caller that stops iterating makes no further API calls, and
+    only one page is held at a time. next_page_token is None on the last page.
+    
+    A 404 on the first page of a fresh pass means the stored handle
+    resolution is stale: the handle is resolved again and `channel` is
+    updated in place.
+    """
+    youtube = _get_authenticated_service()
+    
+    while True:
+        request = youtube.playlistItems().list(
             part="snippet,contentDetails",
-            playlistId=uploads_playlist_id,
-            maxResults=min(limit, 50)
+            playlistId=channel["uploads_playlist_id"],
+            maxResults=50,
+            pageToken=page_token,
         )
-        playlist_response = playlist_request.execute()
+        try:
+            playlist_response = _execute(request)
+        except HttpError as e:
+            if e.resp.status != 404 or page_token or not channel.get("handle"):
+                raise
+            fresh = get_channel(channel["handle"], refresh=True)
+            if not fresh or fresh["uploads_playlist_id"] == channel["uploads_playlist_id"]:
+                raise
+            channel.update(fresh)
+            continue
         
-        video_ids = [item["contentDetails"]["videoId"] for item in playlist_response.get("items", [])]
+        video_ids = []
+        reached_watermark = False
+        for item in playlist_response.get("items", []):
+            published = item["contentDetails"].get("videoPublishedAt") or item["snippet"].get("publishedAt", "")
+            if since and published and published <= since:
+                reached_watermark = True
+                continue
+            video_ids.append(item["contentDetails"]["videoId"])
         
-        if not video_ids:
-            return []
-        
-        # Get full video details
-        videos_request = youtube.videos().list(
-            part="snippet,contentDetails,statistics",
-            id=",".join(video_ids)
-        )
-        videos_response = videos_request.execute()
+        page_token = None if reached_watermark else playlist_response.get("nextPageToken")
+        if video_ids:
+            videos = _fetch_video_details(youtube, video_ids, channel["channel_id"])
+            videos.sort(key=lambda v: v["published_at"] or "", reverse=True)
+            yield videos, page_token
         
-        for item in videos_response.get("items", []):
-            snippet = item["snippet"]
-            videos.append({
-                "video_id": item["id"],
-                "channel_id": channel_id,
-                "title_original": snippet.get("title", ""),
-                "description_original": snippet.get("description", ""),
-                "tags_original": snippet.get("tags", []),
-                "published_at": snippet.get("publishedAt", ""),
-                "episode_id": None,
-                "status": "pending",
-            })
+        if not page_token:
+            return
+
+
+def list_videos_by_channel(channel_handle: str, limit: int = 20) -> List[Dict]:
+    """Fetch latest videos from a YouTube channel."""
+    channel = get_channel(channel_handle)
+    if not channel:
+        return []
     
-    except HttpError as e:
+    videos: List[Dict] = []
+    try:
+        for page, _ in iter_channel_videos(channel):
+            videos.extend(page)
+            if len(videos) >= limit:
+                break
+    except (HttpError, QuotaExhausted) as e:
         print(f"YouTube API error: {e}")
     
     return videos[:limit]
@@ -207,40 +386,26 @@ def update_video_metadata(video_id: str, changes: Dict, require_confirmation: bo
         youtube = _get_authenticated_service()
         
         # Get current video details
-        video_response = youtube.videos().list(part="snippet", id=video_id).execute()
+        video_response = _execute(youtube.videos().list(part="snippet", id=video_id))
         if not video_response.get("items"):
             print(f"Video {video_id} not found")
             return False
         
         snippet = video_response["items"][0]["snippet"]
-        
-        # SAFETY: Store original values before modification
-        original_values = {
-            "title": snippet.get("title", ""),
-            "description": snippet.get("description", ""),
-            "tags": snippet.get("tags", [])
-        }
-        print(f"\n📋 Original values backed up for rollback if needed")
-        
-        # Apply changes (NEVER delete, only update/add)
-        if "title" in changes and changes["title"]:
-            snippet["title"] = changes["title"]
-        if "description" in changes and changes["description"]:
-            snippet["description"] = changes["description"]
-        if "tags" in changes and changes["tags"]:
-            # Merge tags instead of replacing (safer)
-            existing_tags = set(snippet.get("tags", []))
-            new_tags = set(changes["tags"])
-            snippet["tags"] = list(existing_tags | new_tags)
+        merged = _merge_snippet(snippet, changes)
+        if not snippet_diff(snippet, merged):
+            print(f"⏭️  Video {video_id} already up to date, skipping update")
+            return True
+        _save_originals(snapshots.new_batch_id(), {video_id: snippet})
         
         # Update video
-        update_response = youtube.videos().update(
+        _execute(youtube.videos().update(
             part="snippet",
             body={
                 "id": video_id,
-                "snippet": snippet
+                "snippet": merged
             }
-        ).execute()
+        ))
         
         print(f"✅ Successfully updated video {video_id}")
         return True
@@ -248,3 +413,241 @@ def update_video_metadata(video_id: str, changes: Dict, require_confirmation: bo
     except HttpError as e:
         print(f"❌ YouTube API error updating video: {e}")
         return False
+    except QuotaExhausted as e:
+        print(f"❌ {e}")
+        return False
+
+
+def _save_originals(batch_id: str, snippets: Dict[str, Dict]) -> None:
+    conn = dbmod.connect()
+    try:
+        dbmod.apply_migrations(conn)
+        snapshots.save_snapshots(conn, batch_id, snippets)
+    finally:
+        conn.close()
+    print(f"\n📋 Original values of {len(snippets)} video(s) saved for rollback: ytseo rollback --batch {batch_id}")
+
+
+def _discard_originals(batch_id: str, video_ids: List[str]) -> None:
+    if not video_ids:
+        return
+    conn = dbmod.connect()
+    try:
+        snapshots.discard_snapshots(conn, batch_id, video_ids)
+    finally:
+        conn.close()
+
+
+def _replace_snippet(snippet: Dict, values: Dict) -> Dict:
+    """Copy of a video snippet with title, description and tags set exactly (rollback)."""
+    snippet = dict(snippet)
+    snippet["title"] = values.get("title") or snippet.get("title", "")
+    snippet["description"] = values.get("description") or ""
+    snippet["tags"] = list(values.get("tags") or [])
+    return snippet
+
+
+def _merge_snippet(snippet: Dict, changes: Dict) -> Dict:
+    """Apply changes to a copy of a video snippet (NEVER delete, only update/add)."""
+    snippet = dict(snippet)
+    if "title" in changes and changes["title"]:
+        snippet["title"] = changes["title"]
+    if "description" in changes and changes["description"]:
+        snippet["description"] = changes["description"]
+    if "tags" in changes and changes["tags"]:
+        # Merge tags instead of replacing (safer)
+        existing_tags = set(snippet.get("tags", []))
+        new_tags = set(changes["tags"])
+        snippet["tags"] = list(existing_tags | new_tags)
+    return snippet
+
+
+def _normalize_snippet(snippet: Dict) -> Dict:
+    """Comparable form of the editable fields (whitespace, line endings, tag order/case)."""
+    return {
+        "title": (snippet.get("title") or "").strip(),
+        "description": (snippet.get("description") or "").replace("\r\n", "\n").strip(),
+        "tags": sorted({t.strip().casefold() for t in snippet.get("tags") or [] if t.strip()}),
+    }
+
+
+def snippet_diff(before: Dict, after: Dict) -> Dict:
+    """
+    Structured diff of the editable snippet fields; empty when an update
+    would change nothing.
+    """
+    old, new = _normalize_snippet(before), _normalize_snippet(after)
+    diff: Dict = {}
+    if old["title"] != new["title"]:
+        diff["title"] = {"old": old["title"], "new": new["title"]}
+    if old["description"] != new["description"]:
+        diff["description"] = {"old_length": len(old["description"]), "new_length": len(new["description"])}
+    if old["tags"] != new["tags"]:
+        diff["tags"] = {
+            "added": sorted(set(new["tags"]) - set(old["tags"])),
+            "removed": sorted(set(old["tags"]) - set(new["tags"])),
+        }
+    return diff
+
+
+def _fetch_snippets(youtube, video_ids: List[str]) -> Dict[str, Dict]:
+    """Current snippets keyed by video_id, VIDEO_BATCH_SIZE IDs per videos().list call."""
+    snippets = {}
+    for i in range(0, len(video_ids), VIDEO_BATCH_SIZE):
+        response = _execute(youtube.videos().list(part="snippet", id=",".join(video_ids[i:i + VIDEO_BATCH_SIZE])))
+        for item in response.get("items", []):
+            snippets[item["id"]] = item["snippet"]
+    return snippets
+
+
+# HTTP statuses worth retrying inside one apply run (quota errors are 403 and are not)
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+# A whole batch round trip failing with one of these is retried item by item
+# (OSError covers socket timeouts and connection resets)
+BATCH_TRANSPORT_ERRORS = (HttpError, httplib2.HttpLib2Error, OSError)
+
+
+def update_videos_metadata(
+    changes_by_video: Dict[str, Dict],
+    require_confirmation: bool = True,
+    max_retries: int = 2,
+    replace: bool = False,
+    batch_id: Optional[str] = None,
+) -> Dict[str, Dict]:
+    """
+    Batch version of update_video_metadata for many videos.
+    
+    Current snippets are read with one videos().list per 50 IDs, and the
+    updates go out through BatchHttpRequest, 50 per round trip. Videos whose
+    merged snippet equals the current one are skipped (no 50-unit update).
+    Items that fail with a retryable status are retried (with backoff) up to
+    max_retries times. The same safety layers apply: DRY_RUN, a single
+    confirmation for the whole batch, and merge-only changes (unless
+    replace=True, which sets title, description and tags exactly as given;
+    used by rollbacks).
+    
+    Before anything is sent, the current snippets of the videos to update
+    are saved in yt_video_snapshots under `batch_id` (a new one if None);
+    those of videos whose update then failed are removed again.
+    
+    Returns {video_id: {"status": "updated"|"unchanged"|"failed"|"dry_run",
+    "diff": snippet_diff or None, "error": str or None, "quota_exhausted": bool}}.
+    """
+    video_ids = list(changes_by_video)
+    if not video_ids:
+        return {}
+    
+    dry_run = get_setting("DRY_RUN", "true").lower() in ("true", "1", "yes")
+    if dry_run:
+        for video_id, changes in changes_by_video.items():
+            print(f"[DRY RUN] Would update video {video_id} with: {changes}")
+        return {video_id: _result("dry_run") for video_id in video_ids}
+    
+    # SAFETY: Manual confirmation required
+    if require_confirmation:
+        print(f"\n⚠️  CONFIRMATION REQUIRED ⚠️")
+        print(f"About to update {len(video_ids)} videos:")
+        for video_id, changes in changes_by_video.items():
+            print(f"  - {video_id}: {', '.join(k for k, v in changes.items() if v)}")
+        
+        response = input("\nType 'APPLY' to confirm, anything else to cancel: ")
+        if response != "APPLY":
+            print("❌ Update cancelled by user")
+            return {video_id: _result("failed", error="cancelled") for video_id in video_ids}
+    
+    results: Dict[str, Dict] = {}
+    try:
+        youtube = _get_authenticated_service()
+        snippets = _fetch_snippets(youtube, video_ids)
+    except (HttpError, QuotaExhausted) as e:
+        print(f"❌ YouTube API error reading videos: {e}")
+        return {video_id: _result("failed", error=str(e), quota_exhausted=_is_quota_error(e)) for video_id in video_ids}
+    
+    merged: Dict[str, Dict] = {}
+    diffs: Dict[str, Dict] = {}
+    for video_id in video_ids:
+        if video_id not in snippets:
+            print(f"Video {video_id} not found")
+            results[video_id] = _result("failed", error="not found")
+            continue
+        if replace:
+            merged[video_id] = _replace_snippet(snippets[video_id], changes_by_video[video_id])
+        else:
+            merged[video_id] = _merge_snippet(snippets[video_id], changes_by_video[video_id])
+        diffs[video_id] = snippet_diff(snippets[video_id], merged[video_id])
+        if not diffs[video_id]:
+            print(f"⏭️  Video {video_id} already up to date, skipping update")
+            results[video_id] = _result("unchanged", diff={})
+    
+    pending = [video_id for video_id in video_ids if video_id not in results]
+    snapshotted = list(pending)
+    batch_id = batch_id or snapshots.new_batch_id()
+    if pending:
+        _save_originals(batch_id, {v: snippets[v] for v in pending})
+    errors: Dict[str, str] = {}
+    for attempt in range(max_retries + 1):
+        retry: List[str] = []
+        
+        def _on_response(request_id, response, exception):
+            if exception is None:
+                results[request_id] = _result("updated", diff=diffs[request_id])
+                print(f"✅ Successfully updated video {request_id}")
+            elif isinstance(exception, HttpError) and exception.resp.status not in RETRYABLE_STATUSES:
+                results[request_id] = _result(
+                    "failed", diff=diffs[request_id], error=str(exception), quota_exhausted=_is_quota_error(exception)
+                )
+                print(f"❌ YouTube API error updating video {request_id}: {exception}")
+            else:
+                errors[request_id] = str(exception)
+                retry.append(request_id)
+        
+        for i in range(0, len(pending), VIDEO_BATCH_SIZE):
+            chunk = pending[i:i + VIDEO_BATCH_SIZE]
+            try:
+                get_quota_ledger().acquire("youtube.videos.update", count=len(chunk))
+            except QuotaExhausted as e:
+                # Out of budget: everything not sent yet fails now, without retries
+                print(f"❌ {e}")
+                for v in retry + pending[i:]:
+                    results[v] = _result("failed", diff=diffs[v], error=str(e), quota_exhausted=True)
+                retry = []
+                break
+            batch = youtube.new_batch_http_request(callback=_on_response)
+            for video_id in chunk:
+                body = {"id": video_id, "snippet": merged[video_id]}
+                batch.add(youtube.videos().update(part="snippet", body=body), request_id=video_id)
+            try:
+                batch.execute()
+            except BATCH_TRANSPORT_ERRORS as e:
+                # The batch request itself failed; retry every item that got no answer
+                print(f"YouTube batch request failed: {e}")
+                for v in pending[i:i + VIDEO_BATCH_SIZE]:
+                    if v not in results and v not in retry:
+                        errors[v] = str(e)
+                        retry.append(v)
+        
+        pending = retry
+        if not pending:
+            break
+        if attempt < max_retries:
+            time.sleep(2 ** attempt)
+    
+    for video_id in pending:
+        print(f"❌ Giving up on video {video_id} after {max_retries + 1} attempts")
+        results[video_id] = _result("failed", diff=diffs[video_id], error=errors.get(video_id))
+    
+    # Only videos that were really updated can be rolled back
+    _discard_originals(batch_id, [v for v in snapshotted if results[v]["status"] != "updated"])
+    return results
+
+
+def _result(status: str, diff: Optional[Dict] = None, error: Optional[str] = None, quota_exhausted: bool = False) -> Dict:
+    return {"status": status, "diff": diff, "error": error, "quota_exhausted": quota_exhausted}
+
+
+def _is_quota_error(e: Exception) -> bool:
+    """Our own ledger refusing the call, or YouTube answering 403 quotaExceeded."""
+    if isinstance(e, QuotaExhausted):
+        return True
+    return isinstance(e, HttpError) and e.resp.status == 403 and b"quotaExceeded" in (e.content or b"")
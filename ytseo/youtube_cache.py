@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from .config import get_bool_setting, get_int_setting, get_setting
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS youtube_http_cache (
+  uri TEXT PRIMARY KEY,
+  etag TEXT,
+  headers TEXT,
+  body BLOB,
+  accessed_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_youtube_http_cache_accessed ON youtube_http_cache(accessed_at);
+"""
+
+
+class YouTubeResponseCache:
+    """
+    On-disk store of YouTube Data API GET responses keyed by request URI,
+    kept together with their ETag for conditional revalidation.
+
+    A revalidated request still costs its quota units (the ledger charges it
+    like any other), so the counters only report how often bodies were reused.
+    """
+
+    def __init__(self, path: str, max_entries: int = 20000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        p = Path(path)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(p), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def get(self, uri: str) -> Optional[Tuple[str, Dict, bytes]]:
+        """Return (etag, headers, body) for a cached URI, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT etag, headers, body FROM youtube_http_cache WHERE uri=?", (uri,)).fetchone()
+        if not row:
+            return None
+        return row[0], json.loads(row[1]), bytes(row[2])
+
+    def put(self, uri: str, etag: str, headers: Dict, body: bytes) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO youtube_http_cache(uri, etag, headers, body, accessed_at) VALUES(?, ?, ?, ?, ?)",
+                (uri, etag, json.dumps(headers), sqlite3.Binary(body), time.time()),
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM youtube_http_cache").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM youtube_http_cache WHERE uri IN (SELECT uri FROM youtube_http_cache ORDER BY accessed_at LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+            self._conn.commit()
+
+    def touch(self, uri: str) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE youtube_http_cache SET accessed_at=? WHERE uri=?", (time.time(), uri))
+            self._conn.commit()
+
+    def record(self, uri: str, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM youtube_http_cache")
+            self._conn.commit()
+
+
+class ETagHttp:
+    """
+    Wraps the (authorized) httplib2 object handed to googleapiclient.build().
+
+    GET requests for URIs seen before are sent with If-None-Match; a 304 is
+    turned back into a 200 carrying the cached body, so API callers never
+    notice. Everything else passes straight through.
+    """
+
+    def __init__(self, http, cache: YouTubeResponseCache):
+        self.http = http
+        self.cache = cache
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        if method != "GET":
+            return self.http.request(uri, method=method, body=body, headers=headers, **kwargs)
+
+        headers = dict(headers or {})
+        cached = self.cache.get(uri)
+        if cached:
+            headers["If-None-Match"] = cached[0]
+
+        resp, content = self.http.request(uri, method=method, body=body, headers=headers, **kwargs)
+        if resp.status == 304 and cached:
+            self.cache.touch(uri)
+            self.cache.record(uri, hit=True)
+            return type(resp)(dict(cached[1], status="200")), cached[2]
+
+        self.cache.record(uri, hit=False)
+        etag = resp.get("etag")
+        if resp.status == 200 and etag:
+            stored = {k: v for k, v in resp.items() if k != "status"}
+            self.cache.put(uri, etag, stored, content)
+        return resp, content
+
+    def __getattr__(self, name):
+        # credentials, timeout, close(), ... of the wrapped object
+        return getattr(self.http, name)
+
+
+_cache: Optional[YouTubeResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_youtube_cache() -> Optional[YouTubeResponseCache]:
+    """Shared response cache, or None when YOUTUBE_HTTP_CACHE_ENABLED is false."""
+    global _cache
+    if not get_bool_setting("YOUTUBE_HTTP_CACHE_ENABLED", True):
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = YouTubeResponseCache(
+                    path=str(get_setting("YOUTUBE_HTTP_CACHE_PATH", "data/youtube_cache.sqlite")),
+                    max_entries=get_int_setting("YOUTUBE_HTTP_CACHE_MAX_ENTRIES", 20000),
+                )
+    return _cache
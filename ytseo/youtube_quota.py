@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import contextvars
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+from . import db as dbmod
+from .config import get_float_setting, get_int_setting, get_setting
+
+try:
+    from zoneinfo import ZoneInfo
+
+    _PACIFIC = ZoneInfo("America/Los_Angeles")
+except Exception:  # no tz database; PST is close enough for day boundaries
+    _PACIFIC = timezone(timedelta(hours=-8))
+
+
+# Units per call (https://developers.google.com/youtube/v3/determine_quota_cost)
+QUOTA_COSTS = {
+    "youtube.search.list": 100,
+    "youtube.videos.update": 50,
+    "youtube.playlistItems.insert": 50,
+    "youtube.commentThreads.insert": 50,
+}
+DEFAULT_COST = 1  # list calls
+
+# Share of the daily quota each priority must leave untouched for higher priorities
+PRIORITY_RESERVE = {"high": 0.0, "normal": 0.1, "low": 0.3}
+
+_priority: contextvars.ContextVar[str] = contextvars.ContextVar("youtube_quota_priority", default="normal")
+_meter: contextvars.ContextVar[Optional[Dict[str, int]]] = contextvars.ContextVar("youtube_quota_meter", default=None)
+
+
+class QuotaExhausted(Exception):
+    """Raised instead of making a call the remaining quota can't cover."""
+
+
+def quota_cost(method_id: str) -> int:
+    return QUOTA_COSTS.get(method_id, DEFAULT_COST)
+
+
+def quota_day(now: Optional[datetime] = None) -> str:
+    """The quota day (YYYY-MM-DD); YouTube resets quotas at midnight Pacific time."""
+    now = now or datetime.now(timezone.utc)
+    return now.astimezone(_PACIFIC).date().isoformat()
+
+
+def next_quota_reset(now: Optional[datetime] = None) -> datetime:
+    """Start of the next quota day (midnight Pacific), as a naive UTC datetime."""
+    now = now or datetime.now(timezone.utc)
+    local = now.astimezone(_PACIFIC)
+    midnight = datetime.combine(local.date() + timedelta(days=1), datetime.min.time(), tzinfo=_PACIFIC)
+    return midnight.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+@contextmanager
+def priority(level: str) -> Iterator[None]:
+    """Run the enclosed API calls at `level` ("high", "normal" or "low")."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+@contextmanager
+def metered() -> Iterator[Dict[str, int]]:
+    """Count the units charged by the enclosed API calls: {"units": n, "calls": n}."""
+    meter = {"units": 0, "calls": 0}
+    token = _meter.set(meter)
+    try:
+        yield meter
+    finally:
+        _meter.reset(token)
+
+
+class QuotaLedger:
+    """
+    Persistent per-day usage of the YouTube Data API quota plus a token
+    bucket that paces calls.
+
+    acquire() is called before every request: it refuses (QuotaExhausted)
+    when the day's remaining units would drop below the reserve of the
+    caller's priority, so low-priority syncs stop early and leave room for
+    applies. With a rate limit set, it also waits for bucket tokens.
+    """
+
+    def __init__(self, conn: sqlite3.Connection, daily_limit: int = 10000, rate_per_minute: float = 0.0):
+        self.daily_limit = daily_limit
+        self.rate_per_minute = rate_per_minute
+        self._conn = conn
+        self._lock = threading.Lock()
+        self._tokens = rate_per_minute
+        self._refilled_at = time.monotonic()
+
+    def used(self, day: Optional[str] = None) -> int:
+        with self._lock:
+            return self._used(day or quota_day())
+
+    def _used(self, day: str) -> int:
+        row = self._conn.execute("SELECT COALESCE(SUM(units), 0) FROM yt_quota_usage WHERE day=?", (day,)).fetchone()
+        return row[0]
+
+    def remaining(self) -> int:
+        return max(0, self.daily_limit - self.used())
+
+    def usage_by_operation(self, day: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT operation, units, calls FROM yt_quota_usage WHERE day=? ORDER BY units DESC", (day or quota_day(),)
+            ).fetchall()
+        return {r[0]: {"units": r[1], "calls": r[2]} for r in rows}
+
+    def acquire(self, method_id: str, count: int = 1, level: Optional[str] = None) -> int:
+        """
+        Reserve and record the units for `count` calls of `method_id`.
+
+        Units are recorded up front (a call that then fails still counts, as
+        it does for YouTube). Returns the units charged.
+        """
+        units = quota_cost(method_id) * count
+        level = level or _priority.get()
+        reserve = int(self.daily_limit * PRIORITY_RESERVE.get(level, PRIORITY_RESERVE["normal"]))
+        self._wait_for_tokens(units)
+        with self._lock:
+            day = quota_day()
+            remaining = self.daily_limit - self._used(day)
+            if remaining - units < reserve:
+                raise QuotaExhausted(
+                    f"YouTube quota: {method_id} needs {units} units, {max(0, remaining)} left "
+                    f"({reserve} reserved above '{level}' priority)"
+                )
+            self._conn.execute(
+                """
+                INSERT INTO yt_quota_usage(day, operation, units, calls) VALUES(?, ?, ?, ?)
+                ON CONFLICT(day, operation) DO UPDATE SET units=units+excluded.units, calls=calls+excluded.calls
+                """,
+                (day, method_id, units, count),
+            )
+            self._conn.commit()
+        meter = _meter.get()
+        if meter is not None:
+            meter["units"] += units
+            meter["calls"] += count
+        return units
+
+    def _wait_for_tokens(self, units: int) -> None:
+        """Token bucket: rate_per_minute units refill continuously, burst up to one minute's worth."""
+        if self.rate_per_minute <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.rate_per_minute, self._tokens + (now - self._refilled_at) * self.rate_per_minute / 60)
+                self._refilled_at = now
+                # A call larger than the bucket may go once the bucket is full
+                needed = min(units, self.rate_per_minute)
+                if self._tokens >= needed:
+                    self._tokens -= units
+                    return
+                wait = (needed - self._tokens) * 60 / self.rate_per_minute
+            time.sleep(wait)
+
+
+_ledger: Optional[QuotaLedger] = None
+_ledger_lock = threading.Lock()
+
+
+def get_quota_ledger() -> QuotaLedger:
+    """Shared ledger on the ytseo DB, configured by YOUTUBE_DAILY_QUOTA / YOUTUBE_QUOTA_RATE_PER_MINUTE."""
+    global _ledger
+    if _ledger is None:
+        with _ledger_lock:
+            if _ledger is None:
+                path = Path(get_setting("DB_PATH", "data/ytseo.sqlite"))
+                path.parent.mkdir(parents=True, exist_ok=True)
+                # Shared by worker threads; all access goes through the ledger's lock
+                conn = sqlite3.connect(str(path), check_same_thread=False, timeout=30)
+                dbmod.apply_migrations(conn)
+                _ledger = QuotaLedger(
+                    conn,
+                    daily_limit=get_int_setting("YOUTUBE_DAILY_QUOTA", 10000),
+                    rate_per_minute=get_float_setting("YOUTUBE_QUOTA_RATE_PER_MINUTE", 0.0),
+                )
+    return _ledger